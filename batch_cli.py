@@ -0,0 +1,258 @@
+"""
+Resumable bulk generation from a JSONL file of prompts.
+
+    python batch_cli.py prompts.jsonl -o results.jsonl --netlists generated_circuits
+    python batch_cli.py requests.jsonl -o out.jsonl --prompt-field body --id-field request_id
+
+Each input line is a JSON object holding the prompt (--prompt-field) and
+optionally an id (--id-field; the line number otherwise), or just a JSON
+string. Generation runs through batch_generate (bounded concurrency, rate
+limits, retries); validation and netlist writing run in a thread pool
+alongside it, so the two stages overlap.
+
+Every finished prompt is appended to the output JSONL as one record
+({"id", "prompt", "circuit", "netlist", "error", ...}) and flushed, so the
+output doubles as the checkpoint: re-running the same command skips ids
+that are already recorded (a torn last line from a crash is dropped).
+--retry-errors also re-runs ids whose record is an error; the last record
+for an id wins. Progress, throughput and error rate are printed every
+--report-every seconds.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gemini_to_net_v1 as generator
+from batch_generate import generate_many
+from circuit_validator import validate_circuit
+from instrumentation import configure_logging
+
+
+def read_done(output_path, retry_errors=False):
+    """Ids already recorded in `output_path`; truncates a torn last line"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "rb+") as f:
+        good_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            good_end += len(line)
+            if record.get("error") and retry_errors:
+                done.discard(record["id"])
+            else:
+                done.add(record["id"])
+        f.truncate(good_end)
+    return done
+
+
+def count_lines(path):
+    with open(path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+
+def iter_prompts(path, prompt_field="prompt", id_field="id"):
+    """Yield (id, prompt, error) per non-blank input line"""
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield f"line-{line_no}", None, f"Invalid JSON on line {line_no}: {e}"
+                continue
+            if isinstance(item, str):
+                yield f"line-{line_no}", item, None
+                continue
+            record_id = item.get(id_field, f"line-{line_no}") if isinstance(item, dict) else f"line-{line_no}"
+            prompt = item.get(prompt_field) if isinstance(item, dict) else None
+            if not isinstance(prompt, str) or not prompt.strip():
+                yield record_id, None, f"No '{prompt_field}' on line {line_no}"
+            else:
+                yield record_id, prompt, None
+
+
+def netlist_file_name(record_id):
+    return re.sub(r"[^\w.-]+", "_", str(record_id)).strip("._") + ".cir"
+
+
+def finish_record(record_id, result, netlist_dir):
+    """Validate, repair and write the netlist for one generated circuit (runs in the pool)"""
+    record = {
+        "id": record_id,
+        "prompt": result["prompt"],
+        "circuit": result["data"],
+        "netlist": None,
+        "error": None,
+        "attempts": result["attempts"],
+        "cached": result["cached"],
+        "latency": round(result["latency"], 4),
+    }
+    try:
+        report = validate_circuit(result["data"], repair=True)
+        record["repairs"] = report["repairs"]
+        record["issues"] = report["issues"]
+        if not report["ok"]:
+            errors = [i["message"] for i in report["issues"] if i["severity"] == "error"]
+            record["error"] = "Invalid circuit: " + "; ".join(errors)
+            return record
+        record["circuit"] = report["circuit"]
+        record["netlist"] = generator.build_and_save_netlist(
+            report["circuit"], target_folder=netlist_dir, validate=False,
+            file_name=netlist_file_name(record_id),
+        )
+    except Exception as e:
+        record["error"] = f"Netlist Error: {e}"
+    return record
+
+
+class Progress:
+    def __init__(self, total, skipped, interval):
+        self.total = total
+        self.skipped = skipped
+        self.interval = interval
+        self.processed = self.errors = self.cached = 0
+        self.start = self._last = time.monotonic()
+
+    def add(self, record):
+        self.processed += 1
+        self.errors += bool(record.get("error"))
+        self.cached += bool(record.get("cached"))
+
+    def report(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        elapsed = max(now - self.start, 1e-9)
+        remaining = self.total - self.skipped - self.processed
+        rate = self.processed / elapsed
+        eta = f", ~{remaining / rate:.0f}s left" if rate and remaining > 0 and not force else ""
+        print(
+            f"[{elapsed:7.1f}s] {self.skipped + self.processed}/{self.total} done "
+            f"({rate:.1f}/s{eta}), {self.errors} errors "
+            f"({self.errors / max(self.processed, 1):.1%}), {self.cached} cached",
+            flush=True,
+        )
+
+
+async def run_batch(input_path, output_path, netlist_dir="generated_circuits", client=None,
+                    prompt_field="prompt", id_field="id", concurrency=8, workers=4,
+                    requests_per_minute=None, tokens_per_minute=None, max_retries=5,
+                    use_cache=True, retry_errors=False, report_every=10.0):
+    """Process every prompt in `input_path` not yet recorded in `output_path`; returns the Progress"""
+    done = read_done(output_path, retry_errors)
+    progress = Progress(count_lines(input_path), len(done), report_every)
+    if done:
+        print(f"Resuming: {len(done)} prompts already recorded in {output_path}")
+
+    ids = {}       # generate_many index -> record id
+    invalid = []   # error records for unusable input lines
+
+    def prompts():
+        seen = set()
+        index = 0
+        for record_id, prompt, error in iter_prompts(input_path, prompt_field, id_field):
+            if record_id in done or record_id in seen:
+                continue
+            seen.add(record_id)
+            if error:
+                invalid.append({"id": record_id, "prompt": prompt, "error": error})
+                continue
+            ids[index] = record_id
+            index += 1
+            yield prompt
+
+    loop = asyncio.get_running_loop()
+    pending = set()
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        def emit(record):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            progress.add(record)
+
+        def harvest(tasks):
+            for task in tasks:
+                pending.discard(task)
+                emit(task.result())
+
+        async for result in generate_many(
+            prompts(), client=client, concurrency=concurrency,
+            requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute,
+            max_retries=max_retries, use_cache=use_cache,
+        ):
+            record_id = ids.pop(result["index"])
+            while invalid:
+                emit(invalid.pop())
+            if result["data"] is None:
+                emit({
+                    "id": record_id, "prompt": result["prompt"], "circuit": None, "netlist": None,
+                    "error": result["error"] or "Empty response", "attempts": result["attempts"],
+                    "cached": result["cached"], "latency": round(result["latency"], 4),
+                })
+            else:
+                pending.add(loop.run_in_executor(pool, finish_record, record_id, result, netlist_dir))
+            harvest([task for task in pending if task.done()])
+            if len(pending) >= workers * 2:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                harvest(finished)
+            progress.report()
+
+        if pending:
+            finished, _ = await asyncio.wait(pending)
+            harvest(finished)
+        while invalid:
+            emit(invalid.pop())
+    progress.report(force=True)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of prompts")
+    parser.add_argument("-o", "--output", required=True, help="results JSONL (appended to; also the checkpoint)")
+    parser.add_argument("--netlists", default="generated_circuits", help="netlist directory")
+    parser.add_argument("--prompt-field", default="prompt")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--concurrency", type=int, default=8, help="generation requests in flight")
+    parser.add_argument("--workers", type=int, default=4, help="netlist writer threads")
+    parser.add_argument("--rpm", type=int, help="requests per minute budget")
+    parser.add_argument("--tpm", type=int, help="tokens per minute budget")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache")
+    parser.add_argument("--retry-errors", action="store_true", help="re-run ids recorded with an error")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress lines")
+    parser.add_argument("--fake", action="store_true", help="dry run against fake_genai.FakeClient")
+    args = parser.parse_args()
+    configure_logging()
+
+    client = None
+    if args.fake:
+        from fake_genai import FakeClient
+        client = FakeClient()
+
+    try:
+        asyncio.run(run_batch(
+            args.input, args.output, netlist_dir=args.netlists, client=client,
+            prompt_field=args.prompt_field, id_field=args.id_field,
+            concurrency=args.concurrency, workers=args.workers,
+            requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+            max_retries=args.max_retries, use_cache=not args.no_cache,
+            retry_errors=args.retry_errors, report_every=args.report_every,
+        ))
+    except KeyboardInterrupt:
+        print("\nInterrupted; re-run the same command to resume.")
+
+
+if __name__ == "__main__":
+    main()
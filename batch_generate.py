@@ -0,0 +1,218 @@
+"""
+Asyncio batch generation: run many prompts through Gemini with bounded
+concurrency, a requests/tokens-per-minute budget and retries with
+exponential backoff + jitter on 429/5xx. Results are yielded as they
+complete.
+
+    async for result in generate_many(prompts, concurrency=16, requests_per_minute=600):
+        ...
+
+    results = generate_all(prompts, client=FakeClient())  # sync helper, input order
+"""
+import asyncio
+import random
+import time
+
+import gemini_to_net_v1 as generator
+from instrumentation import count, record_usage, span
+
+# Rough characters-per-token ratio used to budget tokens before a call
+CHARS_PER_TOKEN = 4
+
+
+class RateLimiter:
+    """Token-bucket limiter over requests/minute and tokens/minute budgets"""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, clock=time.monotonic):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._last = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._last
+        self._last = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60.0)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60.0)
+
+    def _wait_time(self, tokens):
+        wait = 0.0
+        if self.requests_per_minute and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            # A single request larger than the whole budget only waits for a full bucket
+            needed = min(tokens, self.tokens_per_minute)
+            if self._tokens < needed:
+                wait = max(wait, (needed - self._tokens) * 60.0 / self.tokens_per_minute)
+        return wait
+
+    async def acquire(self, tokens=1):
+        """Wait until one request costing `tokens` fits in the budget"""
+        # Waiters queue on the lock, so budget is granted in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+
+    def adjust(self, tokens):
+        """Charge (or refund, if negative) the difference between estimated and actual usage"""
+        if self.tokens_per_minute:
+            self._tokens -= tokens
+
+
+def status_code(exc):
+    """HTTP status carried by a google.genai (or fake) API error, if any"""
+    for attr in ("code", "status_code"):
+        code = getattr(exc, attr, None)
+        if isinstance(code, int):
+            return code
+    return None
+
+
+def is_retryable(exc):
+    code = status_code(exc)
+    if code is not None:
+        return code == 429 or 500 <= code < 600
+    return isinstance(exc, (asyncio.TimeoutError, ConnectionError))
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def estimate_tokens(prompt, output_tokens):
+    return (len(generator.SYSTEM_INSTR) + len(str(prompt))) // CHARS_PER_TOKEN + output_tokens
+
+
+async def _generate_one(client, index, prompt, limiter, max_retries, timeout,
+                        backoff_base, backoff_cap, output_tokens, use_cache):
+    result = {"index": index, "prompt": prompt, "data": None, "error": None,
+              "attempts": 0, "cached": False, "latency": 0.0}
+    start = time.perf_counter()
+
+    cache_key = generator.response_cache_key(prompt)
+    if use_cache:
+        cached = generator.response_cache.get(cache_key)
+        count("cache_lookups_total", cache="responses", result="miss" if cached is None else "hit")
+        if cached is not None:
+            result.update(data=cached, cached=True)
+            return result
+
+    estimate = estimate_tokens(prompt, output_tokens)
+    for attempt in range(max_retries + 1):
+        result["attempts"] = attempt + 1
+        await limiter.acquire(estimate)
+        try:
+            with span("llm_call"):
+                response = await asyncio.wait_for(
+                    client.aio.models.generate_content(
+                        model=generator.MODEL_NAME,
+                        contents=prompt,
+                        config=generator.GENERATION_CONFIG,
+                    ),
+                    timeout,
+                )
+        except Exception as e:
+            if attempt < max_retries and is_retryable(e):
+                count("llm_retries_total", status=status_code(e) or type(e).__name__)
+                await asyncio.sleep(backoff_delay(attempt, backoff_base, backoff_cap))
+                continue
+            result["error"] = f"API Error: {e}"
+            count("llm_requests_total", outcome="api_error")
+            break
+
+        record_usage(response)
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None and getattr(usage, "total_token_count", None):
+            limiter.adjust(usage.total_token_count - estimate)
+
+        if generator.is_safety_blocked(response):
+            result["error"] = "SAFETY"
+            count("llm_requests_total", outcome="safety")
+            count("safety_blocks_total")
+            break
+        try:
+            with span("parse"):
+                result["data"] = generator.parse_response(response, warn=None)
+        except ValueError as e:
+            result["error"] = f"Parse Error: {e}"
+            count("llm_requests_total", outcome="parse_error")
+            break
+        count("llm_requests_total", outcome="ok" if result["data"] is not None else "empty")
+        if result["data"] is not None and use_cache:
+            generator.response_cache.set(cache_key, result["data"])
+        break
+
+    result["latency"] = time.perf_counter() - start
+    return result
+
+
+async def generate_many(prompts, client=None, concurrency=8, requests_per_minute=None,
+                        tokens_per_minute=None, max_retries=5, timeout=120.0,
+                        backoff_base=1.0, backoff_cap=60.0, output_tokens=1024, use_cache=True):
+    """
+    Async generator over result dicts (index, prompt, data, error, attempts,
+    cached, latency), yielded in completion order.
+
+    `prompts` may be any iterable, including a lazy one; at most
+    `concurrency` prompts are pulled from it and in flight at a time.
+    """
+    client = client or generator.get_client()
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    source = enumerate(prompts)
+    results = asyncio.Queue(maxsize=concurrency * 2)
+    done = object()
+
+    async def worker():
+        try:
+            # next() never awaits, so workers can share the iterator safely
+            for index, prompt in source:
+                result = await _generate_one(
+                    client, index, prompt, limiter, max_retries, timeout,
+                    backoff_base, backoff_cap, output_tokens, use_cache,
+                )
+                await results.put(result)
+        except Exception as e:
+            await results.put(e)
+            return
+        await results.put(done)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+    try:
+        remaining = len(workers)
+        while remaining:
+            item = await results.get()
+            if item is done:
+                remaining -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+def generate_all(prompts, **kwargs):
+    """Synchronous wrapper: run generate_many and return results in input order"""
+    async def collect():
+        return [result async for result in generate_many(prompts, **kwargs)]
+
+    results = asyncio.run(collect())
+    results.sort(key=lambda r: r["index"])
+    return results
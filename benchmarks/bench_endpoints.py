@@ -0,0 +1,85 @@
+"""
+Requests/sec for /api/circuit/<id> through the Flask test client.
+
+    python benchmarks/bench_endpoints.py
+    python benchmarks/bench_endpoints.py --components 20000 --seconds 2 --json endpoints.json
+
+Compares the old per-request jsonify of an in-memory dict with the
+pre-serialized response (full 200 and If-None-Match -> 304), for a small
+sample circuit and a large synthetic one. Runs against a throwaway store.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def synthetic_circuit(n):
+    components = [{"id": "V1", "type": "voltage_source", "value": "5V", "polarity": "dc"}]
+    components += [{"id": f"R{i}", "type": "resistor", "value": "1kΩ"} for i in range(n)]
+    connections = [{"from": "V1.positive", "to": "R0.1"}]
+    connections += [{"from": f"R{i - 1}.2", "to": f"R{i}.1"} for i in range(1, n)]
+    return {"name": f"Synthetic ladder ({n})", "components": components, "connections": connections}
+
+
+def rate(client, url, seconds, headers=None):
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        response = client.get(url, headers=headers or {})
+        assert response.status_code in (200, 304), response.status_code
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--components", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    os.environ["CIRCUIT_DB"] = os.path.join(tempfile.mkdtemp(), "bench.sqlite")
+    from flask import jsonify
+    import server
+
+    big = synthetic_circuit(args.components)
+    server.store.put("synthetic", big)
+    circuits = {"simple_led": server.SAMPLE_CIRCUITS["simple_led"], "synthetic": big}
+
+    # The pre-change handler: jsonify the dict on every request
+    @server.app.route("/bench/legacy/<circuit_id>")
+    def legacy(circuit_id):
+        return jsonify(circuits[circuit_id])
+
+    client = server.app.test_client()
+    results = []
+    for circuit_id in circuits:
+        etag = client.get(f"/api/circuit/{circuit_id}").headers["ETag"]
+        row = {
+            "circuit": circuit_id,
+            "legacy_jsonify_rps": rate(client, f"/bench/legacy/{circuit_id}", args.seconds),
+            "prepared_200_rps": rate(client, f"/api/circuit/{circuit_id}", args.seconds),
+            "prepared_gzip_rps": rate(client, f"/api/circuit/{circuit_id}", args.seconds,
+                                      {"Accept-Encoding": "gzip"}),
+            "prepared_304_rps": rate(client, f"/api/circuit/{circuit_id}", args.seconds,
+                                     {"If-None-Match": etag}),
+        }
+        results.append(row)
+        print(f"{circuit_id:<12} legacy {row['legacy_jsonify_rps']:8.0f} req/s   "
+              f"prepared {row['prepared_200_rps']:8.0f}   gzip {row['prepared_gzip_rps']:8.0f}   "
+              f"304 {row['prepared_304_rps']:8.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
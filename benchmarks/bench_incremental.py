@@ -0,0 +1,114 @@
+"""
+Single-value edits: full regeneration vs. the incremental paths.
+
+    python benchmarks/bench_incremental.py
+    python benchmarks/bench_incremental.py --sizes 1000,10000,50000 --families rc_ladder --json incremental.json
+
+For each synthetic circuit (benchmarks/synthetic_circuits.py) one random
+resistor value is changed per edit, and the time to get the new netlist
+file and the new DC operating point is measured:
+
+  netlist   build_and_save_netlist() vs. IncrementalNetlist.update()
+  op        mna_solver.dc_operating_point() vs. IncrementalOperatingPoint
+            update() + result()
+
+Incremental timings include diffing the whole circuit JSON; "op set"
+uses set_values() with the edit already known. Reports medians in ms.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_circuits import RESISTORS, make_circuit  # noqa: E402
+
+
+def median_ms(fn, edits):
+    samples = []
+    for _ in range(edits):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3
+
+
+def run(family, size, edits, full_edits, seed):
+    import gemini_to_net_v1 as generator
+    from incremental import IncrementalNetlist, IncrementalOperatingPoint
+    from mna_solver import dc_operating_point
+
+    rng = random.Random(seed)
+    data = make_circuit(family, size, seed)
+    resistors = [c for c in data["components"] if c["type"] == "R"]
+
+    def edit():
+        comp = rng.choice(resistors)
+        comp["value"] = rng.choice([v for v in RESISTORS if v != comp["value"]])
+        return comp
+
+    scratch = tempfile.mkdtemp(prefix="synaptic-incremental-")
+    try:
+        row = {"family": family, "components": len(data["components"])}
+        row["netlist_full_ms"] = median_ms(
+            lambda: (edit(), generator.build_and_save_netlist(data, target_folder=scratch, file_name="full.cir")),
+            full_edits)
+        netlist = IncrementalNetlist(os.path.join(scratch, "incremental.cir"))
+        netlist.update(data)
+        row["netlist_incremental_ms"] = median_ms(lambda: (edit(), netlist.update(data)), edits)
+
+        row["op_full_ms"] = median_ms(lambda: (edit(), dc_operating_point(data)), full_edits)
+        op = IncrementalOperatingPoint(data)
+        row["op_incremental_ms"] = median_ms(lambda: (edit(), op.update(data), op.result()), edits)
+
+        def known_edit():
+            comp = edit()
+            op.set_values({f"R{comp['id']}": comp["value"]})
+            op.solve()
+
+        row["op_set_values_ms"] = median_ms(known_edit, edits)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated component counts")
+    parser.add_argument("--families", default="rc_ladder,random_mesh")
+    parser.add_argument("--edits", type=int, default=50, help="edits timed per incremental path")
+    parser.add_argument("--full-edits", type=int, default=5, help="edits timed per full path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="synaptic-incremental-env-")
+    os.environ["CIRCUIT_DB"] = os.path.join(scratch, "circuits.sqlite")
+    os.environ["SYNAPTIC_CACHE_DIR"] = os.path.join(scratch, "cache")
+    rows = []
+    print(f"{'family':<12} {'n':>7} {'netlist full':>13} {'incremental':>12} {'op full':>10} {'incremental':>12} {'op set':>8}  (ms)")
+    try:
+        for family in args.families.split(","):
+            for size in (int(s) for s in args.sizes.split(",")):
+                row = run(family, size, args.edits, args.full_edits, args.seed)
+                rows.append(row)
+                print(f"{family:<12} {row['components']:>7} {row['netlist_full_ms']:>13.2f} "
+                      f"{row['netlist_incremental_ms']:>12.2f} {row['op_full_ms']:>10.2f} "
+                      f"{row['op_incremental_ms']:>12.2f} {row['op_set_values_ms']:>8.2f}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Offline load test of the prompt -> netlist pipeline against a replayed Gemini.
+
+    python benchmarks/bench_pipeline.py --requests 500 --concurrency 32
+    python benchmarks/bench_pipeline.py --cassette cassette.jsonl --latency empirical \\
+        --errors 429=0.05,safety=0.01,malformed=0.02 --mode batch --json pipeline.json
+
+Responses come from genai_replay.ReplayClient: a recorded cassette, or
+(without --cassette) small synthetic circuits from
+benchmarks/synthetic_circuits.py. Every prompt is distinct and caching
+is off, so each request makes one model call and writes one netlist.
+
+  threads   generate_netlist() from a pool of --concurrency threads (the
+            interactive path; no retries)
+  batch     batch_cli.run_batch() (async generation with retries and rate
+            limits, netlists written in a worker pool)
+
+Reports throughput, latency percentiles (p50/p90/p99/max) and outcome
+counts; --json writes them with the replay statistics.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_circuits import FAMILIES, make_circuit  # noqa: E402
+
+
+def synthetic_records(count=32, seed=0):
+    """Cassette records answering with small synthetic circuits"""
+    records = []
+    families = sorted(FAMILIES)
+    for i in range(count):
+        family = families[i % len(families)]
+        data = make_circuit(family, 6 + (i * 7) % 40, seed + i)
+        text = json.dumps(data)
+        records.append({"key": None, "prompt": f"synthetic {i}", "text": text, "finish_reason": "STOP",
+                        "usage": {"prompt_tokens": 40, "output_tokens": len(text) // 4}, "latency": 0.5})
+    return records
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def at(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": at(0.50), "p90": at(0.90), "p99": at(0.99), "max": ordered[-1],
+            "mean": sum(ordered) / len(ordered)}
+
+
+def run_threads(generator, prompts, concurrency, netlist_dir):
+    outcomes = {"ok": 0, "no_circuit": 0, "invalid": 0}
+    latencies = []
+
+    def one(prompt):
+        start = time.perf_counter()
+        data, path = generator.generate_netlist(prompt, target_folder=netlist_dir, use_cache=False, dedupe=False)
+        return time.perf_counter() - start, data, path
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, data, path in pool.map(one, prompts):
+            latencies.append(latency)
+            outcomes["ok" if path else "no_circuit" if data is None else "invalid"] += 1
+    return latencies, outcomes
+
+
+def run_batch_mode(client, prompts, concurrency, workers, netlist_dir, scratch):
+    from batch_cli import run_batch
+
+    input_path = os.path.join(scratch, "prompts.jsonl")
+    output_path = os.path.join(scratch, "results.jsonl")
+    with open(input_path, "w", encoding="utf-8") as f:
+        for i, prompt in enumerate(prompts):
+            f.write(json.dumps({"id": i, "prompt": prompt}) + "\n")
+    asyncio.run(run_batch(input_path, output_path, netlist_dir=netlist_dir, client=client,
+                          concurrency=concurrency, workers=workers, use_cache=False,
+                          max_retries=5, report_every=3600))
+    latencies = []
+    outcomes = {}
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            latencies.append(record.get("latency", 0.0))
+            error = record.get("error")
+            kind = "ok" if not error else error.split(":")[0].split()[0]
+            outcomes[kind] = outcomes.get(kind, 0) + 1
+    return latencies, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette", help="recorded JSONL cassette (default: synthetic responses)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4, help="netlist writer threads (batch mode)")
+    parser.add_argument("--mode", choices=("threads", "batch"), default="threads")
+    parser.add_argument("--latency", default="lognormal:0.05,0.5", help="replay latency spec (see genai_replay)")
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--errors", default="", help="e.g. 429=0.05,safety=0.01,malformed=0.02")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="synaptic-pipeline-")
+    os.environ["CIRCUIT_DB"] = os.path.join(scratch, "circuits.sqlite")
+    os.environ["SYNAPTIC_CACHE_DIR"] = os.path.join(scratch, "cache")
+    import gemini_to_net_v1 as generator
+    from genai_replay import ReplayClient
+
+    errors = {}
+    for item in args.errors.split(","):
+        if "=" in item:
+            kind, _, p = item.partition("=")
+            errors[kind.strip()] = float(p)
+    client = ReplayClient(args.cassette or synthetic_records(seed=args.seed), latency=args.latency,
+                          errors=errors, chunk_size=args.chunk_size, seed=args.seed)
+    generator.set_client(client)
+    prompts = [f"Design circuit #{i}: a small analog test network" for i in range(args.requests)]
+    netlist_dir = os.path.join(scratch, "netlists")
+
+    start = time.perf_counter()
+    try:
+        # Injected failures are logged (and batch_cli prints progress); keep them out of the report
+        logging.disable(logging.ERROR)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if args.mode == "threads":
+                latencies, outcomes = run_threads(generator, prompts, args.concurrency, netlist_dir)
+            else:
+                latencies, outcomes = run_batch_mode(client, prompts, args.concurrency, args.workers,
+                                                     netlist_dir, scratch)
+        elapsed = time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+        generator.set_client(None)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    summary = {
+        "mode": args.mode,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "latency_spec": args.latency,
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput_rps": args.requests / elapsed if elapsed else 0.0,
+        "latency": percentiles(latencies),
+        "outcomes": outcomes,
+        "replay": client.stats,
+    }
+    lat = summary["latency"]
+    print(f"{args.mode}: {args.requests} requests in {elapsed:.2f}s ({summary['throughput_rps']:.1f} req/s)")
+    print(f"latency p50 {lat['p50'] * 1e3:.1f} ms  p90 {lat['p90'] * 1e3:.1f} ms  "
+          f"p99 {lat['p99'] * 1e3:.1f} ms  max {lat['max'] * 1e3:.1f} ms")
+    print("outcomes: " + ", ".join(f"{k} {v}" for k, v in sorted(outcomes.items())))
+    print("replay: " + ", ".join(f"{k} {v}" for k, v in client.stats.items() if v))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
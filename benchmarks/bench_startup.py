@@ -0,0 +1,81 @@
+"""
+Cold-start benchmark: time `import <module>` in fresh interpreters.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --max-ms 150 --json startup.json
+
+Each run is a new `python -X importtime` process, so nothing is cached in
+sys.modules. The median wall time and the slowest imports (by cumulative
+time) are reported per module. With --max-ms the exit status is non-zero
+when any median exceeds the budget, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["gemini_to_net_v1", "netlist_writer", "batch_generate", "server"]
+
+
+def time_import(module, runs):
+    walls = []
+    slowest = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        walls.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+        # "import time: self [us] | cumulative | imported package"
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            name = name.strip()
+            slowest[name] = max(slowest.get(name, 0), int(cumulative) / 1000)
+    top = sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": statistics.median(walls),
+        "min_ms": min(walls),
+        "slowest_imports_ms": dict(top),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="fail if any median import time exceeds this")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        result = time_import(module, args.runs)
+        results.append(result)
+        print(f"{module:<20} median {result['median_ms']:8.1f} ms   min {result['min_ms']:8.1f} ms")
+        for name, ms in result["slowest_imports_ms"].items():
+            print(f"    {name:<30} {ms:8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.max_ms is not None:
+        over = [r["module"] for r in results if r["median_ms"] > args.max_ms]
+        if over:
+            print(f"Startup budget of {args.max_ms} ms exceeded by: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+End-to-end benchmark suite over seeded synthetic circuits.
+
+    python benchmarks/run_benchmarks.py                        # -> benchmark_results.json
+    python benchmarks/run_benchmarks.py --sizes 10,1000 --families rc_ladder -o quick.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --threshold 1.2
+
+For every family x size (benchmarks/synthetic_circuits.py) it times:
+
+  netlist_emit        write_netlist() of the generator schema into memory
+  build_and_save      build_and_save_netlist() incl. validation, to a temp dir
+  layout              compute_layout() of the visualizer schema, cache cleared
+                      first so the layout engine itself is timed
+  validate            validate_circuit(), both schemas
+  topology_hash       topology_hash() of the visualizer schema
+  json_dumps/loads    the server's dump_json() and json.loads, visualizer schema
+  columnar_encode/    circuit_wire.encode() / decode(), visualizer schema
+    decode            (json_dumps and columnar_encode rows also record the
+                      payload size in "bytes")
+  endpoint_cold       a store write, then GET /api/circuit/<id> (Flask test client)
+  endpoint_warm       the same GET served from the prepared-response cache
+  endpoint_304        the same GET with If-None-Match
+
+Each timing is the per-call minimum and median of --repeat samples (the
+call count per sample grows until a sample takes ~0.2 s, as timeit does).
+Results are written as JSON with the interpreter, platform and git
+revision. --compare prints the ratio to an earlier results file and exits
+with status 1 if any median got slower than --threshold times.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_circuits import FAMILIES, make_circuit  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+
+def measure(fn, repeat):
+    """Per-call seconds: (min, median, calls per sample)"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    samples = [t / number for t in timer.repeat(repeat, number)]
+    return min(samples), statistics.median(samples), number
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(families, sizes, repeat, seed, only=None, report=print):
+    # Throwaway library and caches, set before the server module is imported
+    scratch = tempfile.mkdtemp(prefix="synaptic-bench-")
+    os.environ["CIRCUIT_DB"] = os.path.join(scratch, "circuits.sqlite")
+    os.environ["SYNAPTIC_CACHE_DIR"] = os.path.join(scratch, "cache")
+
+    import circuit_wire
+    import gemini_to_net_v1 as generator
+    import server
+    from circuit_layout import compute_layout, layout_cache
+    from circuit_validator import validate_circuit
+    from netlist_writer import write_netlist
+    from prepared_responses import dump_json
+    from topology_hash import topology_hash
+
+    client = server.app.test_client()
+    netlist_dir = os.path.join(scratch, "netlists")
+    results = []
+
+    def record(name, family, size, schema, fn, payload=None):
+        if only and name not in only:
+            return
+        best, median, number = measure(fn, repeat)
+        results.append({
+            "benchmark": name, "family": family, "components": size, "schema": schema,
+            "seconds_min": best, "seconds_median": median, "calls_per_sample": number, "samples": repeat,
+        })
+        if payload is not None:
+            results[-1]["bytes"] = len(payload)
+        report(f"{name:<16} {family:<17} {size:>7} {schema:<10} {median * 1e3:12.3f} ms")
+
+    try:
+        for family in families:
+            for size in sizes:
+                data = make_circuit(family, size, seed)
+                visual = make_circuit(family, size, seed, schema="visualizer")
+                circuit_id = f"bench_{family}_{size}"
+
+                record("netlist_emit", family, size, "generator",
+                       lambda: write_netlist(data, io.StringIO(), warn=None))
+                record("build_and_save", family, size, "generator",
+                       lambda: generator.build_and_save_netlist(data, target_folder=netlist_dir,
+                                                                file_name="bench.cir"))
+                record("layout", family, size, "visualizer",
+                       lambda: (layout_cache.clear(), compute_layout(visual)))
+                record("validate", family, size, "generator", lambda: validate_circuit(data))
+                record("validate", family, size, "visualizer", lambda: validate_circuit(visual))
+                record("topology_hash", family, size, "visualizer", lambda: topology_hash(visual))
+                body = dump_json(visual)
+                record("json_dumps", family, size, "visualizer", lambda: dump_json(visual), payload=body)
+                record("json_loads", family, size, "visualizer", lambda: json.loads(body))
+                wire = circuit_wire.encode(visual)
+                record("columnar_encode", family, size, "visualizer", lambda: circuit_wire.encode(visual), payload=wire)
+                record("columnar_decode", family, size, "visualizer", lambda: circuit_wire.decode(wire))
+
+                server.store.put(circuit_id, visual)
+                url = f"/api/circuit/{circuit_id}"
+
+                def fetch(headers=None, expect=200):
+                    status = client.get(url, headers=headers or {}).status_code
+                    assert status == expect, f"GET {url} -> {status}"
+
+                def cold():
+                    server.store.put(circuit_id, visual)
+                    fetch()
+
+                record("endpoint_cold", family, size, "visualizer", cold)
+                etag = client.get(url).headers["ETag"]
+                record("endpoint_warm", family, size, "visualizer", fetch)
+                record("endpoint_304", family, size, "visualizer",
+                       lambda: fetch({"If-None-Match": etag}, expect=304))
+                server.store.delete(circuit_id)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print median ratios against a baseline file; returns the regressed rows"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def key(row):
+        return row["benchmark"], row["family"], row["components"], row["schema"]
+
+    before = {key(row): row for row in baseline.get("results", [])}
+    regressions = []
+    print(f"\nCompared with {baseline_path} (ratio = new / old median):")
+    for row in results:
+        old = before.get(key(row))
+        if old is None or not old["seconds_median"]:
+            continue
+        ratio = row["seconds_median"] / old["seconds_median"]
+        flag = "  SLOWER" if ratio > threshold else ""
+        print(f"  {row['benchmark']:<16} {row['family']:<17} {row['components']:>7} {row['schema']:<10} {ratio:6.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(dict(row, baseline_median=old["seconds_median"], ratio=ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma-separated component counts")
+    parser.add_argument("--families", default=",".join(FAMILIES), help="comma-separated circuit families")
+    parser.add_argument("--only", help="comma-separated benchmark names to run")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per timing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    families = [f for f in args.families.split(",") if f]
+    unknown = set(families) - set(FAMILIES)
+    if unknown:
+        parser.error(f"unknown families: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    only = set(args.only.split(",")) if args.only else None
+
+    start = time.time()
+    results = run_suite(families, sizes, args.repeat, args.seed, only)
+    output = {
+        "meta": {
+            "created_at": start,
+            "duration": time.time() - start,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "git_revision": git_revision(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"\nWrote {len(results)} timings to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Seeded synthetic circuits for benchmarks, in either JSON schema.
+
+    python benchmarks/synthetic_circuits.py rc_ladder 1000 > ladder.json
+    python benchmarks/synthetic_circuits.py random_mesh 5000 --schema visualizer --seed 7 -o mesh.json
+
+Families (n is the approximate component count):
+  rc_ladder          source driving n/2 series-R / shunt-C sections
+  transistor_array   NPN common-emitter stages (Q + collector and base
+                     resistors) sharing one supply and one input
+  random_mesh        random R/C/L mesh over ~n/3 nets: a random resistive
+                     spanning tree keeps it connected, the rest are random
+                     chords (inductors always in series with a resistor)
+
+The same (family, n, seed) always gives the same circuit. The generator
+schema is built directly; the visualizer schema is the same circuit
+converted through CircuitIR (ground symbol included).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from circuit_ir import CircuitIR  # noqa: E402
+
+RESISTORS = ("100", "220", "470", "1k", "2.2k", "4.7k", "10k", "47k", "100k")
+CAPACITORS = ("1n", "10n", "100n", "1u", "10u")
+INDUCTORS = ("1u", "10u", "100u", "1m")
+
+
+def rc_ladder(n, rng):
+    components = [{"type": "V", "id": "1", "nodes": ["n0", "0"], "value": "PULSE(0 5 0 1u 1u 1m 2m)"}]
+    for i in range(max(1, (n - 1) // 2)):
+        components.append({"type": "R", "id": str(i + 1), "nodes": [f"n{i}", f"n{i + 1}"], "value": rng.choice(RESISTORS)})
+        components.append({"type": "C", "id": str(i + 1), "nodes": [f"n{i + 1}", "0"], "value": rng.choice(CAPACITORS)})
+    return {"circuit_name": f"RC ladder {n}", "components": components, "simulation": ".tran 10u 5m"}
+
+
+def transistor_array(n, rng):
+    components = [
+        {"type": "V", "id": "CC", "nodes": ["vcc", "0"], "value": "12"},
+        {"type": "V", "id": "IN", "nodes": ["in", "0"], "value": "5"},
+    ]
+    for i in range(max(1, (n - 2) // 3)):
+        components.append({"type": "R", "id": f"C{i}", "nodes": ["vcc", f"c{i}"], "value": rng.choice(RESISTORS)})
+        components.append({"type": "R", "id": f"B{i}", "nodes": ["in", f"b{i}"], "value": rng.choice(RESISTORS[3:])})
+        components.append({"type": "Q", "id": str(i), "nodes": [f"c{i}", f"b{i}", "0"], "value": "2N2222"})
+    return {"circuit_name": f"Transistor array {n}", "components": components, "simulation": ".op"}
+
+
+def random_mesh(n, rng):
+    nets = max(2, n // 3)
+    names = ["0"] + [f"m{k}" for k in range(1, nets)]
+    components = [{"type": "V", "id": "1", "nodes": [names[1], "0"], "value": "5"}]
+    counters = {"R": 0, "C": 0, "L": 0}
+    degree = dict.fromkeys(names, 0)
+    degree[names[1]] = degree["0"] = 1
+
+    def add(ctype, a, b):
+        counters[ctype] += 1
+        values = {"R": RESISTORS, "C": CAPACITORS, "L": INDUCTORS}[ctype]
+        components.append({"type": ctype, "id": str(counters[ctype]), "nodes": [a, b], "value": rng.choice(values)})
+        degree[a] = degree.get(a, 0) + 1
+        degree[b] = degree.get(b, 0) + 1
+
+    def chord(a, b):
+        if rng.random() < 0.1:
+            # Inductors get a series resistor so no loop is made of sources and inductors only
+            mid = f"x{counters['L'] + 1}"
+            add("L", a, mid)
+            add("R", mid, b)
+        else:
+            add(rng.choices("RC", weights=(2, 1))[0], a, b)
+
+    # Resistive spanning tree so every net has a DC path, then random chords
+    # (leaves of the tree first, so no terminal is left dangling)
+    order = names[:]
+    rng.shuffle(order)
+    for k in range(1, len(order)):
+        add("R", order[k], order[rng.randrange(k)])
+    for name in names:
+        if degree[name] < 2:
+            chord(name, rng.choice([other for other in rng.sample(names, 2) if other != name]))
+    while len(components) < n:
+        chord(*rng.sample(names, 2))
+    return {"circuit_name": f"Random mesh {n}", "components": components, "simulation": ".op"}
+
+
+FAMILIES = {
+    "rc_ladder": rc_ladder,
+    "transistor_array": transistor_array,
+    "random_mesh": random_mesh,
+}
+
+
+def make_circuit(family, n, seed=0, schema="generator"):
+    """Circuit `family` with about `n` components, in the "generator" or "visualizer" schema"""
+    data = FAMILIES[family](n, random.Random(f"{family}:{n}:{seed}"))
+    if schema == "visualizer":
+        return CircuitIR.from_generator(data).to_visualizer()
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("family", choices=sorted(FAMILIES))
+    parser.add_argument("components", type=int)
+    parser.add_argument("--schema", choices=("generator", "visualizer"), default="generator")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write here instead of stdout")
+    args = parser.parse_args()
+
+    circuit = make_circuit(args.family, args.components, args.seed, args.schema)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(circuit, f)
+    else:
+        json.dump(circuit, sys.stdout)
+        print()
+
+
+if __name__ == "__main__":
+    main()
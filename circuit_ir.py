@@ -0,0 +1,368 @@
+"""
+Compact intermediate representation shared by both circuit schemas.
+
+    visualizer: {"name", "components": [{"id", "type", "value"}],
+                 "connections": [{"from": "R1.2", "to": "LED1.anode"}],
+                 "simulation" (optional)}
+    generator:  {"circuit_name", "components": [{"type", "id", "nodes", "value"}],
+                 "simulation"}
+
+Components are __slots__ records with a canonical SPICE-letter type.
+Terminals are numbered 0..T-1; terminal roles and net names are interned,
+and all connectivity lives in flat array('i') tables in CSR form
+(start offsets + packed rows). Endpoint strings are resolved once, on input:
+
+    ir = CircuitIR.from_visualizer(circuit)
+    for ci in ir.neighbors(ir.index["R1"]):
+        ir.components[ci].id
+    ir.to_generator()
+"""
+from array import array
+from collections import Counter
+from itertools import accumulate
+import sys
+
+# Visualizer type <-> canonical type
+VISUAL_TYPES = {
+    "resistor": "R",
+    "capacitor": "C",
+    "inductor": "L",
+    "voltage_source": "V",
+    "current_source": "I",
+    "led": "D",
+    "diode": "D",
+    "transistor": "Q",
+    "ground": "GND",
+}
+VISUAL_NAMES = {
+    "R": "resistor",
+    "C": "capacitor",
+    "L": "inductor",
+    "V": "voltage_source",
+    "I": "current_source",
+    "D": "led",
+    "Q": "transistor",
+    "GND": "ground",
+}
+
+# Terminal roles per type, in the generator's `nodes` order
+TERMINALS = {
+    "R": ("1", "2"),
+    "C": ("1", "2"),
+    "L": ("1", "2"),
+    "V": ("positive", "negative"),
+    "I": ("positive", "negative"),
+    "D": ("anode", "cathode"),
+    "Q": ("collector", "base", "emitter"),
+    "GND": ("terminal",),
+}
+
+GROUND = "0"
+GROUND_NAMES = {"0", "gnd", "ground"}
+
+# Keys the converters handle themselves; anything else rides along in `extra`
+_VISUAL_KEYS = ("id", "type", "value")
+_GENERATOR_KEYS = ("type", "id", "nodes", "value")
+
+
+def net_name(node):
+    """Net name of a generator-schema node; every ground alias becomes "0" """
+    name = str(node)
+    # Most names are longer than any alias; skip lower() for them
+    return GROUND if len(name) <= 6 and name.lower() in GROUND_NAMES else name
+
+
+class Component:
+    __slots__ = ("id", "type", "value", "extra")
+
+    def __init__(self, id, type, value="", extra=None):
+        self.id = id
+        self.type = type
+        self.value = value
+        self.extra = extra
+
+    def __repr__(self):
+        return f"Component({self.id!r}, {self.type!r}, {self.value!r})"
+
+
+def _csr(rows, keys):
+    """Group 0..len(keys)-1 by key: returns (start, packed) arrays"""
+    counts = Counter(keys)
+    start = array("i", accumulate(map(counts.__getitem__, range(rows)), initial=0))
+    # A stable sort keeps each row in item order
+    packed = array("i", sorted(range(len(keys)), key=keys.__getitem__))
+    return start, packed
+
+
+class CircuitIR:
+    """
+    Tables (T terminals, N nets, W wires):
+      term_comp, term_role, term_net   per terminal (role -> self.roles)
+      term_start / comp_terms          terminals of each component (CSR)
+      net_start / net_terms            terminals on each net (CSR)
+      wire_a, wire_b                   terminal pairs joined by a wire
+      adj_start / adj                  components sharing a wire (CSR)
+
+    Generator circuits have no explicit wires; wires() chains the terminals
+    of each net. Wires and adjacency are built on first use.
+    """
+
+    def __init__(self, name=""):
+        self.name = name
+        self.simulation = None
+        self.components = []
+        self.index = {}
+        self.roles = []
+        self.net_names = []
+        self.term_start = self.comp_terms = None
+        self.term_comp = array("i")
+        self.term_role = array("i")
+        self.term_net = array("i")
+        self.net_start = self.net_terms = None
+        self.wire_a = array("i")
+        self.wire_b = array("i")
+        self.adj_start = self.adj = None
+        self.unresolved = []   # endpoints that named no known terminal
+        self._role_ids = {}
+
+    def __len__(self):
+        return len(self.components)
+
+    def _role(self, role):
+        rid = self._role_ids.get(role)
+        if rid is None:
+            rid = self._role_ids[role] = len(self.roles)
+            self.roles.append(sys.intern(role))
+        return rid
+
+    def _add_component(self, cid, ctype, value, extra):
+        ci = len(self.components)
+        self.components.append(Component(cid, sys.intern(ctype), value, extra))
+        self.index[cid] = ci
+        return ci
+
+    def _add_terminal(self, ci, role):
+        self.term_comp.append(ci)
+        self.term_role.append(self._role(role))
+        return len(self.term_comp) - 1
+
+    # -- lookups ----------------------------------------------------------
+
+    def terminals(self, ci):
+        return self.comp_terms[self.term_start[ci]:self.term_start[ci + 1]]
+
+    def terminal(self, cid, role):
+        """Terminal number for "cid.role", or -1"""
+        ci = self.index.get(cid)
+        rid = self._role_ids.get(role)
+        if ci is None or rid is None:
+            return -1
+        for t in self.terminals(ci):
+            if self.term_role[t] == rid:
+                return t
+        return -1
+
+    def role(self, t):
+        return self.roles[self.term_role[t]]
+
+    def endpoint(self, t):
+        return f"{self.components[self.term_comp[t]].id}.{self.roles[self.term_role[t]]}"
+
+    def nodes(self, ci):
+        """Net names of component ci's terminals, in role order"""
+        return [self.net_names[self.term_net[t]] for t in self.terminals(ci)]
+
+    def net_terminals(self, net):
+        return self.net_terms[self.net_start[net]:self.net_start[net + 1]]
+
+    def neighbors(self, ci):
+        if self.adj is None:
+            self._build_adjacency()
+        return self.adj[self.adj_start[ci]:self.adj_start[ci + 1]]
+
+    def wires(self):
+        """(wire_a, wire_b) terminal arrays"""
+        if self.wire_a is None:
+            # One wire between consecutive terminals on each net
+            terms, nets = self.net_terms, self.term_net
+            self.wire_a = array("i")
+            self.wire_b = array("i")
+            for a, b in zip(terms, terms[1:]):
+                if nets[a] == nets[b]:
+                    self.wire_a.append(a)
+                    self.wire_b.append(b)
+        return self.wire_a, self.wire_b
+
+    # -- construction -----------------------------------------------------
+
+    @classmethod
+    def from_visualizer(cls, circuit):
+        ir = cls(circuit.get("name", ""))
+        ir.simulation = circuit.get("simulation")
+        term_of = {}   # "R1.2" -> terminal
+        term_comp, term_role = ir.term_comp, ir.term_role
+        role_ids = {}  # type -> ((role, role id), ...)
+        for comp in circuit.get("components", []):
+            cid = comp["id"]
+            ctype = VISUAL_TYPES.get(comp.get("type"), str(comp.get("type", "")))
+            extra = {k: v for k, v in comp.items() if k not in _VISUAL_KEYS} if len(comp) > 3 else None
+            ci = ir._add_component(cid, ctype, str(comp.get("value", "")), extra or None)
+            roles = role_ids.get(ctype)
+            if roles is None:
+                roles = role_ids[ctype] = tuple((role, ir._role(role)) for role in TERMINALS.get(ctype, ()))
+            for role, rid in roles:
+                term_of[f"{cid}.{role}"] = len(term_comp)
+                term_comp.append(ci)
+                term_role.append(rid)
+
+        for conn in circuit.get("connections", []):
+            a = term_of.get(conn.get("from"))
+            if a is None:
+                a = ir._extra_terminal(term_of, conn.get("from"))
+            b = term_of.get(conn.get("to"))
+            if b is None:
+                b = ir._extra_terminal(term_of, conn.get("to"))
+            if a is not None and b is not None:
+                ir.wire_a.append(a)
+                ir.wire_b.append(b)
+
+        ir._assign_nets()
+        return ir
+
+    @classmethod
+    def from_json(cls, circuit):
+        """Either schema: visualizer circuits are the ones with "connections" """
+        if "connections" in circuit:
+            return cls.from_visualizer(circuit)
+        return cls.from_generator(circuit)
+
+    def _extra_terminal(self, term_of, end):
+        """Terminal for an endpoint whose role its type doesn't list (split only here)"""
+        cid, _, role = str(end).partition(".")
+        ci = self.index.get(cid)
+        if ci is None:
+            self.unresolved.append(end)
+            return None
+        t = term_of[end] = self._add_terminal(ci, role)
+        return t
+
+    @classmethod
+    def from_generator(cls, circuit):
+        ir = cls(circuit.get("circuit_name", ""))
+        ir.simulation = circuit.get("simulation")
+        net_ids = {}   # raw node value -> net
+        term_comp, term_role, term_net = ir.term_comp, ir.term_role, ir.term_net
+        role_ids = {}  # (type, terminal count) -> role ids
+        components, index = ir.components, ir.index
+        for comp in circuit.get("components", []):
+            ctype = sys.intern(str(comp.get("type", "")).upper())
+            nodes = comp.get("nodes") or []
+            roles = role_ids.get((ctype, len(nodes)))
+            if roles is None:
+                base = TERMINALS.get(ctype, ())
+                roles = role_ids[ctype, len(nodes)] = [
+                    ir._role(base[i] if i < len(base) else str(i + 1)) for i in range(len(nodes))]
+            extra = {k: v for k, v in comp.items() if k not in _GENERATOR_KEYS} if len(comp) > 4 else None
+            cid = ctype + str(comp.get("id", ""))
+            ci = len(components)
+            components.append(Component(cid, ctype, str(comp.get("value", "")), extra or None))
+            index[cid] = ci
+            for rid, node in zip(roles, nodes):
+                net = net_ids.get(node)
+                if net is None:
+                    name = net_name(node)
+                    net = net_ids.get(name)
+                    if net is None:
+                        net = net_ids[name] = len(ir.net_names)
+                        ir.net_names.append(sys.intern(name))
+                    net_ids[node] = net
+                term_comp.append(ci)
+                term_role.append(rid)
+                term_net.append(net)
+
+        ir.term_start, ir.comp_terms = _csr(len(components), term_comp)
+        ir.net_start, ir.net_terms = _csr(len(ir.net_names), term_net)
+        ir.wire_a = ir.wire_b = None
+        return ir
+
+    def _assign_nets(self):
+        """Union the wired terminals into nets; nets touching a ground are "0" """
+        self.term_start, self.comp_terms = _csr(len(self.components), self.term_comp)
+        parent = array("i", range(len(self.term_comp)))
+
+        def find(t):
+            while parent[t] != t:
+                parent[t] = parent[parent[t]]
+                t = parent[t]
+            return t
+
+        for a, b in zip(self.wire_a, self.wire_b):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+        grounded = {find(t) for ci, comp in enumerate(self.components)
+                    if comp.type == "GND" for t in self.terminals(ci)}
+        roots = [find(t) for t in range(len(parent))]
+        net_of_root = {}
+        for root in roots:
+            if root not in net_of_root:
+                net = net_of_root[root] = len(self.net_names)
+                self.net_names.append(GROUND if root in grounded else f"N{net}")
+        self.term_net = array("i", map(net_of_root.__getitem__, roots))
+        self.net_start, self.net_terms = _csr(len(self.net_names), self.term_net)
+
+    def _build_adjacency(self):
+        """Component adjacency from the wires, deduplicated, in first-seen order"""
+        rows = [[] for _ in self.components]
+        term_comp = self.term_comp
+        for a, b in zip(*self.wires()):
+            ca, cb = term_comp[a], term_comp[b]
+            if ca != cb:
+                rows[ca].append(cb)
+                rows[cb].append(ca)
+        self.adj_start = array("i", [0])
+        self.adj = array("i")
+        for row in rows:
+            self.adj.extend(dict.fromkeys(row))
+            self.adj_start.append(len(self.adj))
+
+    # -- output -----------------------------------------------------------
+
+    def to_visualizer(self):
+        components = []
+        for comp in self.components:
+            entry = {"id": comp.id, "type": VISUAL_NAMES.get(comp.type, comp.type), "value": comp.value}
+            if comp.extra:
+                entry.update(comp.extra)
+            components.append(entry)
+        connections = [{"from": self.endpoint(a), "to": self.endpoint(b)}
+                       for a, b in zip(*self.wires())]
+
+        # The generator schema has no ground symbol; draw one on net "0"
+        if GROUND in self.net_names and not any(c.type == "GND" for c in self.components):
+            gid = "GND"
+            while gid in self.index:
+                gid += "_"
+            components.append({"id": gid, "type": "ground", "value": ""})
+            row = self.net_terminals(self.net_names.index(GROUND))
+            if len(row):
+                connections.append({"from": self.endpoint(row[0]), "to": f"{gid}.terminal"})
+        visual = {"name": self.name, "components": components, "connections": connections}
+        if self.simulation:
+            visual["simulation"] = self.simulation
+        return visual
+
+    def to_generator(self):
+        components = []
+        for ci, comp in enumerate(self.components):
+            if comp.type == "GND":
+                continue
+            cid = comp.id
+            if cid.upper().startswith(comp.type) and len(cid) > len(comp.type):
+                cid = cid[len(comp.type):]
+            entry = {"type": comp.type, "id": cid, "nodes": self.nodes(ci), "value": comp.value}
+            if comp.extra:
+                entry.update(comp.extra)
+            components.append(entry)
+        return {"circuit_name": self.name, "components": components, "simulation": self.simulation or ".op"}
@@ -0,0 +1,119 @@
+"""
+Server-side layered layout for the visualizer's circuit schema
+({"components": [...], "connections": [{"from": "V1.positive", "to": "R1.1"}]}).
+
+Connectivity comes from the shared CircuitIR (each endpoint string is
+resolved exactly once), layers come from a breadth-first walk starting at
+the voltage sources, and a few barycenter sweeps reorder each layer to
+reduce wire crossings. Results are cached by circuit content hash.
+"""
+from circuit_ir import CircuitIR
+from tiered_cache import TieredCache, make_key
+
+# Same spacing the browser-side layout used
+LAYER_SPACING = 200
+COMPONENT_SPACING = 150
+START_X = 100
+START_Y = 150
+CANVAS_WIDTH = 1200
+
+# Barycenter passes (each pass is one downward and one upward sweep)
+CROSSING_SWEEPS = 4
+
+layout_cache = TieredCache(path=None, max_memory_items=256, ttl=None)
+
+
+def assign_layers(ir):
+    """Breadth-first layers (component indices) from the voltage sources; each is visited once"""
+    count = len(ir.components)
+    layer_of = [-1] * count
+    layers = []
+
+    frontier = [ci for ci, comp in enumerate(ir.components) if comp.type == "V"]
+    unplaced = 0
+    while True:
+        if not frontier:
+            # Start the next disconnected piece from the first unplaced component
+            while unplaced < count and layer_of[unplaced] >= 0:
+                unplaced += 1
+            if unplaced == count:
+                break
+            frontier = [unplaced]
+        for ci in frontier:
+            layer_of[ci] = len(layers)
+        layers.append(frontier)
+        next_layer = []
+        for ci in frontier:
+            for neighbour in ir.neighbors(ci):
+                if layer_of[neighbour] < 0:
+                    layer_of[neighbour] = len(layers)
+                    next_layer.append(neighbour)
+        frontier = next_layer
+    return layers
+
+
+def reduce_crossings(layers, ir, sweeps=CROSSING_SWEEPS):
+    """Reorder each layer by the mean position of its neighbours in the adjacent layer"""
+    count = len(ir.components)
+    order = [0] * count
+    layer_of = [0] * count
+    for layer_index, layer in enumerate(layers):
+        for index, ci in enumerate(layer):
+            order[ci] = index
+            layer_of[ci] = layer_index
+
+    # Layers are fixed from here on, so split each neighbour list once
+    above = [None] * count
+    below = [None] * count
+    for ci in range(count):
+        here = layer_of[ci]
+        neighbours = ir.neighbors(ci)
+        above[ci] = [n for n in neighbours if layer_of[n] == here - 1]
+        below[ci] = [n for n in neighbours if layer_of[n] == here + 1]
+
+    def sweep(indices, reference):
+        for i in indices:
+            keys = {}
+            for ci in layers[i]:
+                positions = reference[ci]
+                keys[ci] = sum(order[n] for n in positions) / len(positions) if positions else order[ci]
+            layers[i].sort(key=keys.__getitem__)
+            for index, ci in enumerate(layers[i]):
+                order[ci] = index
+
+    for _ in range(sweeps):
+        sweep(range(1, len(layers)), above)
+        sweep(range(len(layers) - 2, -1, -1), below)
+    return layers
+
+
+def compute_layout(circuit, canvas_width=CANVAS_WIDTH):
+    """
+    Place every component; returns {"positions": {id: {"x", "y"}}, "layers",
+    "bounds"}. Cached by circuit content and canvas width.
+    """
+    key = make_key("layout", circuit, canvas_width)
+    cached = layout_cache.get(key)
+    if cached is not None:
+        return cached
+
+    ir = CircuitIR.from_visualizer(circuit)
+    layers = reduce_crossings(assign_layers(ir), ir)
+    ids = [comp.id for comp in ir.components]
+
+    positions = {}
+    for layer_index, layer in enumerate(layers):
+        y = START_Y + layer_index * LAYER_SPACING
+        offset = (canvas_width - len(layer) * COMPONENT_SPACING) / 2
+        for index, ci in enumerate(layer):
+            positions[ids[ci]] = {"x": START_X + index * COMPONENT_SPACING + offset, "y": y}
+
+    xs = [p["x"] for p in positions.values()] or [0]
+    ys = [p["y"] for p in positions.values()] or [0]
+    layout = {
+        "positions": positions,
+        "layers": [[ids[ci] for ci in layer] for layer in layers],
+        "bounds": {"min_x": min(xs), "min_y": min(ys), "max_x": max(xs), "max_y": max(ys)},
+    }
+    layout_cache.set(key, layout)
+    return layout
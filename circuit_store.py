@@ -0,0 +1,292 @@
+"""
+SQLite-backed circuit library.
+
+Circuits are stored as JSON in the visualizer's components/connections
+schema (generator-schema circuits are converted on write, so everything
+served can be drawn) with indexed name, creation time and component
+types. Listing is keyset-paginated
+over (created_at, id), so every page costs the same no matter how many
+circuits the library holds:
+
+    page = store.list_circuits(limit=50, component_type="resistor")
+    store.list_circuits(cursor=page["next_cursor"])
+
+Rows written with dedupe=True also record the circuit's topology hash
+(topology_hash.py), so a renamed or reordered copy of a stored design is
+found instead of being stored again:
+
+    circuit_id = store.put(new_id, circuit, dedupe=True)  # may return an older id
+"""
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from circuit_ir import CircuitIR
+from topology_hash import topology_hash
+
+# Library location (override with CIRCUIT_DB)
+DEFAULT_PATH = os.environ.get("CIRCUIT_DB", "circuits.sqlite")
+
+MAX_PAGE_SIZE = 500
+
+# Per-circuit versions remembered by CircuitStore.version()
+MAX_REMEMBERED_VERSIONS = 65536
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS circuits (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    body TEXT NOT NULL,
+    topology_hash TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS circuits_name ON circuits(name);
+CREATE INDEX IF NOT EXISTS circuits_created ON circuits(created_at, id);
+CREATE TABLE IF NOT EXISTS circuit_types (
+    type TEXT NOT NULL,
+    circuit_id TEXT NOT NULL REFERENCES circuits(id) ON DELETE CASCADE,
+    PRIMARY KEY (type, circuit_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS circuit_types_circuit ON circuit_types(circuit_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('visualizer_only', 0);
+"""
+
+_TOPOLOGY_INDEX = "CREATE INDEX IF NOT EXISTS circuits_topology ON circuits(topology_hash)"
+
+_BUMP_GENERATION = "UPDATE meta SET value = value + 1 WHERE key = 'generation'"
+
+
+def circuit_display_name(circuit, default=""):
+    return circuit.get("name") or circuit.get("circuit_name") or default
+
+
+def visualizer_schema(circuit):
+    """`circuit` as the visualizer draws it (generator-schema input is converted)"""
+    if "connections" in circuit:
+        return circuit
+    return CircuitIR.from_generator(circuit).to_visualizer()
+
+
+def _safe_topology_hash(circuit):
+    """Topology hash, or None for data too malformed to build a circuit graph"""
+    try:
+        return topology_hash(circuit)
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+def encode_cursor(created_at, circuit_id):
+    raw = json.dumps([created_at, circuit_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, circuit_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(created_at), str(circuit_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+
+
+class CircuitStore:
+    """Thread-safe circuit store; each thread gets its own SQLite connection"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._versions = {}
+        self._versions_lock = threading.Lock()
+        self._data_version = None
+        self._watch = None
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(circuits)")}
+            migrate = "topology_hash" not in columns
+            if migrate:
+                db.execute("ALTER TABLE circuits ADD COLUMN topology_hash TEXT")
+            if "version" not in columns:
+                db.execute("ALTER TABLE circuits ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            db.execute(_TOPOLOGY_INDEX)
+        if migrate:
+            self._backfill_topology()
+        self._convert_generator_rows()
+
+    def _backfill_topology(self):
+        """Hash the circuits stored before the topology_hash column existed"""
+        db = self._connect()
+        rows = db.execute("SELECT id, body FROM circuits WHERE topology_hash IS NULL").fetchall()
+        with db:
+            db.executemany(
+                "UPDATE circuits SET topology_hash = ? WHERE id = ?",
+                [(_safe_topology_hash(json.loads(body)), circuit_id) for circuit_id, body in rows],
+            )
+
+    def _convert_generator_rows(self):
+        """Rewrite generator-schema rows stored before put() converted them (runs once)"""
+        db = self._connect()
+        if db.execute("SELECT value FROM meta WHERE key = 'visualizer_only'").fetchone()[0]:
+            return
+        rows = db.execute("SELECT id, body, created_at, topology_hash FROM circuits").fetchall()
+        stale = [row for row in rows if "connections" not in json.loads(row[1])]
+        for circuit_id, body, created_at, digest in stale:
+            self.put(circuit_id, json.loads(body), created_at=created_at)
+        with db:
+            # The hash doesn't depend on the schema; keep the ones already recorded
+            db.executemany("UPDATE circuits SET topology_hash = ? WHERE id = ?",
+                           [(digest, circuit_id) for circuit_id, _, _, digest in stale if digest is not None])
+            db.execute("UPDATE meta SET value = 1 WHERE key = 'visualizer_only'")
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            self._local.db = db
+        return db
+
+    def put(self, circuit_id, circuit, created_at=None, dedupe=False):
+        """
+        Insert or replace a circuit (keeps the original creation time on
+        replace). With dedupe=True a circuit whose topology is already
+        stored under another id is not inserted; that id is returned
+        instead. Hashing costs about as much as validating the circuit, so
+        only dedupe=True writes record a topology hash. Generator-schema
+        circuits are stored converted to the visualizer schema.
+        """
+        circuit = visualizer_schema(circuit)
+        db = self._connect()
+        types = {str(comp.get("type", "")) for comp in circuit.get("components", [])}
+        digest = _safe_topology_hash(circuit) if dedupe else None
+        with db:
+            if dedupe and digest is not None:
+                row = db.execute(
+                    "SELECT id FROM circuits WHERE topology_hash = ? AND id != ? ORDER BY created_at LIMIT 1",
+                    (digest, circuit_id),
+                ).fetchone()
+                if row is not None:
+                    return row[0]
+            row = db.execute("SELECT created_at FROM circuits WHERE id = ?", (circuit_id,)).fetchone()
+            if created_at is None:
+                created_at = row[0] if row else time.time()
+            db.execute(_BUMP_GENERATION)
+            # The row's version is the generation of its last write
+            db.execute(
+                "INSERT OR REPLACE INTO circuits (id, name, created_at, body, topology_hash, version) "
+                "VALUES (?, ?, ?, ?, ?, (SELECT value FROM meta WHERE key = 'generation'))",
+                (circuit_id, circuit_display_name(circuit, circuit_id), created_at, json.dumps(circuit), digest),
+            )
+            db.execute("DELETE FROM circuit_types WHERE circuit_id = ?", (circuit_id,))
+            db.executemany(
+                "INSERT INTO circuit_types (type, circuit_id) VALUES (?, ?)",
+                [(t, circuit_id) for t in sorted(types)],
+            )
+        return circuit_id
+
+    def seed(self, circuits):
+        """Insert circuits that are not stored yet, in the given order"""
+        db = self._connect()
+        now = time.time()
+        for offset, (circuit_id, circuit) in enumerate(circuits.items()):
+            if db.execute("SELECT 1 FROM circuits WHERE id = ?", (circuit_id,)).fetchone() is None:
+                # Distinct timestamps keep the seed order stable in listings
+                self.put(circuit_id, circuit, created_at=now + offset * 1e-6)
+
+    def get_body(self, circuit_id):
+        """The stored JSON text, without decoding it"""
+        row = self._connect().execute(
+            "SELECT body FROM circuits WHERE id = ?", (circuit_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get(self, circuit_id):
+        body = self.get_body(circuit_id)
+        return json.loads(body) if body is not None else None
+
+    def find_topology(self, digest):
+        """Ids of stored circuits with the given topology hash, oldest first"""
+        rows = self._connect().execute(
+            "SELECT id FROM circuits WHERE topology_hash = ? ORDER BY created_at, id", (digest,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, circuit_id):
+        with self._connect() as db:
+            deleted = db.execute("DELETE FROM circuits WHERE id = ?", (circuit_id,)).rowcount > 0
+            if deleted:
+                db.execute(_BUMP_GENERATION)
+            return deleted
+
+    def version(self, circuit_id):
+        """
+        Version of one circuit (None if it doesn't exist), changed by every
+        write to it; lets readers cache data derived from a single circuit.
+
+        Versions are remembered in memory. A connection of its own sees
+        PRAGMA data_version change whenever any other connection (another
+        thread or process) commits, and only then are they re-read.
+        """
+        with self._versions_lock:
+            if self._watch is None:
+                self._watch = sqlite3.connect(self.path, check_same_thread=False)
+            data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version or len(self._versions) >= MAX_REMEMBERED_VERSIONS:
+                self._versions.clear()
+                self._data_version = data_version
+            if circuit_id not in self._versions:
+                row = self._watch.execute("SELECT version FROM circuits WHERE id = ?", (circuit_id,)).fetchone()
+                self._versions[circuit_id] = row[0] if row else None
+            return self._versions[circuit_id]
+
+    def generation(self):
+        """Counter bumped by every write; lets readers cache derived data"""
+        return self._connect().execute(
+            "SELECT value FROM meta WHERE key = 'generation'"
+        ).fetchone()[0]
+
+    def list_circuits(self, limit=50, cursor=None, name=None, component_type=None):
+        """
+        One page of circuits, oldest first.
+
+        `name` filters by name prefix, `component_type` to circuits containing
+        that type. Returns {"circuits": [{"id", "name", "created_at"}],
+        "next_cursor": str or None}.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        sql = ["SELECT c.id, c.name, c.created_at FROM circuits c"]
+        where, args = [], []
+        if component_type:
+            sql.append("JOIN circuit_types t ON t.circuit_id = c.id AND t.type = ?")
+            args.append(component_type)
+        if cursor:
+            created_at, circuit_id = decode_cursor(cursor)
+            where.append("(c.created_at, c.id) > (?, ?)")
+            args.extend([created_at, circuit_id])
+        if name:
+            # Range instead of LIKE so the name index can serve the prefix match
+            where.append("c.name >= ? AND c.name < ?")
+            args.extend([name, name + "\U0010ffff"])
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY c.created_at, c.id LIMIT ?")
+        args.append(limit + 1)
+
+        rows = self._connect().execute(" ".join(sql), args).fetchall()
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1][2], page[-1][0]) if len(rows) > limit else None
+        return {
+            "circuits": [{"id": r[0], "name": r[1], "created_at": r[2]} for r in page],
+            "next_cursor": next_cursor,
+        }
@@ -0,0 +1,276 @@
+"""
+Connectivity checks for generated circuits (either schema), run before a
+design is simulated or written out.
+
+Everything is a union-find pass over the CircuitIR nets, so a check is
+near-linear in the number of terminals:
+
+    report = validate_circuit(circuit, repair=True)
+    if not report["ok"]:
+        ...report["issues"]
+    circuit = report["circuit"]   # repaired copy (or the input)
+
+Issues are dicts {"code", "severity", "message", ...}:
+  unknown_endpoint       connection names a component/terminal that doesn't exist
+  unconnected_component  none of the component's terminals are wired
+  dangling_terminal      terminal is the only one on its net (ground never
+                         dangles; an error on sources, a warning otherwise)
+  no_ground              part of the circuit has no ground reference
+  floating_net           net has no DC path to ground (only capacitors/current sources)
+  shorted_source         voltage source with both terminals on the same net
+  voltage_loop           loop made only of voltage sources and inductors
+"""
+import copy
+
+from circuit_ir import GROUND, CircuitIR
+
+# Elements that don't conduct DC; nets reached only through them float
+NON_DC_TYPES = {"C", "I"}
+# Ideal zero-resistance paths at DC (a loop of these is singular)
+LOOP_TYPES = {"V", "L"}
+SOURCE_TYPES = {"V", "I"}
+
+# Leak resistor tying a floating net to ground during repair
+SHUNT_VALUE = "1G"
+
+
+def _find(parent, x):
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def _union(parent, a, b):
+    ra, rb = _find(parent, a), _find(parent, b)
+    if ra == rb:
+        return False
+    parent[max(ra, rb)] = min(ra, rb)
+    return True
+
+
+def _issue(code, message, severity="error", **fields):
+    return dict(code=code, severity=severity, message=message, **fields)
+
+
+def check(ir):
+    """All connectivity issues in a CircuitIR, errors and warnings"""
+    issues = []
+    nets = len(ir.net_names)
+    term_net = ir.term_net
+    ground = ir.net_names.index(GROUND) if GROUND in ir.net_names else -1
+
+    for end in ir.unresolved:
+        issues.append(_issue("unknown_endpoint", f"Connection to unknown terminal {end}", endpoint=end))
+
+    # Terminals alone on their net (a component with nothing wired is reported
+    # once; ground is a net of its own and never dangles), and connectivity
+    # through any element and through DC-conducting ones
+    start, comp_terms = ir.term_start, ir.comp_terms
+    net_size = [b - a for a, b in zip(ir.net_start, ir.net_start[1:])]
+    any_path = list(range(nets))
+    dc_path = list(range(nets))
+    ideal = []
+    for ci, comp in enumerate(ir.components):
+        terms = comp_terms[start[ci]:start[ci + 1]]
+        if comp.type != "GND":
+            alone = [t for t in terms if net_size[term_net[t]] == 1 and term_net[t] != ground]
+            if len(alone) == len(terms):
+                issues.append(_issue("unconnected_component", f"{comp.id} is not connected to anything", component=comp.id))
+            else:
+                # An open passive end carries no current; an open source is a missing link
+                severity = "error" if comp.type in SOURCE_TYPES else "warning"
+                for t in alone:
+                    issues.append(_issue("dangling_terminal", f"{ir.endpoint(t)} is not connected",
+                                         severity=severity, terminal=ir.endpoint(t)))
+        if len(terms) < 2:
+            continue
+        first = term_net[terms[0]]
+        for t in terms[1:]:
+            _union(any_path, first, term_net[t])
+            if comp.type not in NON_DC_TYPES:
+                _union(dc_path, first, term_net[t])
+        if comp.type in LOOP_TYPES and len(terms) == 2:
+            ideal.append(ci)
+
+    # Ideal paths (sources and inductors) only; inductors first so the
+    # source that closes a loop is the one reported
+    loops = list(range(nets))
+    ideal.sort(key=lambda ci: ir.components[ci].type != "L")
+    for ci in ideal:
+        comp = ir.components[ci]
+        a, b = (term_net[t] for t in ir.terminals(ci))
+        if a == b:
+            if comp.type == "V":
+                issues.append(_issue("shorted_source", f"{comp.id} has both terminals on the same net", component=comp.id))
+        elif not _union(loops, a, b) and comp.type == "V":
+            issues.append(_issue("voltage_loop", f"{comp.id} closes a loop of voltage sources/inductors", component=comp.id))
+
+    # Pieces without a ground reference, and nets only reachable through capacitors
+    used = [size > 1 for size in net_size]
+    if ground >= 0:
+        used[ground] = True
+    ground_any = _find(any_path, ground) if ground >= 0 else -1
+    ground_dc = _find(dc_path, ground) if ground >= 0 else -1
+    reported = set()
+    for net in range(nets):
+        if not used[net]:
+            continue
+        root = _find(any_path, net)
+        if root != ground_any:
+            if root not in reported:
+                reported.add(root)
+                where = ir.endpoint(ir.net_terminals(net)[0])
+                issues.append(_issue("no_ground", f"The part of the circuit at {where} has no ground reference", net=ir.net_names[net]))
+        elif _find(dc_path, net) != ground_dc:
+            where = ir.endpoint(ir.net_terminals(net)[0])
+            issues.append(_issue("floating_net", f"Net at {where} has no DC path to ground", net=ir.net_names[net]))
+    return issues
+
+
+def _is_visualizer(circuit):
+    return "connections" in circuit
+
+
+def _unique_id(taken, base):
+    cid, k = base, 1
+    while cid in taken:
+        k += 1
+        cid = f"{base}{k}"
+    taken.add(cid)
+    return cid
+
+
+def _repair(circuit, ir, issues, repairs):
+    """One round of fixes on a copy of `circuit`; returns the copy (or None if nothing applied)"""
+    visual = _is_visualizer(circuit)
+    fixed = copy.deepcopy(circuit)
+    codes = {issue["code"] for issue in issues}
+    ground = ir.net_names.index(GROUND) if GROUND in ir.net_names else -1
+    taken = set(ir.index)
+
+    def ground_endpoint():
+        """Visualizer endpoint to tie things to ground (adds a ground symbol if needed)"""
+        if ground >= 0:
+            for t in ir.net_terminals(ground):
+                if ir.components[ir.term_comp[t]].type == "GND":
+                    return ir.endpoint(t)
+        for ci, comp in enumerate(ir.components):
+            if comp.type == "GND":
+                return ir.endpoint(ir.terminals(ci)[0])
+        gid = _unique_id(taken, "GND")
+        fixed["components"].append({"id": gid, "type": "ground", "value": ""})
+        return f"{gid}.terminal"
+
+    def tie_to_ground(t, why):
+        """Returns False if `t` was already on ground"""
+        if ir.term_net[t] == ground:
+            return False
+        if visual:
+            fixed["connections"].append({"from": ir.endpoint(t), "to": ground_endpoint()})
+        else:
+            old = ir.net_names[ir.term_net[t]]
+            for comp in fixed["components"]:
+                comp["nodes"] = [GROUND if str(n) == old else n for n in comp.get("nodes") or []]
+        repairs.append(f"Connected {ir.endpoint(t)} to ground ({why})")
+        return True
+
+    if "unconnected_component" in codes:
+        drop = {i["component"] for i in issues if i["code"] == "unconnected_component"}
+        keep = []
+        for comp in fixed["components"]:
+            cid = comp["id"] if visual else str(comp.get("type", "")).upper() + str(comp.get("id", ""))
+            if cid not in drop:
+                keep.append(comp)
+        fixed["components"] = keep
+        repairs.extend(f"Removed unconnected {cid}" for cid in sorted(drop))
+        return fixed
+
+    if "dangling_terminal" in codes:
+        # A source whose negative side is open is almost always a missing ground link
+        applied = False
+        for issue in issues:
+            if issue["code"] != "dangling_terminal":
+                continue
+            cid, _, role = issue["terminal"].partition(".")
+            comp = ir.components[ir.index[cid]] if cid in ir.index else None
+            if comp is not None and comp.type in SOURCE_TYPES and role == "negative":
+                applied = tie_to_ground(ir.terminal(cid, role), "open source terminal") or applied
+        if applied:
+            return fixed
+
+    if "no_ground" in codes:
+        applied = False
+        for issue in issues:
+            if issue["code"] != "no_ground":
+                continue
+            net = ir.net_names.index(issue["net"])
+            piece = _piece_terminals(ir, net)
+            anchor = next((t for t in piece if ir.components[ir.term_comp[t]].type in SOURCE_TYPES
+                           and ir.role(t) == "negative"), piece[0])
+            applied = tie_to_ground(anchor, "no ground reference") or applied
+        if applied:
+            return fixed
+
+    if "floating_net" in codes:
+        for issue in issues:
+            if issue["code"] != "floating_net":
+                continue
+            net = ir.net_names.index(issue["net"])
+            t = ir.net_terminals(net)[0]
+            rid = _unique_id(taken, "RSHUNT")
+            if visual:
+                fixed["components"].append({"id": rid, "type": "resistor", "value": SHUNT_VALUE + "Ω"})
+                fixed["connections"].append({"from": ir.endpoint(t), "to": f"{rid}.1"})
+                fixed["connections"].append({"from": f"{rid}.2", "to": ground_endpoint()})
+            else:
+                fixed["components"].append({"type": "R", "id": rid[1:], "nodes": [issue["net"], GROUND], "value": SHUNT_VALUE})
+            repairs.append(f"Added {rid} ({SHUNT_VALUE}) from {ir.endpoint(t)} to ground (floating net)")
+        return fixed
+    return None
+
+
+def _piece_terminals(ir, net):
+    """Terminals of every net connected to `net` through components (breadth-first)"""
+    seen = {net}
+    queue = [net]
+    terms = []
+    for current in queue:
+        for t in ir.net_terminals(current):
+            terms.append(t)
+            for other in ir.terminals(ir.term_comp[t]):
+                n = ir.term_net[other]
+                if n not in seen:
+                    seen.add(n)
+                    queue.append(n)
+    return terms
+
+
+def validate_circuit(circuit, repair=False, max_rounds=4):
+    """
+    Check `circuit` (visualizer or generator schema). With repair=True,
+    unconnected parts are removed, open source terminals and ground-less
+    pieces are tied to ground and floating nets get a leak resistor; the
+    repaired copy is re-checked after each round, until nothing is left
+    to fix or a round changes nothing.
+
+    Returns {"ok", "issues", "circuit", "repairs"}; "ok" means no errors
+    remain, "issues" describes the returned circuit.
+    """
+    repairs = []
+    for _ in range(max_rounds + 1):
+        ir = CircuitIR.from_json(circuit)
+        issues = check(ir)
+        errors = [i for i in issues if i["severity"] == "error"]
+        if not errors or not repair:
+            break
+        fixed = _repair(circuit, ir, issues, repairs)
+        if fixed is None or fixed == circuit:
+            break
+        circuit = fixed
+    return {
+        "ok": not any(i["severity"] == "error" for i in issues),
+        "issues": issues,
+        "circuit": circuit,
+        "repairs": repairs,
+    }
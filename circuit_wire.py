@@ -0,0 +1,230 @@
+"""
+Columnar binary encoding of visualizer-schema circuits.
+
+Large circuits as JSON repeat "id", "type", "value", "from" and "to" (and
+every "R123.1" terminal string) per element. This format stores each
+distinct string once and the elements as integer columns the browser
+maps straight onto typed arrays:
+
+    body = encode(circuit)          # bytes; ValueError if not visualizer schema
+    circuit == decode(body)         # lossless (key order aside)
+
+Served by GET /api/circuit/<id> for `Accept: application/x-circuit-columnar`.
+
+Layout (little-endian; every section starts on a 4-byte boundary):
+
+    0   b"SCC1"
+    4   u32 string count (entry 0 is reserved: index 0 means "absent")
+    8   u32 string blob bytes
+    12  u32 component count n
+    16  u32 connection count m
+    20  u32 string index of the other top-level fields as JSON (0: none)
+    24  u8 x 11 column widths (1, 2 or 4 bytes), in the order below
+    36  string lengths, in UTF-16 code units (so a decoder can decode the
+        blob once and slice it)
+        string blob, UTF-8
+        component columns (n each): type, value, id prefix, id number,
+        extra
+        connection columns (m each): from component, from terminal,
+        to component, to terminal, extra
+
+An id is split into a prefix string and a decimal suffix ("R12" -> "R",
+13; number 0 means no suffix). A connection endpoint "R12.1" is stored as
+(component index, terminal string); endpoints that don't name a listed
+component keep the whole string with component index n. Fields other than
+id/type/value (and from/to), or non-string values for those, go into the
+element's "extra" JSON object, which is string-deduplicated like
+everything else.
+"""
+import json
+import re
+import struct
+import sys
+from array import array
+
+MIME_TYPE = "application/x-circuit-columnar"
+MAGIC = b"SCC1"
+
+_HEADER = struct.Struct("<4s5I11B")
+HEADER_SIZE = (_HEADER.size + 3) & ~3
+
+COLUMNS = (
+    "string_length",
+    "component_type", "component_value", "component_id_prefix", "component_id_number", "component_extra",
+    "from_component", "from_terminal", "to_component", "to_terminal", "connection_extra",
+)
+
+_TYPECODES = {1: "B", 2: "H", 4: "I" if array("I").itemsize == 4 else "L"}
+_ID_SUFFIX = re.compile(r"^(.*?)([1-9]\d{0,8}|0)?$", re.DOTALL)
+
+
+def _width(values):
+    top = max(values, default=0)
+    return 1 if top < 1 << 8 else 2 if top < 1 << 16 else 4
+
+
+def _pack(values, width):
+    column = array(_TYPECODES[width], values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    data = column.tobytes()
+    return data + b"\0" * (-len(data) % 4)
+
+
+def _unpack(buffer, offset, count, width):
+    column = array(_TYPECODES[width])
+    column.frombytes(buffer[offset:offset + count * width])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, offset + ((count * width + 3) & ~3)
+
+
+def _dump(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def encode(circuit):
+    """Columnar bytes for a visualizer-schema circuit (ValueError for anything else)"""
+    if not isinstance(circuit, dict):
+        raise ValueError("Expected a circuit object")
+    components = circuit.get("components")
+    connections = circuit.get("connections")
+    if not isinstance(components, list) or not isinstance(connections, list):
+        raise ValueError("Only circuits with components and connections lists can be encoded")
+
+    # Index 0 is the reserved "absent" entry; a real "" gets its own index
+    strings = {}
+    table = [""]
+
+    def intern(text):
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(table)
+            table.append(text)
+        return index
+
+    n, m = len(components), len(connections)
+    types, values, prefixes, numbers, comp_extra = ([0] * n for _ in range(5))
+    index_of = {}
+    for i, comp in enumerate(components):
+        if not isinstance(comp, dict):
+            raise ValueError(f"Component {i} is not an object")
+        rest = {}
+        for key, field in comp.items():
+            if key == "id" and isinstance(field, str):
+                prefix, suffix = _ID_SUFFIX.match(field).groups()
+                prefixes[i] = intern(prefix)
+                numbers[i] = int(suffix) + 1 if suffix else 0
+                index_of.setdefault(field, i)
+            elif key == "type" and isinstance(field, str):
+                types[i] = intern(field)
+            elif key == "value" and isinstance(field, str):
+                values[i] = intern(field)
+            else:
+                rest[key] = field
+        if rest:
+            comp_extra[i] = intern(_dump(rest))
+
+    from_comp, from_term, to_comp, to_term, conn_extra = ([0] * m for _ in range(5))
+    for k, conn in enumerate(connections):
+        if not isinstance(conn, dict):
+            raise ValueError(f"Connection {k} is not an object")
+        rest = {}
+        from_comp[k] = to_comp[k] = n
+        for key, field in conn.items():
+            if key in ("from", "to") and isinstance(field, str):
+                cid, dot, terminal = field.partition(".")
+                ci = index_of.get(cid) if dot else None
+                comp_column, term_column = (from_comp, from_term) if key == "from" else (to_comp, to_term)
+                if ci is None:
+                    term_column[k] = intern(field)
+                else:
+                    comp_column[k], term_column[k] = ci, intern(terminal)
+            else:
+                rest[key] = field
+        if rest:
+            conn_extra[k] = intern(_dump(rest))
+
+    meta = {key: field for key, field in circuit.items() if key not in ("components", "connections")}
+    meta_index = intern(_dump(meta)) if meta else 0
+
+    try:
+        encoded = [text.encode("utf-8") for text in table]
+    except UnicodeEncodeError as e:
+        raise ValueError(f"String can't be encoded: {e}") from None
+    lengths = [len(text.encode("utf-16-le", "surrogatepass")) // 2 for text in table]
+    blob = b"".join(encoded)
+
+    columns = (lengths, types, values, prefixes, numbers, comp_extra,
+               from_comp, from_term, to_comp, to_term, conn_extra)
+    widths = [_width(column) for column in columns]
+    parts = [
+        _HEADER.pack(MAGIC, len(table), len(blob), n, m, meta_index, *widths).ljust(HEADER_SIZE, b"\0"),
+        _pack(lengths, widths[0]),
+        blob + b"\0" * (-len(blob) % 4),
+    ]
+    parts.extend(_pack(column, width) for column, width in zip(columns[1:], widths[1:]))
+    return b"".join(parts)
+
+
+def decode(body):
+    """Circuit dict from encode() output"""
+    body = bytes(body)
+    if body[:4] != MAGIC or len(body) < HEADER_SIZE:
+        raise ValueError("Not a columnar circuit")
+    _, string_count, blob_size, n, m, meta_index, *widths = _HEADER.unpack_from(body)
+    lengths, offset = _unpack(body, HEADER_SIZE, string_count, widths[0])
+    text = body[offset:offset + blob_size].decode("utf-8")
+    offset += (blob_size + 3) & ~3
+
+    table = []
+    start = 0
+    utf16 = text.encode("utf-16-le", "surrogatepass")
+    if len(utf16) == 2 * len(text):
+        for length in lengths:
+            table.append(text[start:start + length])
+            start += length
+    else:
+        # Astral characters take two UTF-16 units but one Python character
+        for length in lengths:
+            table.append(utf16[2 * start:2 * (start + length)].decode("utf-16-le", "surrogatepass"))
+            start += length
+
+    columns = []
+    for count, width in zip([n] * 5 + [m] * 5, widths[1:]):
+        column, offset = _unpack(body, offset, count, width)
+        columns.append(column)
+    types, values, prefixes, numbers, comp_extra, from_comp, from_term, to_comp, to_term, conn_extra = columns
+
+    circuit = json.loads(table[meta_index]) if meta_index else {}
+    ids = []
+    components = []
+    for i in range(n):
+        comp = {}
+        if prefixes[i]:
+            comp["id"] = table[prefixes[i]] + (str(numbers[i] - 1) if numbers[i] else "")
+        ids.append(comp.get("id"))
+        if types[i]:
+            comp["type"] = table[types[i]]
+        if values[i]:
+            comp["value"] = table[values[i]]
+        if comp_extra[i]:
+            comp.update(json.loads(table[comp_extra[i]]))
+        components.append(comp)
+
+    def endpoint(ci, term):
+        return table[term] if ci >= n else f"{ids[ci]}.{table[term]}"
+
+    connections = []
+    for k in range(m):
+        conn = {}
+        if from_term[k] or from_comp[k] < n:
+            conn["from"] = endpoint(from_comp[k], from_term[k])
+        if to_term[k] or to_comp[k] < n:
+            conn["to"] = endpoint(to_comp[k], to_term[k])
+        if conn_extra[k]:
+            conn.update(json.loads(table[conn_extra[k]]))
+        connections.append(conn)
+    circuit["components"] = components
+    circuit["connections"] = connections
+    return circuit
@@ -0,0 +1,153 @@
+"""
+Local stand-in for google.genai.Client, for exercising the generation
+pipeline without network access or an API key.
+
+Only the surface the project actually touches is implemented:
+client.models.generate_content(...), client.models.generate_content_stream(...)
+and client.aio.models.generate_content(...).
+"""
+import asyncio
+import json
+import threading
+import time
+
+
+class FakeAPIError(Exception):
+    """Mirrors google.genai.errors.APIError: carries an HTTP status `code`"""
+
+    def __init__(self, code, message=""):
+        super().__init__(f"{code} {message}".strip())
+        self.code = code
+
+
+class FakeCandidate:
+    def __init__(self, finish_reason="STOP"):
+        self.finish_reason = finish_reason
+
+
+class FakeUsage:
+    def __init__(self, prompt_token_count=0, candidates_token_count=0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeResponse:
+    def __init__(self, text="", finish_reason="STOP", parsed=None, prompt_tokens=0):
+        self.text = text
+        self.parsed = parsed
+        self.candidates = [FakeCandidate(finish_reason)]
+        self.usage_metadata = FakeUsage(prompt_tokens, len(text) // 4)
+
+
+def default_responder(prompt):
+    """Answer every prompt with a small RC low-pass filter"""
+    return {
+        "circuit_name": "RC Low Pass Filter",
+        "components": [
+            {"type": "V", "id": "1", "nodes": ["in", "0"], "value": "AC 1"},
+            {"type": "R", "id": "1", "nodes": ["in", "out"], "value": "1k"},
+            {"type": "C", "id": "1", "nodes": ["out", "0"], "value": "1u"},
+        ],
+        "simulation": ".ac dec 10 1 1meg",
+    }
+
+
+def visualizer_responder(prompt):
+    """Answer every prompt with the visualizer's LED circuit (components/connections schema)"""
+    return {
+        "name": "Simple LED Circuit",
+        "components": [
+            {"id": "V1", "type": "voltage_source", "value": "9V", "polarity": "dc"},
+            {"id": "R1", "type": "resistor", "value": "330Ω"},
+            {"id": "LED1", "type": "led", "value": "Red LED"},
+        ],
+        "connections": [
+            {"from": "V1.positive", "to": "R1.1"},
+            {"from": "R1.2", "to": "LED1.anode"},
+            {"from": "LED1.cathode", "to": "V1.negative"},
+        ],
+    }
+
+
+class _FakeModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model, contents, config=None):
+        error, response = self._owner._next(contents)
+        if self._owner.latency:
+            time.sleep(self._owner.latency)
+        if error is not None:
+            raise error
+        return response
+
+    def generate_content_stream(self, model, contents, config=None):
+        """Yield the response text in `chunk_size` pieces, `chunk_latency` apart"""
+        error, response = self._owner._next(contents)
+        if self._owner.latency:
+            time.sleep(self._owner.latency)
+        if error is not None:
+            raise error
+        size = self._owner.chunk_size
+        text = response.text or ""
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        for i, piece in enumerate(pieces):
+            if i and self._owner.chunk_latency:
+                time.sleep(self._owner.chunk_latency)
+            last = i == len(pieces) - 1
+            yield FakeResponse(piece, finish_reason=response.candidates[0].finish_reason if last else None)
+
+
+class _FakeAsyncModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def generate_content(self, model, contents, config=None):
+        error, response = self._owner._next(contents)
+        if self._owner.latency:
+            await asyncio.sleep(self._owner.latency)
+        if error is not None:
+            raise error
+        return response
+
+
+class _FakeAio:
+    def __init__(self, owner):
+        self.models = _FakeAsyncModels(owner)
+
+
+class FakeClient:
+    """
+    Deterministic fake client.
+
+    responder(prompt) returns a dict (serialized as JSON), a string (used
+    verbatim as the response text) or a FakeResponse. `error_codes` is
+    consumed one entry per call: an int raises FakeAPIError with that code,
+    None lets the call succeed. Streaming calls split the response text
+    into `chunk_size` pieces, `chunk_latency` seconds apart.
+    """
+
+    def __init__(self, responder=None, latency=0.0, error_codes=(), chunk_size=64, chunk_latency=0.0):
+        self.responder = responder or default_responder
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_latency = chunk_latency
+        self.error_codes = list(error_codes)
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.models = _FakeModels(self)
+        self.aio = _FakeAio(self)
+
+    def _next(self, prompt):
+        with self._lock:
+            self.calls += 1
+            code = self.error_codes.pop(0) if self.error_codes else None
+        if code is not None:
+            return FakeAPIError(code, "injected failure"), None
+        answer = self.responder(prompt)
+        if isinstance(answer, FakeResponse):
+            return None, answer
+        if not isinstance(answer, str):
+            answer = json.dumps(answer)
+        return None, FakeResponse(answer, prompt_tokens=len(str(prompt)) // 4)
@@ -1,111 +1,388 @@
+import logging
 import os
-from google import genai
-from google.genai import types # Required for safety settings
-from PySpice.Spice.Netlist import Circuit
+import threading
+
+from circuit_store import DEFAULT_PATH as CIRCUIT_DB, CircuitStore
+from circuit_validator import validate_circuit
+from instrumentation import cache_gauges, configure_logging, count, record_usage, span
+from json_repair import coerce_circuit, parse_circuit
+from netlist_writer import atomic_open, circuit_title, pyspice_netlist_text, write_netlist
+from singleflight import SingleFlight
+from tiered_cache import CACHE_DIR, TieredCache, make_key
+from topology_hash import topology_hash
+
+log = logging.getLogger(__name__)
 
 # 1. API Configuration
 # Replace with your actual key or ensure it is set as an environment variable
-GEMINI_API_KEY = "your_api_key_here" 
-client = genai.Client(api_key=GEMINI_API_KEY)
-
-def get_circuit_json(prompt):
-    # 1. Lower safety thresholds to prevent "False Positives" on circuit designs
-    safety_settings = [
-        types.SafetySetting(
-            category="HARM_CATEGORY_DANGEROUS_CONTENT",
-            threshold="BLOCK_ONLY_HIGH", # Allow more complex technical designs
-        ),
-    ]
-
-    system_instr = (
-        "You are an electrical engineering assistant. Convert requests into JSON. "
-        "Schema: {'circuit_name': str, 'components': [{'type': str, 'id': str, "
-        "'nodes': [str, str], 'value': str}], 'simulation': str}. "
-        "Output ONLY valid JSON."
-    )
-    
+GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "your_api_key_here")
+
+class ClientPool:
+    """
+    Lazily constructed, reusable genai clients keyed by API key.
+
+    google.genai is only imported when the first client is requested, so
+    importing this module (e.g. just for build_and_save_netlist) stays
+    cheap and a bad key can't fail at import time.
+    """
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_key=None):
+        api_key = api_key or GEMINI_API_KEY
+        client = self._clients.get(api_key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(api_key)
+                if client is None:
+                    from google import genai
+                    client = self._clients[api_key] = genai.Client(api_key=api_key)
+        return client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+client_pool = ClientPool()
+
+# Stand-in client (genai_replay, fake_genai) used instead of the real one
+_client_override = None
+_env_checked = False
+
+def set_client(client):
+    """Route every Gemini call through `client`; None goes back to the real API"""
+    global _client_override, _env_checked
+    _client_override = client
+    _env_checked = True
+
+def get_client(api_key=None):
+    global _client_override, _env_checked
+    if not _env_checked:
+        # SYNAPTIC_GENAI=record:<path> / replay:<path> picks a stand-in once
+        from genai_replay import client_from_env
+        _client_override = client_from_env()
+        _env_checked = True
+    if _client_override is not None:
+        return _client_override
+    return client_pool.get(api_key)
+
+def __getattr__(name):
+    # Keep `gemini_to_net_v1.client` working without building it at import
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+MODEL_NAME = "gemini-2.0-flash"
+
+# Lower safety thresholds to prevent "False Positives" on circuit designs
+SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_ONLY_HIGH", # Allow more complex technical designs
+    },
+]
+
+SYSTEM_INSTR = (
+    "You are an electrical engineering assistant. Convert requests into JSON. "
+    "Schema: {'circuit_name': str, 'components': [{'type': str, 'id': str, "
+    "'nodes': [str, str], 'value': str}], 'simulation': str}. "
+    "Output ONLY valid JSON."
+)
+
+# Diagram schema used by the visualizer (server.py); components come first so
+# they can be drawn while connections are still streaming
+VISUALIZER_SYSTEM_INSTR = (
+    "You are an electrical engineering assistant. Convert requests into a circuit diagram as JSON. "
+    "Schema: {'name': str, 'components': [{'id': str, 'type': str, 'value': str}], "
+    "'connections': [{'from': 'ID.terminal', 'to': 'ID.terminal'}]}. "
+    "Types and terminals: resistor (1, 2), voltage_source (positive, negative), "
+    "led (anode, cathode), transistor (base, collector, emitter; add 'transistor_type': "
+    "'npn' or 'pnp'), ground (terminal). "
+    "List every component before the connections. Output ONLY valid JSON."
+)
+
+GENERATION_CONFIG = {
+    "system_instruction": SYSTEM_INSTR,
+    "response_mime_type": "application/json",
+    "safety_settings": SAFETY_SETTINGS
+}
+
+# 2. Response cache: repeated prompts skip the API round-trip entirely
+response_cache = TieredCache(os.path.join(CACHE_DIR, "responses.sqlite"))
+cache_gauges("responses", response_cache)
+
+# 3. Identical requests that arrive together share one API call / netlist build
+inflight = SingleFlight()
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so trivially different prompts share a cache entry"""
+    return " ".join(str(prompt).split())
+
+def response_cache_key(prompt, model=MODEL_NAME, system_instr=SYSTEM_INSTR, safety_settings=SAFETY_SETTINGS):
+    return make_key(normalize_prompt(prompt), model, system_instr, safety_settings)
+
+class SafetyBlockedError(RuntimeError):
+    """The response was stopped by Gemini's safety filters"""
+
+def is_safety_blocked(response):
+    candidates = getattr(response, "candidates", None)
+    return bool(candidates) and candidates[0].finish_reason == "SAFETY"
+
+def parse_response(response, schema="generator", warn=log.info):
+    """
+    Extract the circuit JSON from a generate_content response (None if empty).
+    Malformed or truncated text is repaired locally instead of re-requesting;
+    raises ValueError if nothing usable is left.
+    """
+    # Fallback to manual parsing if .parsed is None
+    if response.parsed:
+        data, changes = coerce_circuit(response.parsed, schema)
+    elif response.text:
+        data, changes = parse_circuit(response.text, schema)
+    else:
+        return None
+    if warn:
+        for change in changes:
+            warn(f"Repaired response: {change}")
+    return data
+
+def get_circuit_json(prompt, use_cache=True):
+    cache_key = response_cache_key(prompt)
+    if use_cache:
+        cached = response_cache.get(cache_key)
+        count("cache_lookups_total", cache="responses", result="miss" if cached is None else "hit")
+        if cached is not None:
+            return cached
+
+    data, _ = inflight.do(("json", cache_key), _fetch_circuit_json, prompt, cache_key, use_cache)
+    return data
+
+def _fetch_circuit_json(prompt, cache_key, use_cache):
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
-            config={
-                "system_instruction": system_instr,
-                "response_mime_type": "application/json",
-                "safety_settings": safety_settings
-            }
-        )
+        with span("llm_call"):
+            response = get_client().models.generate_content(
+                model=MODEL_NAME,
+                contents=prompt,
+                config=GENERATION_CONFIG
+            )
+        record_usage(response)
 
         # CHECK 1: If safety filters blocked it
-        if response.candidates[0].finish_reason == "SAFETY":
-            print("Error: The design was blocked by safety filters. Try a simpler prompt.")
+        if is_safety_blocked(response):
+            count("llm_requests_total", outcome="safety")
+            count("safety_blocks_total")
+            log.warning("The design was blocked by safety filters. Try a simpler prompt.")
             return None
 
-        # CHECK 2: Fallback to manual parsing if .parsed is None
-        if response.parsed:
-            return response.parsed
-        
-        if response.text:
-            import json
-            # Clean possible markdown code blocks from text
-            clean_text = response.text.replace("```json", "").replace("```", "").strip()
-            return json.loads(clean_text)
+        # CHECK 2: Parse the structured output
+        with span("parse"):
+            data = parse_response(response)
+        count("llm_requests_total", outcome="ok" if data is not None else "empty")
+        if data is not None and use_cache:
+            response_cache.set(cache_key, data)
+        return data
 
+    except ValueError as e:
+        count("llm_requests_total", outcome="parse_error")
+        log.warning("Parse Error: %s", e)
         return None
-        
     except Exception as e:
-        print(f"API Error: {e}")
+        count("llm_requests_total", outcome="api_error")
+        log.error("API Error: %s", e)
+        return None
+
+def stream_circuit_text(prompt, system_instr=VISUALIZER_SYSTEM_INSTR, client=None):
+    """Yield the response text chunk by chunk as Gemini generates it"""
+    config = dict(GENERATION_CONFIG, system_instruction=system_instr)
+    stream = (client or get_client()).models.generate_content_stream(
+        model=MODEL_NAME,
+        contents=prompt,
+        config=config
+    )
+    for chunk in stream:
+        record_usage(chunk)
+        if is_safety_blocked(chunk):
+            count("safety_blocks_total")
+            raise SafetyBlockedError("The design was blocked by safety filters. Try a simpler prompt.")
+        if chunk.text:
+            yield chunk.text
+
+# Trailer comment (after .end, so simulators ignore it) naming the topology
+# and the simulation directive the netlist was written for
+TOPOLOGY_TAG = "* topology "
+
+# Absolute folder -> {(topology hash, directive): netlist path}, read from the trailers once per folder
+_netlist_index = {}
+_netlist_index_lock = threading.Lock()
+
+
+def _dedupe_key(data):
+    """(topology hash, directive): same network simulated the same way"""
+    directive = " ".join(str(data.get("simulation") or ".op").lower().split())
+    return topology_hash(data), directive
+
+
+def _read_trailer(path):
+    """Dedupe key from a netlist's trailer, or None (missing file, no trailer)"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, os.path.getsize(path) - 400))
+            tail = f.read().decode("utf-8", "replace")
+    except OSError:
         return None
+    for line in tail.splitlines():
+        if line.startswith(TOPOLOGY_TAG):
+            digest, _, directive = line[len(TOPOLOGY_TAG):].strip().partition(" ")
+            return digest, directive
+    return None
+
+
+def _folder_index(folder):
+    index = _netlist_index.get(folder)
+    if index is None:
+        index = _netlist_index[folder] = {}
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".cir"):
+                path = os.path.join(folder, name)
+                key = _read_trailer(path)
+                if key is not None:
+                    index.setdefault(key, path)
+    return index
+
 
-# build_and_save_netlist function remains the same as previous version
+def _forget_path(folder, path):
+    """Drop index entries for a netlist that is about to be overwritten"""
+    index = _netlist_index.get(folder)
+    if index:
+        path = os.path.abspath(path)
+        for key in [k for k, p in index.items() if os.path.abspath(p) == path]:
+            del index[key]
 
-def build_and_save_netlist(data, target_folder="generated_circuits"):
+
+def build_and_save_netlist(data, target_folder="generated_circuits", backend="native", echo=False, validate=True,
+                           file_name=None, dedupe=False, incremental=False):
+    """
+    Write the SPICE netlist for `data` to <target_folder>/<circuit_name>.cir
+    (or <target_folder>/<file_name>).
+
+    backend="native" streams lines straight to the file; backend="pyspice"
+    builds a PySpice Circuit first (needs PySpice installed). With echo=True
+    the netlist is also printed. With validate=True broken connectivity is
+    repaired where possible and designs that still have errors are rejected
+    (returns None) instead of being written. With dedupe=True a design whose
+    topology and simulation directive already have a netlist in the folder
+    isn't written again; the existing path is returned. Timed as the netlist_build stage, with
+    validate and file_write (emitting + atomic write) inside it.
+
+    With incremental=True (native backend, no echo or dedupe) the written
+    netlist is remembered, and a later call for the same file whose circuit
+    only differs in component values patches just those lines
+    (incremental.IncrementalNetlist).
+    """
     if not data:
         return None
 
-    if not os.path.exists(target_folder):
-        os.makedirs(target_folder)
+    if incremental and backend == "native" and not (echo or dedupe):
+        # incremental pulls in numpy/scipy (for its solver half); only load it when asked
+        from incremental import save_netlist as save_incremental
 
-    circuit_name = data.get("circuit_name", "Design").replace(" ", "_")
-    circuit = Circuit(circuit_name)
-    
-    for comp in data.get("components", []):
-        ctype = comp["type"].upper()
-        cid = str(comp["id"])
-        n = comp["nodes"]
-        val = comp["value"]
-        
-        try:
-            if ctype == 'R': circuit.R(cid, n[0], n[1], val)
-            elif ctype == 'C': circuit.C(cid, n[0], n[1], val)
-            elif ctype == 'L': circuit.L(cid, n[0], n[1], val)
-            elif ctype == 'V': circuit.V(cid, n[0], n[1], val)
-            elif ctype == 'I': circuit.I(cid, n[0], n[1], val)
-        except Exception as e:
-            print(f"Warning: Could not add component {ctype}{cid}: {e}")
-
-    # Append simulation directives
-    sim_cmd = data.get("simulation", ".op")
-    circuit.raw_spice += f"\n{sim_cmd}\n.end"
-    
-    # --- ADDED PRINT STATEMENT HERE ---
-    netlist_content = str(circuit)
-    print("\n--- GENERATED SPICE NETLIST ---")
-    print(netlist_content)
-    print("-------------------------------\n")
-    
-    file_path = os.path.join(target_folder, f"{circuit_name}.cir")
-    with open(file_path, "w") as f:
-        f.write(netlist_content)
-    
+        file_path = os.path.join(target_folder, file_name or f"{circuit_title(data)}.cir")
+        with _netlist_index_lock:
+            _forget_path(os.path.abspath(target_folder), file_path)
+        with span("netlist_build"):
+            return save_incremental(data, file_path, validate=validate)
+
+    with span("netlist_build"):
+        return _build_and_save(data, target_folder, backend, echo, validate, file_name, dedupe)
+
+def _build_and_save(data, target_folder, backend, echo, validate, file_name, dedupe):
+    if validate:
+        with span("validate"):
+            report = validate_circuit(data, repair=True)
+        for repair in report["repairs"]:
+            log.info("Repaired: %s", repair)
+        for issue in report["issues"]:
+            log.warning("%s: %s", issue["severity"].capitalize(), issue["message"])
+        if not report["ok"]:
+            return None
+        data = report["circuit"]
+
+    os.makedirs(target_folder, exist_ok=True)
+
+    file_path = os.path.join(target_folder, file_name or f"{circuit_title(data)}.cir")
+    folder = os.path.abspath(target_folder)
+    key = None
+    with _netlist_index_lock:
+        if dedupe:
+            key = _dedupe_key(data)
+            index = _folder_index(folder)
+            existing = index.get(key)
+            # The file may have been overwritten or deleted since it was indexed
+            if existing is not None and _read_trailer(existing) == key:
+                log.info("Same circuit as %s; not writing a duplicate", existing)
+                return os.path.abspath(existing)
+        _forget_path(folder, file_path)
+        if key is not None:
+            index[key] = file_path
+    if echo:
+        print("\n--- GENERATED SPICE NETLIST ---")
+
+    # Written to a temp file and renamed, so racing writers can't interleave
+    try:
+        with span("file_write"):
+            _write_netlist_file(data, file_path, backend, echo, key)
+    except BaseException:
+        if key is not None:
+            with _netlist_index_lock:
+                _netlist_index[folder].pop(key, None)
+        raise
+    count("netlists_written_total", backend=backend)
+
+    if echo:
+        print("-------------------------------\n")
     return os.path.abspath(file_path)
 
+def _write_netlist_file(data, file_path, backend, echo, key):
+    if backend == "pyspice":
+        netlist_content = pyspice_netlist_text(data)
+        if echo:
+            print(netlist_content)
+        with atomic_open(file_path) as f:
+            f.write(netlist_content)
+            if key:
+                f.write(f"\n{TOPOLOGY_TAG}{key[0]} {key[1]}\n")
+    else:
+        with atomic_open(file_path) as f:
+            write_netlist(data, f, echo=print if echo else None)
+            if key:
+                f.write(f"{TOPOLOGY_TAG}{key[0]} {key[1]}\n")
+
+def generate_netlist(prompt, target_folder="generated_circuits", backend="native", use_cache=True, dedupe=True):
+    """
+    Prompt -> circuit JSON -> saved netlist. Concurrent calls for the same
+    prompt share one generation and one write, and a design already saved
+    under another name is not written twice; returns (data, netlist_path).
+    """
+    key = ("netlist", response_cache_key(prompt), os.path.abspath(target_folder), backend)
+
+    def run():
+        data = get_circuit_json(prompt, use_cache=use_cache)
+        return data, build_and_save_netlist(data, target_folder=target_folder, backend=backend, dedupe=dedupe)
+
+    result, _ = inflight.do(key, run)
+    return result
+
 if __name__ == "__main__":
+    configure_logging()
     user_prompt = input("Describe the circuit: ")
     circuit_data = get_circuit_json(user_prompt)
     print(circuit_data)
     
     if circuit_data:
-        saved_path = build_and_save_netlist(circuit_data)
+        saved_path = build_and_save_netlist(circuit_data, echo=True, dedupe=True)
+        CircuitStore(CIRCUIT_DB).put(circuit_title(circuit_data), circuit_data, dedupe=True)
         if saved_path:
             print("-" * 40)
             print(f"Netlist saved to: {saved_path}")
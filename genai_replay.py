@@ -0,0 +1,399 @@
+"""
+Record/replay stand-ins for the Gemini client, for offline load tests.
+
+Record real traffic once (every call is appended to a JSONL cassette with
+its text, stream chunks, finish reason, token usage and latency):
+
+    client = RecordingClient(gemini_to_net_v1.client_pool.get(), "cassette.jsonl")
+    gemini_to_net_v1.set_client(client)
+
+Replay it with no network, with the latency, chunking and failures you
+want to test against:
+
+    client = ReplayClient("cassette.jsonl", latency="lognormal:0.8,0.4",
+                          errors={"429": 0.05, "safety": 0.01, "malformed": 0.02}, seed=1)
+
+Both can also be picked without code changes through the environment:
+SYNAPTIC_GENAI=record:<path> or replay:<path> (see client_from_env).
+
+Replay looks calls up by (model, system instruction, prompt); unknown
+prompts are served from the recordings round-robin (on_miss="cycle") or
+raise a 404 (on_miss="error"). Latency is "recorded" (each call's own),
+a constant, "uniform:lo,hi", "lognormal:median,sigma", "normal:mean,sd"
+or "empirical" (drawn from all recorded latencies). Injected errors:
+
+  429 / 500 / 503   FakeAPIError with that code (retried by batch_generate)
+  safety            finish_reason "SAFETY" and no text
+  malformed         the text cut off part-way, as a truncated answer would be
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+from fake_genai import FakeAPIError, FakeResponse, FakeUsage
+from tiered_cache import make_key
+
+ERROR_KINDS = ("429", "500", "503", "safety", "malformed")
+
+# Share of a call's latency spent before the first stream chunk when the
+# recording has no stream timing
+FIRST_CHUNK_SHARE = 0.3
+
+
+def call_key(model, contents, config=None):
+    """Identity of a generate_content call for lookup in a cassette"""
+    system = None
+    if isinstance(config, dict):
+        system = config.get("system_instruction")
+    elif config is not None:
+        system = getattr(config, "system_instruction", None)
+    return make_key(model, str(system or ""), " ".join(str(contents).split()))
+
+
+def _text_of(response):
+    try:
+        return response.text or ""
+    except (AttributeError, ValueError):
+        return ""
+
+
+def _finish_reason(response):
+    candidates = getattr(response, "candidates", None)
+    if not candidates:
+        return None
+    reason = candidates[0].finish_reason
+    return getattr(reason, "name", reason)
+
+
+def _usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+        "output_tokens": getattr(usage, "candidates_token_count", 0) or 0,
+    }
+
+
+def load_cassette(path):
+    """Records from a JSONL cassette (a torn last line is skipped)"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+# --- Recording ---
+
+class _RecordingModels:
+    def __init__(self, owner, models):
+        self._owner = owner
+        self._models = models
+
+    def generate_content(self, model, contents, config=None):
+        start = time.perf_counter()
+        try:
+            response = self._models.generate_content(model=model, contents=contents, config=config)
+        except Exception as e:
+            self._owner._record_error(model, contents, config, e, time.perf_counter() - start)
+            raise
+        self._owner._record(model, contents, config, response, time.perf_counter() - start)
+        return response
+
+    def generate_content_stream(self, model, contents, config=None):
+        start = time.perf_counter()
+        chunks, offsets, last = [], [], None
+        try:
+            for chunk in self._models.generate_content_stream(model=model, contents=contents, config=config):
+                offsets.append(time.perf_counter() - start)
+                chunks.append(_text_of(chunk))
+                last = chunk
+                yield chunk
+        except Exception as e:
+            self._owner._record_error(model, contents, config, e, time.perf_counter() - start)
+            raise
+        self._owner._record(model, contents, config, last, time.perf_counter() - start,
+                            chunks=chunks, chunk_offsets=offsets)
+
+
+class _RecordingAsyncModels:
+    def __init__(self, owner, models):
+        self._owner = owner
+        self._models = models
+
+    async def generate_content(self, model, contents, config=None):
+        start = time.perf_counter()
+        try:
+            response = await self._models.generate_content(model=model, contents=contents, config=config)
+        except Exception as e:
+            self._owner._record_error(model, contents, config, e, time.perf_counter() - start)
+            raise
+        self._owner._record(model, contents, config, response, time.perf_counter() - start)
+        return response
+
+
+class _Aio:
+    def __init__(self, models):
+        self.models = models
+
+
+class RecordingClient:
+    """Pass-through wrapper around a real client that appends every call to a JSONL cassette"""
+
+    def __init__(self, client, path):
+        self.client = client
+        self.path = path
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self.models = _RecordingModels(self, client.models)
+        self.aio = _Aio(_RecordingAsyncModels(self, client.aio.models))
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self.recorded += 1
+
+    def _record(self, model, contents, config, response, latency, chunks=None, chunk_offsets=None):
+        text = "".join(chunks) if chunks is not None else _text_of(response)
+        self._write({
+            "key": call_key(model, contents, config),
+            "model": model,
+            "prompt": str(contents),
+            "text": text,
+            "finish_reason": _finish_reason(response) if response is not None else None,
+            "usage": _usage(response) if response is not None else {},
+            "latency": round(latency, 6),
+            "chunks": chunks,
+            "chunk_offsets": [round(t, 6) for t in chunk_offsets] if chunk_offsets else None,
+            "recorded_at": time.time(),
+        })
+
+    def _record_error(self, model, contents, config, error, latency):
+        code = getattr(error, "code", None) or getattr(error, "status_code", None)
+        self._write({
+            "key": call_key(model, contents, config),
+            "model": model,
+            "prompt": str(contents),
+            "error": {"code": code if isinstance(code, int) else None, "message": str(error)},
+            "latency": round(latency, 6),
+            "recorded_at": time.time(),
+        })
+
+
+# --- Replay ---
+
+def make_latency(spec, recorded=()):
+    """
+    Latency model from a spec; returns fn(rng, record) -> seconds.
+    See the module docstring for the accepted specs.
+    """
+    if spec is None or spec == "recorded":
+        return lambda rng, record: record.get("latency", 0.0)
+    if isinstance(spec, (int, float)):
+        return lambda rng, record: float(spec)
+    if callable(spec):
+        return spec
+    kind, _, args = str(spec).partition(":")
+    params = [float(p) for p in args.split(",") if p.strip()]
+    if kind == "uniform":
+        low, high = params
+        return lambda rng, record: rng.uniform(low, high)
+    if kind == "lognormal":
+        median, sigma = params
+        return lambda rng, record: median * rng.lognormvariate(0.0, sigma)
+    if kind == "normal":
+        mean, sd = params
+        return lambda rng, record: max(0.0, rng.gauss(mean, sd))
+    if kind == "empirical":
+        pool = [r["latency"] for r in recorded if r.get("latency") is not None] or [0.0]
+        return lambda rng, record: rng.choice(pool)
+    try:
+        constant = float(spec)
+    except ValueError:
+        raise ValueError(f"Unknown latency spec {spec!r}") from None
+    return lambda rng, record: constant
+
+
+def _truncate(text, rng):
+    """Cut JSON text somewhere in its middle half, like a response hitting the token limit"""
+    if len(text) < 8:
+        return text[:len(text) // 2]
+    return text[:rng.randint(len(text) // 4, 3 * len(text) // 4)]
+
+
+class _ReplayModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model, contents, config=None):
+        error, response, delay, _ = self._owner._plan(model, contents, config)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return response
+
+    def generate_content_stream(self, model, contents, config=None):
+        error, response, delay, chunks = self._owner._plan(model, contents, config, stream=True)
+        if error is not None:
+            if delay:
+                time.sleep(delay)
+            raise error
+        for i, (piece, wait) in enumerate(chunks):
+            if wait:
+                time.sleep(wait)
+            last = i == len(chunks) - 1
+            yield FakeResponse(piece, finish_reason=response.candidates[0].finish_reason if last else None)
+
+
+class _ReplayAsyncModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def generate_content(self, model, contents, config=None):
+        error, response, delay, _ = self._owner._plan(model, contents, config)
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return response
+
+
+class ReplayClient:
+    """
+    Serves recorded responses with configurable latency, stream chunking
+    and injected failures. `source` is a cassette path or a list of
+    records; `errors` maps an ERROR_KINDS entry to its probability per
+    call; `chunk_size` re-splits stream text (None keeps the recorded
+    chunks); `time_scale` multiplies every delay. Seeded, so a run can be
+    repeated exactly when calls arrive in the same order.
+    """
+
+    def __init__(self, source, latency="recorded", errors=None, chunk_size=None, on_miss="cycle",
+                 seed=0, time_scale=1.0):
+        self.records = load_cassette(source) if isinstance(source, str) else list(source)
+        # Recorded failures replay in sequence for their own prompt, never for misses
+        self._answers = [r for r in self.records if "error" not in r]
+        if not self._answers:
+            raise ValueError("No successful responses to replay")
+        self._by_key = {}
+        for record in self.records:
+            self._by_key.setdefault(record.get("key"), []).append(record)
+        self.latency = make_latency(latency, self._answers)
+        self.errors = dict(errors or {})
+        unknown = set(self.errors) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown error kinds: {', '.join(sorted(unknown))}")
+        self.chunk_size = chunk_size
+        self.on_miss = on_miss
+        self.time_scale = time_scale
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cursor = 0
+        self._served = {}  # key -> times served (to walk through repeated recordings)
+        self.stats = {"calls": 0, "hits": 0, "misses": 0, **{f"injected_{k}": 0 for k in ERROR_KINDS}}
+        self.models = _ReplayModels(self)
+        self.aio = _Aio(_ReplayAsyncModels(self))
+
+    def _pick(self, key):
+        matches = self._by_key.get(key)
+        if matches:
+            self.stats["hits"] += 1
+            n = self._served.get(key, 0)
+            self._served[key] = n + 1
+            return matches[n % len(matches)]
+        self.stats["misses"] += 1
+        if self.on_miss == "error":
+            return None
+        record = self._answers[self._cursor % len(self._answers)]
+        self._cursor += 1
+        return record
+
+    def _injected(self):
+        for kind in ERROR_KINDS:
+            p = self.errors.get(kind)
+            if p and self._rng.random() < p:
+                self.stats[f"injected_{kind}"] += 1
+                return kind
+        return None
+
+    def _plan(self, model, contents, config, stream=False):
+        """Decide one call under the lock: (error, response, delay, [(chunk, wait)])"""
+        with self._lock:
+            self.stats["calls"] += 1
+            record = self._pick(call_key(model, contents, config))
+            if record is None:
+                return FakeAPIError(404, "prompt not in cassette"), None, 0.0, []
+            delay = max(0.0, self.latency(self._rng, record)) * self.time_scale
+            if "error" in record:
+                code = record["error"].get("code") or 500
+                message = record["error"].get("message", "")
+                if message.startswith(f"{code} "):
+                    message = message[len(str(code)) + 1:]
+                return FakeAPIError(code, message), None, delay, []
+            kind = self._injected()
+            if kind in ("429", "500", "503"):
+                return FakeAPIError(int(kind), "injected failure"), None, delay, []
+            text = record.get("text") or ""
+            finish = record.get("finish_reason") or "STOP"
+            if kind == "safety":
+                text, finish = "", "SAFETY"
+            elif kind == "malformed":
+                text, finish = _truncate(text, self._rng), "MAX_TOKENS"
+            chunks = self._chunks(record, text, delay) if stream else []
+
+        usage = record.get("usage") or {}
+        response = FakeResponse(text, finish_reason=finish, prompt_tokens=usage.get("prompt_tokens", len(str(contents)) // 4))
+        if usage.get("output_tokens"):
+            response.usage_metadata = FakeUsage(usage.get("prompt_tokens", 0), usage["output_tokens"])
+        return None, response, delay, chunks
+
+    def _chunks(self, record, text, delay):
+        recorded = record.get("chunks")
+        if self.chunk_size is None and recorded and "".join(recorded) == text:
+            pieces = recorded
+        else:
+            size = self.chunk_size or 64
+            pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        # Recorded stream timing is rescaled to this call's latency when it fits
+        offsets = record.get("chunk_offsets")
+        total = record.get("latency") or 0.0
+        if pieces is recorded and offsets and len(offsets) == len(pieces) and total > 0:
+            times = [delay * t / total for t in offsets]
+        else:
+            first = delay * FIRST_CHUNK_SHARE
+            rest = (delay - first) / max(1, len(pieces) - 1)
+            times = [first + rest * i for i in range(len(pieces))]
+        waits = [b - a for a, b in zip([0.0] + times, times)]
+        return list(zip(pieces, waits))
+
+
+def client_from_env(environ=None):
+    """
+    Client named by SYNAPTIC_GENAI ("record:<path>" wraps the real client,
+    "replay:<path>" replays; SYNAPTIC_GENAI_LATENCY and
+    SYNAPTIC_GENAI_ERRORS="429=0.05,safety=0.01" tune replay), or None.
+    """
+    environ = os.environ if environ is None else environ
+    mode, _, path = environ.get("SYNAPTIC_GENAI", "").partition(":")
+    if not mode:
+        return None
+    if mode == "record":
+        from gemini_to_net_v1 import client_pool
+        return RecordingClient(client_pool.get(), path or "genai_cassette.jsonl")
+    if mode == "replay":
+        errors = {}
+        for item in environ.get("SYNAPTIC_GENAI_ERRORS", "").split(","):
+            if "=" in item:
+                kind, _, p = item.partition("=")
+                errors[kind.strip()] = float(p)
+        return ReplayClient(path or "genai_cassette.jsonl",
+                            latency=environ.get("SYNAPTIC_GENAI_LATENCY", "recorded"), errors=errors)
+    raise ValueError(f"Unknown SYNAPTIC_GENAI mode {mode!r} (expected record:<path> or replay:<path>)")
@@ -0,0 +1,406 @@
+"""
+Incremental netlist and operating-point updates for small circuit edits.
+
+Both keep the last version of a (generator-schema) circuit and diff the
+next one against it. When only component values changed:
+
+  IncrementalNetlist   re-renders just those element lines and patches
+                       them into the file in place (same byte length) or
+                       rewrites the file from the cached lines; validation
+                       is skipped, since connectivity can't have changed
+  IncrementalOperatingPoint
+                       keeps the MnaSystem and the LU factors of the DC
+                       matrix; a resistor edit is a rank-1 change of G and
+                       is folded in with the Woodbury identity (one extra
+                       triangular solve per edited resistor), source edits
+                       only change b, and C/L edits don't affect DC at all
+
+Anything structural (components added, removed, reordered or rewired, or a
+value that no longer parses) falls back to a full rebuild.
+
+    netlist = IncrementalNetlist("generated_circuits/amp.cir")
+    netlist.update(circuit)                    # {"path", "mode": "full", ...}
+    circuit["components"][42]["value"] = "5.6k"
+    netlist.update(circuit)                    # mode "patched", changed ["R42"]
+
+    op = IncrementalOperatingPoint(circuit)
+    op.result()["node_voltages"]["out"]
+    op.set_values({"R42": "5.6k"})             # skips the diff when the edit is known
+
+SuperLU (scipy's splu) has no way to refactorize new values on an old
+symbolic analysis, so after `max_rank` distinct resistors have been
+edited the matrix is factorized again from scratch and the low-rank
+terms reset.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from circuit_validator import validate_circuit
+from mna_solver import DEFAULT_GMIN, CircuitError, MnaSystem, parse_source, parse_value
+from netlist_writer import atomic_open, circuit_title, element_line
+
+log = logging.getLogger(__name__)
+
+# Distinct edited resistors folded in before the DC matrix is refactorized
+MAX_RANK = 32
+
+
+def spice_name(comp):
+    return f"{str(comp.get('type', '')).upper()}{comp.get('id', '')}"
+
+
+def _snapshot(comp):
+    # Own copy (nodes included), so callers editing their dicts in place still diff
+    copy = dict(comp)
+    if isinstance(copy.get("nodes"), list):
+        copy["nodes"] = list(copy["nodes"])
+    return copy
+
+
+def _positions(components):
+    """Spice name -> list index; names used more than once map to None"""
+    positions = {}
+    for i, comp in enumerate(components):
+        name = spice_name(comp)
+        positions[name] = None if name in positions else i
+    return positions
+
+
+def diff_circuits(old, new):
+    """
+    Changes from `old` to `new`, component by component in list order.
+
+    Returns {"structural", "values": {spice name: new value}, "positions":
+    {spice name: index}, "title", "simulation"}. "structural" is True when
+    anything besides values, the name and the directive differs; "values"
+    is then empty.
+    """
+    diff = {"structural": False, "values": {}, "positions": {},
+            "title": old.get("circuit_name") != new.get("circuit_name"),
+            "simulation": old.get("simulation") != new.get("simulation")}
+    before, after = old.get("components", []), new.get("components", [])
+    if len(before) != len(after):
+        diff["structural"] = True
+        return diff
+    for i, (a, b) in enumerate(zip(before, after)):
+        if a == b:
+            continue
+        if not isinstance(b, dict) or {k: v for k, v in a.items() if k != "value"} != \
+                {k: v for k, v in b.items() if k != "value"}:
+            diff["structural"] = True
+            diff["values"].clear()
+            diff["positions"].clear()
+            return diff
+        name = spice_name(b)
+        if name in diff["values"]:
+            # Duplicate names can't be patched by name
+            diff["structural"] = True
+            diff["values"].clear()
+            diff["positions"].clear()
+            return diff
+        diff["values"][name] = b.get("value")
+        diff["positions"][name] = i
+    return diff
+
+
+class IncrementalNetlist:
+    """A netlist file kept in step with a circuit; value edits rewrite only their lines"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.data = None      # snapshot of what was last written
+        self.lines = []       # netlist lines, with newlines
+        self._line_of = {}    # component index -> line index
+        self._position = {}   # spice name -> component index
+        self._offsets = None  # byte offset of every line (computed when needed)
+        self._stat = None     # (mtime_ns, size) after our last write
+        self._lock = threading.Lock()
+
+    def _file_unchanged(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        return (st.st_mtime_ns, st.st_size) == self._stat
+
+    def _remember_stat(self):
+        st = os.stat(self.path)
+        self._stat = (st.st_mtime_ns, st.st_size)
+
+    def _write_all(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with atomic_open(self.path) as f:
+            f.writelines(self.lines)
+        self._offsets = None
+        self._remember_stat()
+
+    def _full(self, data, validate):
+        if validate:
+            report = validate_circuit(data, repair=True)
+            if not report["ok"]:
+                return None
+            data = report["circuit"]
+        # The same lines netlist_lines() gives, remembering where each component went
+        lines, line_of = [f".title {circuit_title(data)}\n"], {}
+        components = data.get("components", [])
+        for i, comp in enumerate(components):
+            try:
+                line = element_line(comp)
+            except (KeyError, IndexError, TypeError) as e:
+                log.warning("Could not add component %s: %s", spice_name(comp), e)
+                continue
+            if line is not None:
+                line_of[i] = len(lines)
+                lines.append(line + "\n")
+        lines.append(f"{data.get('simulation', '.op')}\n")
+        lines.append(".end\n")
+        self.lines, self._line_of = lines, line_of
+        self.data = dict(data, components=[_snapshot(c) for c in components])
+        self._position = _positions(components)
+        self._write_all()
+        return self.path
+
+    def _patch(self, edits):
+        """Replace {line index: text}; in place when every length matches, else rewrite"""
+        old = {i: self.lines[i] for i in edits}
+        for i, text in edits.items():
+            self.lines[i] = text
+        same_size = all(len(text.encode("utf-8")) == len(old[i].encode("utf-8")) for i, text in edits.items())
+        if not (same_size and self._file_unchanged()):
+            self._write_all()
+            return "rewritten"
+        if self._offsets is None:
+            offsets, position = [], 0
+            for line in self.lines:
+                offsets.append(position)
+                position += len(line.encode("utf-8"))
+            self._offsets = offsets
+        with open(self.path, "r+b") as f:
+            for i in sorted(edits):
+                f.seek(self._offsets[i])
+                f.write(edits[i].encode("utf-8"))
+        self._remember_stat()
+        return "patched"
+
+    def update(self, data, validate=True):
+        """
+        Bring the file in line with `data`. Returns {"path", "mode", "changed"}:
+        mode is "full", "patched", "rewritten" or "unchanged"; path is None
+        when validation rejected the circuit.
+        """
+        with self._lock:
+            if self.data is None or not self._file_unchanged():
+                return {"path": self._full(data, validate), "mode": "full", "changed": []}
+            diff = diff_circuits(self.data, data)
+            result = None
+            if not diff["structural"]:
+                header = {}
+                if diff["title"]:
+                    header["circuit_name"] = data.get("circuit_name")
+                if diff["simulation"]:
+                    header["simulation"] = data.get("simulation")
+                result = self._apply({i: data["components"][i] for i in diff["positions"].values()}, header)
+            return result or {"path": self._full(data, validate), "mode": "full", "changed": []}
+
+    def _apply(self, changes, header):
+        """Patch in {component index: component} and header fields; None if a line can't be rendered"""
+        edits, rendered = {}, {}
+        for i, comp in changes.items():
+            comp = rendered[i] = _snapshot(comp)
+            try:
+                line = element_line(comp)
+            except (KeyError, IndexError, TypeError):
+                return None
+            if i in self._line_of and line is not None:
+                edits[self._line_of[i]] = line + "\n"
+        for i, comp in rendered.items():
+            self.data["components"][i] = comp
+        self.data.update(header)
+        if "circuit_name" in header:
+            edits[0] = f".title {circuit_title(self.data)}\n"
+        if "simulation" in header:
+            edits[len(self.lines) - 2] = f"{self.data.get('simulation', '.op')}\n"
+        changed = [spice_name(comp) for comp in rendered.values()]
+        return {"path": self.path, "mode": self._patch(edits) if edits else "unchanged", "changed": changed}
+
+    def set_values(self, values):
+        """Apply known edits {spice name: value} without diffing the whole circuit"""
+        with self._lock:
+            changes = {}
+            for name, value in values.items():
+                i = self._position.get(name)
+                if i is None:
+                    raise KeyError(name)
+                changes[i] = dict(self.data["components"][i], value=value)
+            result = self._apply(changes, {}) if self._file_unchanged() else None
+            if result is None:
+                data = dict(self.data, components=[changes.get(i, c) for i, c in enumerate(self.data["components"])])
+                result = {"path": self._full(data, False), "mode": "full", "changed": []}
+            return result
+
+
+# Netlists being kept incrementally, by absolute path (least recently used dropped)
+_netlists = OrderedDict()
+_netlists_lock = threading.Lock()
+MAX_TRACKED = 64
+
+
+def save_netlist(data, file_path, validate=True):
+    """build_and_save_netlist(incremental=True): write or patch `file_path`; returns its path or None"""
+    path = os.path.abspath(file_path)
+    with _netlists_lock:
+        netlist = _netlists.get(path)
+        if netlist is None:
+            netlist = _netlists[path] = IncrementalNetlist(path)
+        _netlists.move_to_end(path)
+        while len(_netlists) > MAX_TRACKED:
+            _netlists.popitem(last=False)
+    return netlist.update(data, validate=validate)["path"]
+
+
+class IncrementalOperatingPoint:
+    """DC operating point that is updated, not re-solved from scratch, after value edits"""
+
+    def __init__(self, data, gmin=DEFAULT_GMIN, max_rank=MAX_RANK):
+        self.gmin = gmin
+        self.max_rank = max_rank
+        self._rebuild(data)
+
+    def _rebuild(self, data):
+        self.data = dict(data, components=[_snapshot(c) for c in data.get("components", [])])
+        self.system = MnaSystem(self.data, gmin=self.gmin)
+        if self.system.size == 0:
+            raise CircuitError("Circuit has no analysable components")
+        self._position = _positions(self.data["components"])
+        self._element = {e["name"]: k for k, e in enumerate(self.system.elements)}
+        if len(self._element) != len(self.system.elements):
+            self._element = None  # duplicate names: every edit rebuilds
+        self._factorize()
+
+    def _factorize(self):
+        G, _ = self.system.matrices()
+        try:
+            self._lu = splu(G)
+        except RuntimeError as e:
+            raise CircuitError(f"Singular circuit matrix ({e})") from None
+        self._base = self.system.values.copy()
+        self._delta = {}  # element -> conductance change since factorization
+        self._z = {}      # element -> G0^-1 u for its incidence vector u
+        self._x = None
+
+    def _incidence(self, k):
+        a, b = self.system.elements[k]["nodes"]
+        return [(node, sign) for node, sign in ((a, 1.0), (b, -1.0)) if node >= 0]
+
+    def _set(self, k, value):
+        element = self.system.elements[k]
+        ctype = element["type"]
+        if ctype in ("V", "I"):
+            spec = parse_source(value)
+            self.system.sources[k] = spec
+            number = spec["dc"]
+        else:
+            number = parse_value(value)
+            if ctype == "R" and number == 0:
+                raise CircuitError("zero resistance")
+        self.system.values[k] = number
+        if ctype == "R":
+            delta = 1.0 / number - 1.0 / self._base[k]
+            if delta == 0:
+                self._delta.pop(k, None)
+            else:
+                self._delta[k] = delta
+        self._x = None
+
+    def _apply(self, values, positions=None):
+        """Apply {spice name: value}; False if a rebuild is needed instead"""
+        if self._element is None:
+            return False
+        pending = {}
+        for name, value in values.items():
+            k = self._element.get(name)
+            if k is None:
+                return False
+            pending[k] = value
+        try:
+            for k, value in pending.items():
+                self._set(k, value)
+        except (ValueError, TypeError):
+            return False
+        if positions is not None:
+            for name, i in positions.items():
+                self.data["components"][i]["value"] = values[name]
+        if len(self._delta) > self.max_rank:
+            self._factorize()
+        return True
+
+    def update(self, data):
+        """Move to a new version of the circuit; returns "unchanged", "updated" or "rebuilt" """
+        diff = diff_circuits(self.data, data)
+        if not diff["structural"] and not diff["values"]:
+            self.data["circuit_name"] = data.get("circuit_name")
+            self.data["simulation"] = data.get("simulation")
+            return "unchanged"
+        if diff["structural"] or not self._apply(diff["values"], diff["positions"]):
+            self._rebuild(data)
+            return "rebuilt"
+        return "updated"
+
+    def set_values(self, values):
+        """Apply known edits {spice name: value}; returns "updated" or "rebuilt" """
+        positions = {name: self._position.get(name) for name in values}
+        if None not in positions.values() and self._apply(values, positions):
+            return "updated"
+        data = dict(self.data, components=[
+            dict(c, value=values[spice_name(c)]) if spice_name(c) in values else c
+            for c in self.data["components"]
+        ])
+        self._rebuild(data)
+        return "rebuilt"
+
+    def solve(self):
+        """Solution vector for the current values"""
+        if self._x is not None:
+            return self._x
+        y = self._lu.solve(self.system.rhs())
+        if self._delta:
+            # Woodbury: (G0 + U D U^T)^-1 b = y - Z (D^-1 + U^T Z)^-1 U^T y, Z = G0^-1 U
+            edited = list(self._delta)
+            for k in edited:
+                if k not in self._z:
+                    u = np.zeros(self.system.size)
+                    for node, sign in self._incidence(k):
+                        u[node] = sign
+                    self._z[k] = self._lu.solve(u)
+            Z = np.column_stack([self._z[k] for k in edited])
+            UtZ = np.zeros((len(edited), len(edited)))
+            Uty = np.zeros(len(edited))
+            for i, k in enumerate(edited):
+                for node, sign in self._incidence(k):
+                    UtZ[i] += sign * Z[node]
+                    Uty[i] += sign * y[node]
+            S = UtZ + np.diag([1.0 / self._delta[k] for k in edited])
+            try:
+                y = y - Z @ np.linalg.solve(S, Uty)
+            except np.linalg.LinAlgError:
+                self._factorize()
+                return self.solve()
+        if not np.all(np.isfinite(y)):
+            raise CircuitError("Singular circuit matrix (floating loop of sources or inductors?)")
+        self._x = y
+        return y
+
+    def result(self):
+        """Same shape as mna_solver.dc_operating_point()"""
+        unpacked = self.system.unpack(self.solve())
+        return {
+            "circuit_name": self.data.get("circuit_name", "Design"),
+            "node_voltages": {k: float(v) for k, v in unpacked["node_voltages"].items()},
+            "branch_currents": {k: float(v) for k, v in unpacked["branch_currents"].items()},
+            "skipped": self.system.skipped,
+        }
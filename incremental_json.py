@@ -0,0 +1,100 @@
+"""
+Incremental parser for streamed LLM JSON output.
+
+Text arrives in arbitrary chunks. The parser tracks string/escape state
+and nesting depth, and whenever an element of one of the watched
+top-level arrays (e.g. "components", "connections") closes, that element
+is decoded and returned immediately, long before the document is done:
+
+    parser = IncrementalArrayParser(("components", "connections"))
+    for chunk in stream:
+        for key, item in parser.feed(chunk):
+            ...
+    circuit = parser.finish()
+"""
+import json
+
+
+class IncrementalArrayParser:
+    def __init__(self, keys=("components", "connections")):
+        self.keys = set(keys)
+        self._chunks = []          # everything fed, joined on demand
+        # Only the unfinished tail (an open element or key string) is kept
+        # for scanning; positions below are absolute offsets into the stream
+        self._buffer = ""
+        self._base = 0             # offset of _buffer[0]
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None   # most recent string closed at depth 1
+        self._key = None           # key of the value being read at depth 1
+        self._array_key = None     # watched array we are inside (depth 2)
+        self._item_start = None
+        self._doc_start = None
+
+    def feed(self, chunk):
+        """Consume more text; return [(array_key, item)] for elements completed by it"""
+        self._chunks.append(chunk)
+        completed = []
+        base = self._base
+        text = self._buffer + chunk
+        i = len(self._buffer)
+        while i < len(text):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start - base:i + 1]
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = base + i
+            elif ch == ":" and self._depth == 1:
+                self._key = json.loads(self._last_string) if self._last_string else None
+            elif ch in "{[":
+                if self._depth == 0:
+                    self._doc_start = base + i
+                elif self._depth == 1 and ch == "[" and self._key in self.keys:
+                    self._array_key = self._key
+                elif self._depth == 2 and self._array_key is not None:
+                    self._item_start = base + i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._item_start is not None:
+                    try:
+                        completed.append((self._array_key, json.loads(text[self._item_start - base:i + 1])))
+                    except ValueError:
+                        pass  # malformed element; the final parse will report it
+                    self._item_start = None
+                elif self._depth == 1:
+                    self._array_key = None
+            i += 1
+
+        keep = len(text)
+        if self._item_start is not None:
+            keep = self._item_start - base
+        elif self._in_string and self._depth == 1:
+            keep = self._string_start - base
+        self._buffer = text[keep:]
+        self._base = base + keep
+        return completed
+
+    @property
+    def text(self):
+        """Everything fed so far"""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def finish(self):
+        """Decode the complete document (raises ValueError if it is not valid JSON)"""
+        text = self.text
+        start = self._doc_start if self._doc_start is not None else 0
+        end = text.rfind("}") + 1 or len(text)
+        return json.loads(text[start:end])
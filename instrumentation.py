@@ -0,0 +1,254 @@
+"""
+In-process metrics: timing spans, counters and histograms, rendered in the
+Prometheus text format (server.py serves them at /metrics).
+
+    with span("validate"):              # synaptic_stage_duration_seconds{stage="validate"}
+        report = validate_circuit(data)
+    count("cache_lookups_total", cache="responses", result="hit")
+    observe("http_request_duration_seconds", 0.012, method="GET", endpoint="/api/circuits")
+    gauge("cache_items", lambda: {(("cache", "responses"),): len(cache)})
+
+Every metric name gets the "synaptic_" prefix. Metrics live in this
+process only: simulation workers and batch runs keep their own registry
+(batch_cli reports its own progress).
+
+Logging is configured once with configure_logging(); the level comes from
+SYNAPTIC_LOG_LEVEL (default INFO). Library modules only create loggers.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+PREFIX = "synaptic_"
+
+# Seconds; LLM calls run into tens of seconds, cache hits take microseconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    "stage_duration_seconds": "Time spent per pipeline stage",
+    "http_requests_total": "HTTP requests by method, route and status",
+    "http_request_duration_seconds": "HTTP request latency by method and route (streamed bodies until closed)",
+    "cache_lookups_total": "Cache lookups by cache and result",
+    "llm_requests_total": "Gemini calls by outcome",
+    "llm_tokens_total": "Gemini token usage by kind",
+    "llm_retries_total": "Gemini calls retried after a retryable error",
+    "safety_blocks_total": "Responses stopped by Gemini's safety filters",
+    "netlists_written_total": "Netlists written (deduplicated ones are not counted)",
+    "simulation_duration_seconds": "Simulation job run time by analysis",
+    "cache_hits_memory_total": "Cache hits served from the in-process tier",
+    "cache_hits_disk_total": "Cache hits served from the SQLite tier",
+    "cache_misses_total": "Cache lookups that found nothing",
+    "cache_evictions_total": "Cache entries dropped to stay within a size limit",
+    "cache_memory_items": "Entries in a cache's in-process tier",
+    "cache_disk_items": "Entries in a cache's SQLite tier",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "n")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.n += 1
+
+
+class Registry:
+    """Thread-safe store of counters, histograms and callbacks read at render time"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}    # name -> {label key: value}
+        self._histograms = {}  # name -> {label key: _Histogram}
+        self._callbacks = {}   # name -> (callback, "gauge" or "counter")
+
+    def count(self, name, value=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(self.buckets)
+            hist.observe(value)
+
+    def gauge(self, name, callback, kind="gauge"):
+        """
+        Register a metric read at render time; callback() returns a number
+        or {label key: number}, where a label key is a tuple of (name, value).
+        kind="counter" exports it as a counter, for totals kept elsewhere
+        that only ever grow.
+        """
+        if kind not in ("gauge", "counter"):
+            raise ValueError(f"Unknown metric kind {kind!r}")
+        with self._lock:
+            self._callbacks[name] = (callback, kind)
+
+    def value(self, name, **labels):
+        """Current counter value (0 if never counted)"""
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def snapshot(self, name, **labels):
+        """{"count", "sum"} of a histogram series (zeros if never observed)"""
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(_label_key(labels))
+            return {"count": hist.n, "sum": hist.total} if hist else {"count": 0, "sum": 0.0}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def header(name, kind):
+            full = PREFIX + name
+            if name in HELP:
+                lines.append(f"# HELP {full} {HELP[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {key: (list(h.counts), h.total, h.n) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+            callbacks = dict(self._callbacks)
+
+        for name in sorted(counters):
+            full = header(name, "counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{full}{_format_labels(key)} {_format_number(value)}")
+
+        for name in sorted(histograms):
+            full = header(name, "histogram")
+            for key, (counts, total, n) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, c in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += c
+                    lines.append(f"{full}_bucket{_format_labels(key, [('le', _format_number(bound))])} {cumulative}")
+                lines.append(f"{full}_sum{_format_labels(key)} {_format_number(total)}")
+                lines.append(f"{full}_count{_format_labels(key)} {n}")
+
+        for name in sorted(callbacks):
+            callback, kind = callbacks[name]
+            try:
+                values = callback()
+            except Exception as e:
+                logging.getLogger(__name__).warning("Metric callback %s failed: %s", name, e)
+                continue
+            full = header(name, kind)
+            if not isinstance(values, dict):
+                values = {(): values}
+            for key, value in sorted(values.items()):
+                lines.append(f"{full}{_format_labels(key)} {_format_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def count(name, value=1, **labels):
+    """Add `value` to a counter"""
+    registry.count(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    """Record one histogram observation"""
+    registry.observe(name, value, **labels)
+
+
+def gauge(name, callback, kind="gauge"):
+    registry.gauge(name, callback, kind)
+
+
+@contextmanager
+def span(stage):
+    """Time the block into synaptic_stage_duration_seconds{stage=...} (also when it raises)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe("stage_duration_seconds", time.perf_counter() - start, stage=stage)
+
+
+_caches = {}
+
+
+def _cache_stat(field):
+    def callback():
+        return {(("cache", name),): cache.stats()[field] for name, cache in sorted(_caches.items())}
+    return callback
+
+
+def cache_gauges(name, cache):
+    """
+    Expose a TieredCache's stats() with a cache=name label: hits, misses and
+    evictions as synaptic_cache_*_total counters, item counts as gauges
+    """
+    _caches[name] = cache
+    for field in ("hits_memory", "hits_disk", "misses", "evictions"):
+        registry.gauge(f"cache_{field}_total", _cache_stat(field), kind="counter")
+    for field in ("memory_items", "disk_items"):
+        registry.gauge(f"cache_{field}", _cache_stat(field))
+
+
+def record_usage(response):
+    """Count prompt/output tokens from a generate_content response's usage_metadata"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for kind, attr in (("prompt", "prompt_token_count"), ("output", "candidates_token_count")):
+        tokens = getattr(usage, attr, None)
+        if tokens:
+            registry.count("llm_tokens_total", tokens, kind=kind)
+
+
+def configure_logging(level=None):
+    """Set up root logging once; level defaults to $SYNAPTIC_LOG_LEVEL or INFO"""
+    level = (level or os.environ.get("SYNAPTIC_LOG_LEVEL", "INFO")).upper()
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger().setLevel(level)
@@ -0,0 +1,321 @@
+"""
+Tolerant parsing for circuit JSON produced by the model.
+
+Well-formed text goes straight through json.loads. Anything else gets
+one linear repair pass before giving up:
+
+  - markdown fences and prose around the JSON are dropped
+  - single-quoted strings become double-quoted (the system prompt itself
+    shows the schema with single quotes)
+  - trailing/duplicate commas and comments are removed
+  - True/False/None become true/false/null; bare keys and words are quoted
+  - truncated output is cut back to the last complete value and every
+    open array/object is closed
+
+The decoded data is then coerced to the circuit schema (missing ids and
+defaults filled in, unusable entries dropped). Every step is reported:
+
+    circuit, changes = parse_circuit(response.text)
+    # changes == ["Closed 2 truncated brackets", "Dropped component 3: no nodes"]
+"""
+import json
+import re
+
+from circuit_ir import VISUAL_NAMES, VISUAL_TYPES
+
+_FENCE = re.compile(r"```[a-zA-Z]*")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$")
+_DELIMITERS = set(",:[]{}\"'/ \t\r\n")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def strip_fences(text):
+    """Drop markdown code fences (```json ... ```)"""
+    return _FENCE.sub("", text).strip()
+
+
+def _last_significant(out):
+    for k in range(len(out) - 1, -1, -1):
+        if not out[k].isspace():
+            return k
+    return -1
+
+
+def repair_json_text(text):
+    """Best-effort fix of almost-JSON text; returns (fixed_text, changes)"""
+    changes = []
+    starts = [k for k in (text.find("{"), text.find("[")) if k >= 0]
+    if not starts:
+        raise ValueError("No JSON object or array in the response")
+    i = min(starts)
+    if text[:i].strip():
+        changes.append("Dropped text before the JSON")
+
+    out = []        # output pieces
+    stack = []      # open brackets
+    expect_key = [] # per open bracket: next string in this object is a key
+    safe = 0        # len(out) where closing the open brackets gives valid JSON
+    quoted = unquoted = literals = commas = 0
+    n = len(text)
+
+    def mark_value():
+        nonlocal safe
+        safe = len(out)
+
+    while i < n:
+        ch = text[i]
+        if ch.isspace():
+            out.append(ch)
+            i += 1
+        elif ch == '"' or ch == "'":
+            j = i + 1
+            buf = []
+            while j < n and text[j] != ch:
+                c = text[j]
+                if c == "\\" and j + 1 < n:
+                    buf.append("'" if ch == "'" and text[j + 1] == "'" else text[j:j + 2])
+                    j += 2
+                    continue
+                if c == '"':
+                    buf.append('\\"')
+                elif c == "\n":
+                    buf.append("\\n")
+                else:
+                    buf.append(c)
+                j += 1
+            if j >= n:
+                break  # truncated inside a string
+            if ch == "'":
+                quoted += 1
+            is_key = bool(stack) and stack[-1] == "{" and expect_key[-1]
+            out.append('"' + "".join(buf) + '"')
+            if not is_key:
+                mark_value()
+            i = j + 1
+        elif ch in "{[":
+            stack.append(ch)
+            expect_key.append(ch == "{")
+            out.append(ch)
+            mark_value()
+            i += 1
+        elif ch in "}]":
+            if not stack:
+                break
+            k = _last_significant(out)
+            if k >= 0 and out[k] == ",":
+                del out[k]
+                commas += 1
+            closer = _CLOSERS[stack.pop()]
+            expect_key.pop()
+            if closer != ch:
+                changes.append(f"Replaced mismatched '{ch}' with '{closer}'")
+            out.append(closer)
+            mark_value()
+            i += 1
+            if not stack:
+                if text[i:].strip():
+                    changes.append("Dropped text after the JSON")
+                break
+        elif ch == ":":
+            out.append(ch)
+            if stack and stack[-1] == "{":
+                expect_key[-1] = False
+            i += 1
+        elif ch == ",":
+            k = _last_significant(out)
+            if k < 0 or out[k] in ",[{":
+                commas += 1
+            else:
+                out.append(ch)
+                if stack and stack[-1] == "{":
+                    expect_key[-1] = True
+            i += 1
+        elif ch == "/" and text.startswith(("//", "/*"), i):
+            end = text.find("\n", i) if text[i + 1] == "/" else text.find("*/", i)
+            if end < 0:
+                break
+            changes.append("Removed a comment")
+            i = end + (1 if text[i + 1] == "/" else 2)
+        else:
+            j = i
+            while j < n and text[j] not in _DELIMITERS:
+                j += 1
+            if j >= n:
+                break  # truncated inside a bare token
+            token = text[i:j] or text[i]
+            j = max(j, i + 1)
+            is_key = bool(stack) and stack[-1] == "{" and expect_key[-1]
+            if not is_key and token in _LITERALS:
+                if _LITERALS[token] != token:
+                    literals += 1
+                out.append(_LITERALS[token])
+            elif not is_key and _NUMBER.match(token):
+                out.append(token)
+            else:
+                unquoted += 1
+                out.append(json.dumps(token))
+            if not is_key:
+                mark_value()
+            i = j
+
+    if quoted:
+        changes.append(f"Converted {quoted} single-quoted strings")
+    if commas:
+        changes.append(f"Removed {commas} stray commas")
+    if literals:
+        changes.append(f"Converted {literals} Python literals")
+    if unquoted:
+        changes.append(f"Quoted {unquoted} bare words")
+    if stack:
+        del out[safe:]
+        k = _last_significant(out)
+        if k >= 0 and out[k] == ",":
+            del out[k:]
+        changes.append(f"Closed {len(stack)} truncated brackets")
+        out.extend(_CLOSERS[b] for b in reversed(stack))
+    if not out:
+        raise ValueError("Empty JSON")
+    return "".join(out), changes
+
+
+def loads_tolerant(text):
+    """json.loads that falls back to repair_json_text; returns (data, changes)"""
+    stripped = strip_fences(text)
+    try:
+        return json.loads(stripped), []
+    except ValueError:
+        pass
+    fixed, changes = repair_json_text(stripped)
+    return json.loads(fixed), changes
+
+
+def _text(value):
+    return value if isinstance(value, str) else ("" if value is None else str(value))
+
+
+def _explicit_ids(components, key):
+    """Ids the model did give, so auto-numbering can avoid them"""
+    return {key(comp) for comp in components if isinstance(comp, dict) and _text(comp.get("id")).strip()}
+
+
+def _coerce_generator(data, changes):
+    if not isinstance(data.get("circuit_name"), str) or not data["circuit_name"].strip():
+        data["circuit_name"] = _text(data.get("circuit_name") or data.get("name")) or "Design"
+        changes.append("Filled in circuit_name")
+
+    def letter(comp):
+        ctype = _text(comp.get("type")).strip()
+        return VISUAL_TYPES.get(ctype.lower(), ctype.upper())
+
+    components = []
+    used = set()
+    raw = data.get("components") or []
+    reserved = _explicit_ids(raw, lambda comp: (letter(comp), _text(comp["id"]).strip()))
+    for position, comp in enumerate(raw):
+        if not isinstance(comp, dict):
+            changes.append(f"Dropped component {position}: not an object")
+            continue
+        ctype = letter(comp)
+        if not ctype or ctype == "GND":
+            changes.append(f"Dropped component {position}: {'ground symbol' if ctype else 'no type'}")
+            continue
+        nodes = comp.get("nodes")
+        if isinstance(nodes, str):
+            nodes = nodes.replace(",", " ").split()
+        if not isinstance(nodes, list) or len(nodes) < 2:
+            changes.append(f"Dropped component {position}: fewer than two nodes")
+            continue
+        value = comp.get("value")
+        if value is None or _text(value).strip() == "":
+            changes.append(f"Dropped component {position}: no value")
+            continue
+        cid = _text(comp.get("id")).strip()
+        if not cid or (ctype, cid) in used:
+            k = 1
+            while (ctype, str(k)) in used or (ctype, str(k)) in reserved:
+                k += 1
+            changes.append(f"Assigned id {ctype}{k} to component {position}")
+            cid = str(k)
+        used.add((ctype, cid))
+        comp.update(type=ctype, id=cid, nodes=[_text(node) for node in nodes], value=_text(value))
+        components.append(comp)
+    data["components"] = components
+
+    simulation = _text(data.get("simulation")).strip()
+    if not simulation:
+        simulation = ".op"
+        changes.append("Defaulted simulation to .op")
+    elif not simulation.startswith("."):
+        simulation = "." + simulation
+        changes.append("Added the leading '.' to the simulation directive")
+    data["simulation"] = simulation
+
+
+def _coerce_visualizer(data, changes):
+    if not isinstance(data.get("name"), str) or not data["name"].strip():
+        data["name"] = _text(data.get("name") or data.get("circuit_name")) or "Circuit"
+        changes.append("Filled in name")
+
+    components = []
+    used = set()
+    raw = data.get("components") or []
+    reserved = _explicit_ids(raw, lambda comp: _text(comp["id"]).strip())
+    for position, comp in enumerate(raw):
+        if not isinstance(comp, dict):
+            changes.append(f"Dropped component {position}: not an object")
+            continue
+        ctype = _text(comp.get("type")).strip()
+        ctype = VISUAL_NAMES.get(ctype.upper(), ctype.lower())
+        if not ctype:
+            changes.append(f"Dropped component {position}: no type")
+            continue
+        cid = _text(comp.get("id")).strip()
+        if not cid or cid in used:
+            prefix = VISUAL_TYPES.get(ctype, ctype[:1].upper())
+            k = 1
+            while f"{prefix}{k}" in used or f"{prefix}{k}" in reserved:
+                k += 1
+            cid = f"{prefix}{k}"
+            changes.append(f"Assigned id {cid} to component {position}")
+        used.add(cid)
+        comp.update(id=cid, type=ctype, value=_text(comp.get("value")))
+        components.append(comp)
+    data["components"] = components
+
+    connections = []
+    for position, conn in enumerate(data.get("connections") or []):
+        if isinstance(conn, (list, tuple)) and len(conn) == 2:
+            conn = {"from": conn[0], "to": conn[1]}
+        if not isinstance(conn, dict) or not conn.get("from") or not conn.get("to"):
+            changes.append(f"Dropped connection {position}: needs 'from' and 'to'")
+            continue
+        conn.update({"from": _text(conn["from"]), "to": _text(conn["to"])})
+        connections.append(conn)
+    data["connections"] = connections
+
+
+def coerce_circuit(data, schema="generator", changes=None):
+    """
+    Fit decoded data to the generator or visualizer schema in place.
+    Returns (data, changes); raises ValueError if no usable component is left.
+    """
+    changes = [] if changes is None else changes
+    if isinstance(data, list):
+        data = {"components": data}
+        changes.append("Wrapped a bare component list")
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    if schema == "visualizer":
+        _coerce_visualizer(data, changes)
+    else:
+        _coerce_generator(data, changes)
+    if not data["components"]:
+        raise ValueError("No usable components")
+    return data, changes
+
+
+def parse_circuit(text, schema="generator"):
+    """Model output -> (circuit, changes); raises ValueError if unrecoverable"""
+    data, changes = loads_tolerant(text)
+    return coerce_circuit(data, schema, changes)
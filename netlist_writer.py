@@ -0,0 +1,140 @@
+"""
+Native SPICE netlist writer for the generator's circuit JSON.
+
+Lines are produced one component at a time and written in fixed-size
+batches, so emitting a netlist is linear in its size and never holds
+the whole text in memory:
+
+    with open("design.cir", "w") as f:
+        write_netlist(circuit_data, f)
+
+    netlist_text(circuit_data)  # small circuits, as a string
+
+atomic_open() gives the same file object but only replaces the target
+once the netlist is complete, so concurrent writers never interleave.
+"""
+import contextlib
+import io
+import logging
+import os
+import tempfile
+
+from circuit_ir import GROUND, net_name
+
+log = logging.getLogger(__name__)
+
+SUPPORTED_TYPES = ("R", "C", "L", "V", "I")
+
+# Lines buffered before each write() call
+WRITE_BATCH = 4096
+
+
+def circuit_title(data):
+    return str(data.get("circuit_name", "Design")).replace(" ", "_")
+
+
+def _node(name):
+    # Ground aliases follow CircuitIR (so validation, simulation and the
+    # netlist agree); SPICE separates fields with whitespace, so node names
+    # can't contain any
+    return "_".join(net_name(name).split()) or GROUND
+
+
+def element_line(comp):
+    """One SPICE element line, named like PySpice does (type letter + id)"""
+    ctype = str(comp["type"]).upper()
+    if ctype not in SUPPORTED_TYPES:
+        return None
+    n = comp["nodes"]
+    value = " ".join(str(comp["value"]).split())
+    return f"{ctype}{comp['id']} {_node(n[0])} {_node(n[1])} {value}"
+
+
+def netlist_lines(data, warn=log.warning):
+    """Yield the netlist for `data` line by line (without newlines)"""
+    yield f".title {circuit_title(data)}"
+    for comp in data.get("components", []):
+        try:
+            line = element_line(comp)
+        except (KeyError, IndexError, TypeError) as e:
+            if warn:
+                warn(f"Could not add component {comp.get('type', '?')}{comp.get('id', '')}: {e}")
+            continue
+        if line is not None:
+            yield line
+    # Simulation directives go after the elements, then .end
+    yield data.get("simulation", ".op")
+    yield ".end"
+
+
+def write_netlist(data, out, warn=log.warning, echo=None):
+    """
+    Stream the netlist for `data` into the text file object `out`.
+
+    `echo`, if given, is called with every line as it is written.
+    Returns the number of lines written.
+    """
+    batch = []
+    count = 0
+    for line in netlist_lines(data, warn=warn):
+        if echo:
+            echo(line)
+        batch.append(line + "\n")
+        if len(batch) >= WRITE_BATCH:
+            out.writelines(batch)
+            count += len(batch)
+            batch = []
+    out.writelines(batch)
+    return count + len(batch)
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode="w"):
+    """
+    Write to a temp file next to `path` and rename it over `path` on success.
+    Readers see either the old file or the complete new one; on error the
+    temp file is removed and `path` is untouched.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def netlist_text(data, warn=log.warning):
+    buffer = io.StringIO()
+    write_netlist(data, buffer, warn=warn)
+    return buffer.getvalue()
+
+
+def pyspice_netlist_text(data, warn=log.warning):
+    """Build the netlist through PySpice's Circuit (optional dependency)"""
+    from PySpice.Spice.Netlist import Circuit
+
+    circuit = Circuit(circuit_title(data))
+    for comp in data.get("components", []):
+        ctype = comp["type"].upper()
+        cid = str(comp["id"])
+        n = [net_name(node) for node in comp["nodes"]]
+        val = comp["value"]
+
+        try:
+            if ctype == 'R': circuit.R(cid, n[0], n[1], val)
+            elif ctype == 'C': circuit.C(cid, n[0], n[1], val)
+            elif ctype == 'L': circuit.L(cid, n[0], n[1], val)
+            elif ctype == 'V': circuit.V(cid, n[0], n[1], val)
+            elif ctype == 'I': circuit.I(cid, n[0], n[1], val)
+        except Exception as e:
+            if warn:
+                warn(f"Could not add component {ctype}{cid}: {e}")
+
+    # Append simulation directives
+    sim_cmd = data.get("simulation", ".op")
+    circuit.raw_spice += f"\n{sim_cmd}\n.end"
+    return str(circuit)
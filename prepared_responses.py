@@ -0,0 +1,96 @@
+"""
+Pre-serialized HTTP responses.
+
+A PreparedResponse holds a body (JSON unless told otherwise) as bytes,
+its strong ETag and (for large bodies) gzip/brotli encodings computed
+once. Serving it is then just header negotiation: If-None-Match gets a
+304, otherwise the best encoding the client accepts is sent as-is.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this aren't worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+
+def dump_json(payload):
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+class PreparedResponse:
+    __slots__ = ("body", "etag", "encoded", "version", "mimetype")
+
+    def __init__(self, body, version=None, mimetype="application/json"):
+        self.body = body
+        self.version = version
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.encoded = {}
+        if len(body) >= COMPRESS_MIN_BYTES:
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body, quality=9)
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=9)
+
+    def _etag_for(self, encoding):
+        # Each content-coding is a different representation, so gets its own strong tag
+        return self.etag if encoding is None else f"{self.etag}-{encoding}"
+
+    def to_response(self, status=200):
+        matched = [e for e in (None, *self.encoded) if request.if_none_match.contains(self._etag_for(e))]
+        if matched:
+            # Answer with the tag of the representation the client holds
+            response = Response(status=304)
+            response.set_etag(self._etag_for(matched[0]))
+        else:
+            encoding = next((e for e in self.encoded if request.accept_encodings[e] > 0), None)
+            response = Response(self.encoded.get(encoding, self.body), status=status, mimetype=self.mimetype)
+            response.set_etag(self._etag_for(encoding))
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        # Always revalidate; unchanged circuits cost a 304 with no body
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
+class PreparedCache:
+    """LRU of PreparedResponses; an entry is rebuilt when its version changes"""
+
+    def __init__(self, max_items=1024):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        """
+        Cached response for `key` at `version`; build() returns the body
+        bytes, (body, mimetype) for non-JSON bodies, or None
+        """
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry.version == version:
+                self._items.move_to_end(key)
+                return entry
+        body = build()
+        if body is None:
+            return None
+        if isinstance(body, tuple):
+            entry = PreparedResponse(body[0], version, mimetype=body[1])
+        else:
+            entry = PreparedResponse(body, version)
+        with self._lock:
+            self._items[key] = entry
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return entry
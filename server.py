@@ -1,7 +1,20 @@
-from flask import Flask, jsonify, send_from_directory, render_template_string
+from flask import Flask, Response, g, jsonify, request, send_from_directory, render_template_string, stream_with_context
 from flask_cors import CORS
+import hashlib
 import json
 import os
+import time
+
+import circuit_wire
+import gemini_to_net_v1 as generator
+from circuit_layout import CANVAS_WIDTH, compute_layout, layout_cache
+from circuit_store import DEFAULT_PATH, CircuitStore, circuit_display_name
+from circuit_validator import validate_circuit
+from incremental_json import IncrementalArrayParser
+from instrumentation import cache_gauges, configure_logging, count, gauge, observe, registry, span
+from json_repair import parse_circuit
+from prepared_responses import PreparedCache, dump_json
+from simulation_jobs import BACKENDS, JobManager, JobQueueFull
 
 app = Flask(__name__)
 CORS(app)
@@ -108,6 +121,21 @@ SAMPLE_CIRCUITS = {
     }
 }
 
+# Circuit library; the samples above are seeded on first start
+store = CircuitStore(DEFAULT_PATH)
+store.seed(SAMPLE_CIRCUITS)
+
+# Serialized (and compressed) response bodies, invalidated by store writes
+prepared = PreparedCache()
+
+# Simulations run in worker processes; SIM_WORKERS defaults to one per core
+jobs = JobManager(
+    max_workers=int(os.environ.get("SIM_WORKERS", 0)) or None,
+    max_pending=int(os.environ.get("SIM_MAX_PENDING", 64)),
+)
+gauge("simulation_jobs_pending", jobs.pending)
+cache_gauges("layouts", layout_cache)
+
 # Embedded HTML (so you don't need a separate file)
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -163,6 +191,14 @@ HTML_TEMPLATE = """
             cursor: pointer;
             transition: all 0.3s;
         }
+        input[type=text] {
+            flex: 1;
+            min-width: 240px;
+            padding: 12px 16px;
+            font-size: 16px;
+            border: 2px solid #667eea;
+            border-radius: 8px;
+        }
         select {
             background: white;
             border: 2px solid #667eea;
@@ -185,6 +221,7 @@ HTML_TEMPLATE = """
             background: #ffffff;
         }
         canvas {
+            cursor: grab;
             border: 2px solid #e9ecef;
             border-radius: 10px;
             background: white;
@@ -230,10 +267,14 @@ HTML_TEMPLATE = """
         </div>
         
         <div class="controls">
+            <input id="promptInput" type="text" placeholder="Describe a circuit..." onkeydown="if (event.key === 'Enter') generateCircuit()">
+            <button id="generateButton" onclick="generateCircuit()">Generate</button>
             <select id="circuitSelect">
                 <option value="">Select a circuit...</option>
             </select>
+            <button id="moreButton" onclick="loadCircuitList(nextCursor)" style="display: none">More circuits</button>
             <button onclick="loadCircuit()">Load Circuit</button>
+            <button onclick="fitView()">Fit</button>
             <button onclick="clearCanvas()">Clear</button>
         </div>
         
@@ -279,11 +320,108 @@ HTML_TEMPLATE = """
         
         let currentCircuit = null;
         let componentPositions = {};
+        let scene = null;
+
+        // View transform: screen = world * scale + (x, y)
+        const view = { scale: 1, x: 0, y: 0 };
+        const MIN_SCALE = 0.01;
+        const MAX_SCALE = 4;
+
+        // Level of detail: below LOD_LABELS labels are dropped, below
+        // LOD_SYMBOLS components become plain colored boxes
+        const LOD_LABELS = 0.6;
+        const LOD_SYMBOLS = 0.3;
+
+        const GRID_CELL = 400;      // spatial index cell size (world units)
+        const COMPONENT_EXTENT = 50; // half size of a component incl. labels
+        const CACHE_MARGIN = 0.5;   // offscreen cache overhang per side (fraction of viewport)
+
+        // Terminal offsets from the component centre (must match the draw* functions)
+        const TERMINALS = {
+            resistor: { '1': [-30, 0], '2': [30, 0] },
+            voltage_source: { 'positive': [0, -25], 'negative': [0, 25] },
+            led: { 'anode': [0, -20], 'cathode': [0, 15] },
+            transistor: { 'base': [-30, 0], 'collector': [30, -30], 'emitter': [30, 30] },
+            ground: { 'terminal': [0, -20] }
+        };
+        const TYPE_COLORS = {
+            resistor: '#2c3e50',
+            voltage_source: '#e74c3c',
+            led: '#e67e22',
+            transistor: '#3498db',
+            ground: '#2c3e50'
+        };
+
+        // Uniform grid over world space; items are stored in every cell their box touches
+        class SpatialGrid {
+            constructor(cellSize) {
+                this.cellSize = cellSize;
+                this.cells = new Map();
+                this.large = [];  // items spanning too many cells, always tested
+                this.stamp = 0;
+            }
+
+            insert(item) {
+                const c = this.cellSize;
+                const x0 = Math.floor(item.minX / c), x1 = Math.floor(item.maxX / c);
+                const y0 = Math.floor(item.minY / c), y1 = Math.floor(item.maxY / c);
+                if ((x1 - x0 + 1) * (y1 - y0 + 1) > 64) {
+                    this.large.push(item);
+                    return;
+                }
+                for (let cx = x0; cx <= x1; cx++) {
+                    for (let cy = y0; cy <= y1; cy++) {
+                        const key = cx + ',' + cy;
+                        let bucket = this.cells.get(key);
+                        if (!bucket) {
+                            bucket = [];
+                            this.cells.set(key, bucket);
+                        }
+                        bucket.push(item);
+                    }
+                }
+            }
+
+            // Calls visit(item) once for every item whose box intersects the rectangle
+            query(minX, minY, maxX, maxY, visit) {
+                const stamp = ++this.stamp;
+                const test = item => {
+                    if (item.seen === stamp) return;
+                    item.seen = stamp;
+                    if (item.maxX >= minX && item.minX <= maxX && item.maxY >= minY && item.minY <= maxY) {
+                        visit(item);
+                    }
+                };
+                const c = this.cellSize;
+                const x0 = Math.floor(minX / c), x1 = Math.floor(maxX / c);
+                const y0 = Math.floor(minY / c), y1 = Math.floor(maxY / c);
+                if ((x1 - x0 + 1) * (y1 - y0 + 1) > this.cells.size) {
+                    // Zoomed far out: walking the occupied cells is cheaper
+                    this.cells.forEach(bucket => bucket.forEach(test));
+                } else {
+                    for (let cx = x0; cx <= x1; cx++) {
+                        for (let cy = y0; cy <= y1; cy++) {
+                            const bucket = this.cells.get(cx + ',' + cy);
+                            if (bucket) bucket.forEach(test);
+                        }
+                    }
+                }
+                this.large.forEach(test);
+            }
+        }
+
+        // Rendered static layer; panning within the margin only blits it
+        const cache = { canvas: document.createElement('canvas'), scale: 0, x: 0, y: 0, valid: false };
+        let frameRequested = false;
+        let zooming = false;
+        let zoomTimer = null;
 
-        // Load available circuits on page load
-        async function loadCircuitList() {
+        // Load available circuits a page at a time
+        let nextCursor = null;
+        async function loadCircuitList(cursor) {
             try {
-                const response = await fetch(`${API_URL}/circuits`);
+                const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+                const response = await fetch(`${API_URL}/circuits${query}`);
                 const data = await response.json();
                 const select = document.getElementById('circuitSelect');
                 
@@ -293,299 +431,626 @@ HTML_TEMPLATE = """
                     option.textContent = circuitId.replace(/_/g, ' ').toUpperCase();
                     select.appendChild(option);
                 });
+                nextCursor = data.next_cursor;
+                document.getElementById('moreButton').style.display = nextCursor ? '' : 'none';
             } catch (error) {
                 console.error('Error loading circuits:', error);
                 alert('Could not connect to backend.');
             }
         }
 
-        // Load selected circuit
+        // Columnar circuit encoding (circuit_wire.py): a string table plus
+        // integer columns, viewed in place as typed arrays
+        const COLUMNAR_MIME = 'application/x-circuit-columnar';
+        const LITTLE_ENDIAN = new Uint8Array(new Uint16Array([1]).buffer)[0] === 1;
+
+        function decodeColumnar(buffer) {
+            const view = new DataView(buffer);
+            const magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+            if (magic !== 'SCC1') throw new Error('Not a columnar circuit');
+            const stringCount = view.getUint32(4, true);
+            const blobSize = view.getUint32(8, true);
+            const n = view.getUint32(12, true);
+            const m = view.getUint32(16, true);
+            const metaIndex = view.getUint32(20, true);
+            const widths = new Uint8Array(buffer, 24, 11);
+            let offset = 36;
+            let w = 0;
+
+            function column(count) {
+                const width = widths[w++];
+                const Type = width === 1 ? Uint8Array : width === 2 ? Uint16Array : Uint32Array;
+                let values;
+                if (LITTLE_ENDIAN || width === 1) {
+                    values = new Type(buffer, offset, count);
+                } else {
+                    values = new Type(count);
+                    for (let i = 0; i < count; i++) {
+                        values[i] = width === 2 ? view.getUint16(offset + 2 * i, true) : view.getUint32(offset + 4 * i, true);
+                    }
+                }
+                offset += (count * width + 3) & ~3;
+                return values;
+            }
+
+            // Lengths are UTF-16 units, so the blob is decoded once and sliced
+            const lengths = column(stringCount);
+            const text = new TextDecoder().decode(new Uint8Array(buffer, offset, blobSize));
+            offset += (blobSize + 3) & ~3;
+            const strings = new Array(stringCount);
+            for (let i = 0, start = 0; i < stringCount; i++) {
+                strings[i] = text.slice(start, start + lengths[i]);
+                start += lengths[i];
+            }
+
+            const circuit = {
+                columnar: true, strings, n, m,
+                types: column(n), values: column(n), idPrefix: column(n), idNumber: column(n), componentExtra: column(n),
+                fromComponent: column(m), fromTerminal: column(m), toComponent: column(m), toTerminal: column(m),
+                connectionExtra: column(m)
+            };
+            const meta = metaIndex ? JSON.parse(strings[metaIndex]) : {};
+            circuit.name = meta.name;
+            circuit.ids = new Array(n);
+            for (let i = 0; i < n; i++) {
+                const number = circuit.idNumber[i];
+                circuit.ids[i] = circuit.idPrefix[i] ? strings[circuit.idPrefix[i]] + (number ? String(number - 1) : '') : undefined;
+            }
+            const extras = new Map();
+            circuit.extra = i => {
+                const index = circuit.componentExtra[i];
+                if (!index) return {};
+                if (!extras.has(index)) extras.set(index, JSON.parse(strings[index]));
+                return extras.get(index);
+            };
+            // Plain component object, as in the JSON form (index 0: field absent)
+            circuit.component = i => {
+                const comp = {};
+                if (circuit.idPrefix[i]) comp.id = circuit.ids[i];
+                if (circuit.types[i]) comp.type = strings[circuit.types[i]];
+                if (circuit.values[i]) comp.value = strings[circuit.values[i]];
+                return Object.assign(comp, circuit.extra(i));
+            };
+            return circuit;
+        }
+
+        // Load selected circuit together with its server-computed layout
         async function loadCircuit() {
             const circuitId = document.getElementById('circuitSelect').value;
             if (!circuitId) return;
             
             try {
-                const response = await fetch(`${API_URL}/circuit/${circuitId}`);
-                currentCircuit = await response.json();
-                visualizeCircuit(currentCircuit);
+                const [circuitResponse, layoutResponse] = await Promise.all([
+                    fetch(`${API_URL}/circuit/${circuitId}`, { headers: { 'Accept': `${COLUMNAR_MIME}, application/json;q=0.9` } }),
+                    fetch(`${API_URL}/circuit/${circuitId}/layout?width=${canvas.width}`)
+                ]);
+                const contentType = circuitResponse.headers.get('Content-Type') || '';
+                currentCircuit = contentType.startsWith(COLUMNAR_MIME)
+                    ? decodeColumnar(await circuitResponse.arrayBuffer())
+                    : await circuitResponse.json();
+                const layout = await layoutResponse.json();
+                visualizeCircuit(currentCircuit, layout);
             } catch (error) {
                 console.error('Error loading circuit:', error);
             }
         }
 
-        // Auto-layout algorithm
-        function calculateLayout(circuit) {
-            const positions = {};
-            const components = circuit.components;
-            const connections = circuit.connections;
-            
-            const layers = [];
-            const visited = new Set();
-            
-            const sources = components.filter(c => c.type === 'voltage_source');
-            
-            if (sources.length > 0) {
-                layers.push(sources.map(s => s.id));
-                sources.forEach(s => visited.add(s.id));
+        // Generate a circuit from a prompt; components are drawn as they stream in
+        const RELAYOUT_MS = 200;
+        let relayoutTimer = null;
+        let relayoutPending = false;
+
+        function scheduleRelayout(circuit) {
+            relayoutPending = true;
+            if (relayoutTimer) return;
+            relayoutTimer = setTimeout(async () => {
+                relayoutTimer = null;
+                relayoutPending = false;
+                const snapshot = { name: circuit.name, components: circuit.components.slice(), connections: circuit.connections.slice() };
+                const response = await fetch(`${API_URL}/layout?width=${canvas.width}`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(snapshot)
+                });
+                if (currentCircuit === circuit) visualizeCircuit(snapshot, await response.json());
+                if (relayoutPending) scheduleRelayout(circuit);
+            }, RELAYOUT_MS);
+        }
+
+        function handleEvent(circuit, frame) {
+            let event = 'message';
+            let data = '';
+            frame.split('\\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            const payload = data ? JSON.parse(data) : null;
+            if (event === 'component') {
+                circuit.components.push(payload);
+                scheduleRelayout(circuit);
+            } else if (event === 'connection') {
+                circuit.connections.push(payload);
+                scheduleRelayout(circuit);
+            } else if (event === 'done') {
+                Object.assign(circuit, payload.circuit);
+                payload.repairs.forEach(repair => console.info('Repaired:', repair));
+                payload.issues.forEach(issue => console.warn(`${issue.severity}: ${issue.message}`));
+                const select = document.getElementById('circuitSelect');
+                const option = document.createElement('option');
+                option.value = payload.id;
+                option.textContent = payload.id.replace(/_/g, ' ').toUpperCase();
+                select.appendChild(option);
+                select.value = payload.id;
+                scheduleRelayout(circuit);
+            } else if (event === 'error') {
+                alert(payload.error);
             }
-            
-            let currentLayer = layers[0] || [];
-            while (visited.size < components.length) {
-                const nextLayer = [];
-                
-                currentLayer.forEach(compId => {
-                    connections.forEach(conn => {
-                        const from = conn.from.split('.')[0];
-                        const to = conn.to.split('.')[0];
-                        
-                        if (from === compId && !visited.has(to)) {
-                            nextLayer.push(to);
-                            visited.add(to);
-                        }
-                    });
+        }
+
+        async function generateCircuit() {
+            const prompt = document.getElementById('promptInput').value.trim();
+            if (!prompt) return;
+            const button = document.getElementById('generateButton');
+            const circuit = { name: prompt, components: [], connections: [] };
+            currentCircuit = circuit;
+            clearCanvas();
+            button.disabled = true;
+            try {
+                const response = await fetch(`${API_URL}/parse`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ prompt })
                 });
-                
-                if (nextLayer.length === 0) {
-                    components.forEach(c => {
-                        if (!visited.has(c.id)) {
-                            nextLayer.push(c.id);
-                            visited.add(c.id);
-                        }
-                    });
+                if (!response.ok) {
+                    alert((await response.json()).error);
+                    return;
                 }
-                
-                if (nextLayer.length > 0) {
-                    layers.push(nextLayer);
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let end;
+                    while ((end = buffer.indexOf('\\n\\n')) >= 0) {
+                        handleEvent(circuit, buffer.slice(0, end));
+                        buffer = buffer.slice(end + 2);
+                    }
                 }
+            } catch (error) {
+                console.error('Error generating circuit:', error);
+            } finally {
+                button.disabled = false;
             }
-            
-            const layerSpacing = 200;
-            const componentSpacing = 150;
-            const startX = 100;
-            const startY = 150;
-            
-            layers.forEach((layer, layerIndex) => {
-                const y = startY + layerIndex * layerSpacing;
-                layer.forEach((compId, index) => {
-                    const x = startX + index * componentSpacing + (canvas.width - (layer.length * componentSpacing)) / 2;
-                    positions[compId] = { x, y };
-                });
-            });
-            
-            return positions;
         }
 
-        function drawResistor(x, y, label, value) {
-            ctx.strokeStyle = '#2c3e50';
-            ctx.lineWidth = 2;
-            ctx.strokeRect(x - 30, y - 15, 60, 30);
-            ctx.fillStyle = '#2c3e50';
-            ctx.font = 'bold 16px Arial';
-            ctx.textAlign = 'center';
-            ctx.fillText('R', x, y + 5);
-            ctx.font = '12px Arial';
-            ctx.fillText(label, x, y - 25);
-            ctx.fillText(value, x, y + 35);
-            return {
-                '1': { x: x - 30, y: y },
-                '2': { x: x + 30, y: y }
-            };
+        function drawResistor(g, x, y, label, value, labels) {
+            g.strokeStyle = '#2c3e50';
+            g.lineWidth = 2;
+            g.strokeRect(x - 30, y - 15, 60, 30);
+            if (!labels) return;
+            g.fillStyle = '#2c3e50';
+            g.font = 'bold 16px Arial';
+            g.textAlign = 'center';
+            g.fillText('R', x, y + 5);
+            g.font = '12px Arial';
+            g.fillText(label, x, y - 25);
+            g.fillText(value, x, y + 35);
         }
 
-        function drawVoltageSource(x, y, label, value) {
-            ctx.strokeStyle = '#e74c3c';
-            ctx.lineWidth = 2;
-            ctx.beginPath();
-            ctx.arc(x, y, 25, 0, Math.PI * 2);
-            ctx.stroke();
-            ctx.fillStyle = '#e74c3c';
-            ctx.font = 'bold 18px Arial';
-            ctx.textAlign = 'center';
-            ctx.fillText('+', x - 8, y + 6);
-            ctx.fillText('-', x + 8, y + 6);
-            ctx.font = '12px Arial';
-            ctx.fillStyle = '#2c3e50';
-            ctx.fillText(label, x, y - 35);
-            ctx.fillText(value, x, y + 45);
-            return {
-                'positive': { x: x, y: y - 25 },
-                'negative': { x: x, y: y + 25 }
-            };
+        function drawVoltageSource(g, x, y, label, value, labels) {
+            g.strokeStyle = '#e74c3c';
+            g.lineWidth = 2;
+            g.beginPath();
+            g.arc(x, y, 25, 0, Math.PI * 2);
+            g.stroke();
+            g.fillStyle = '#e74c3c';
+            g.font = 'bold 18px Arial';
+            g.textAlign = 'center';
+            g.fillText('+', x - 8, y + 6);
+            g.fillText('-', x + 8, y + 6);
+            if (!labels) return;
+            g.font = '12px Arial';
+            g.fillStyle = '#2c3e50';
+            g.fillText(label, x, y - 35);
+            g.fillText(value, x, y + 45);
         }
 
-        function drawLED(x, y, label, value) {
-            ctx.strokeStyle = '#e67e22';
-            ctx.fillStyle = '#e67e22';
-            ctx.lineWidth = 2;
-            ctx.beginPath();
-            ctx.moveTo(x, y - 20);
-            ctx.lineTo(x - 20, y + 15);
-            ctx.lineTo(x + 20, y + 15);
-            ctx.closePath();
-            ctx.stroke();
-            ctx.beginPath();
-            ctx.moveTo(x - 20, y + 15);
-            ctx.lineTo(x + 20, y + 15);
-            ctx.stroke();
-            ctx.fillStyle = '#2c3e50';
-            ctx.font = '12px Arial';
-            ctx.textAlign = 'center';
-            ctx.fillText(label, x, y - 30);
-            ctx.fillText(value, x, y + 35);
-            return {
-                'anode': { x: x, y: y - 20 },
-                'cathode': { x: x, y: y + 15 }
-            };
+        function drawLED(g, x, y, label, value, labels) {
+            g.strokeStyle = '#e67e22';
+            g.fillStyle = '#e67e22';
+            g.lineWidth = 2;
+            g.beginPath();
+            g.moveTo(x, y - 20);
+            g.lineTo(x - 20, y + 15);
+            g.lineTo(x + 20, y + 15);
+            g.closePath();
+            g.stroke();
+            g.beginPath();
+            g.moveTo(x - 20, y + 15);
+            g.lineTo(x + 20, y + 15);
+            g.stroke();
+            if (!labels) return;
+            g.fillStyle = '#2c3e50';
+            g.font = '12px Arial';
+            g.textAlign = 'center';
+            g.fillText(label, x, y - 30);
+            g.fillText(value, x, y + 35);
         }
 
-        function drawTransistor(x, y, label, type) {
-            ctx.strokeStyle = '#3498db';
-            ctx.lineWidth = 2;
-            ctx.beginPath();
-            ctx.moveTo(x, y - 30);
-            ctx.lineTo(x, y + 30);
-            ctx.stroke();
-            ctx.beginPath();
-            ctx.moveTo(x - 30, y);
-            ctx.lineTo(x, y);
-            ctx.stroke();
-            ctx.beginPath();
-            ctx.moveTo(x, y - 15);
-            ctx.lineTo(x + 30, y - 30);
-            ctx.stroke();
-            ctx.beginPath();
-            ctx.moveTo(x, y + 15);
-            ctx.lineTo(x + 30, y + 30);
-            ctx.stroke();
-            ctx.fillStyle = '#3498db';
-            ctx.beginPath();
+        function drawTransistor(g, x, y, label, type, labels) {
+            g.strokeStyle = '#3498db';
+            g.lineWidth = 2;
+            g.beginPath();
+            g.moveTo(x, y - 30);
+            g.lineTo(x, y + 30);
+            g.stroke();
+            g.beginPath();
+            g.moveTo(x - 30, y);
+            g.lineTo(x, y);
+            g.stroke();
+            g.beginPath();
+            g.moveTo(x, y - 15);
+            g.lineTo(x + 30, y - 30);
+            g.stroke();
+            g.beginPath();
+            g.moveTo(x, y + 15);
+            g.lineTo(x + 30, y + 30);
+            g.stroke();
+            g.fillStyle = '#3498db';
+            g.beginPath();
             if (type === 'npn') {
-                ctx.moveTo(x + 30, y + 30);
-                ctx.lineTo(x + 20, y + 25);
-                ctx.lineTo(x + 25, y + 20);
+                g.moveTo(x + 30, y + 30);
+                g.lineTo(x + 20, y + 25);
+                g.lineTo(x + 25, y + 20);
             } else {
-                ctx.moveTo(x + 5, y + 10);
-                ctx.lineTo(x, y + 20);
-                ctx.lineTo(x + 10, y + 15);
+                g.moveTo(x + 5, y + 10);
+                g.lineTo(x, y + 20);
+                g.lineTo(x + 10, y + 15);
             }
-            ctx.closePath();
-            ctx.fill();
-            ctx.fillStyle = '#2c3e50';
-            ctx.font = '12px Arial';
-            ctx.textAlign = 'center';
-            ctx.fillText(label, x, y - 40);
-            ctx.fillText(type.toUpperCase(), x, y + 50);
-            return {
-                'base': { x: x - 30, y: y },
-                'collector': { x: x + 30, y: y - 30 },
-                'emitter': { x: x + 30, y: y + 30 }
-            };
+            g.closePath();
+            g.fill();
+            if (!labels) return;
+            g.fillStyle = '#2c3e50';
+            g.font = '12px Arial';
+            g.textAlign = 'center';
+            g.fillText(label, x, y - 40);
+            g.fillText((type || '').toUpperCase(), x, y + 50);
         }
 
-        function drawGround(x, y, label) {
-            ctx.strokeStyle = '#2c3e50';
-            ctx.lineWidth = 2;
-            ctx.beginPath();
-            ctx.moveTo(x, y - 20);
-            ctx.lineTo(x, y);
-            ctx.stroke();
-            ctx.beginPath();
-            ctx.moveTo(x - 20, y);
-            ctx.lineTo(x + 20, y);
-            ctx.stroke();
-            ctx.beginPath();
-            ctx.moveTo(x - 15, y + 5);
-            ctx.lineTo(x + 15, y + 5);
-            ctx.stroke();
-            ctx.beginPath();
-            ctx.moveTo(x - 10, y + 10);
-            ctx.lineTo(x + 10, y + 10);
-            ctx.stroke();
-            ctx.fillStyle = '#2c3e50';
-            ctx.font = '12px Arial';
-            ctx.textAlign = 'center';
-            ctx.fillText(label, x, y + 30);
-            return {
-                'terminal': { x: x, y: y - 20 }
-            };
+        function drawGround(g, x, y, label, labels) {
+            g.strokeStyle = '#2c3e50';
+            g.lineWidth = 2;
+            g.beginPath();
+            g.moveTo(x, y - 20);
+            g.lineTo(x, y);
+            g.stroke();
+            g.beginPath();
+            g.moveTo(x - 20, y);
+            g.lineTo(x + 20, y);
+            g.stroke();
+            g.beginPath();
+            g.moveTo(x - 15, y + 5);
+            g.lineTo(x + 15, y + 5);
+            g.stroke();
+            g.beginPath();
+            g.moveTo(x - 10, y + 10);
+            g.lineTo(x + 10, y + 10);
+            g.stroke();
+            if (!labels) return;
+            g.fillStyle = '#2c3e50';
+            g.font = '12px Arial';
+            g.textAlign = 'center';
+            g.fillText(label, x, y + 30);
         }
 
-        function drawWire(x1, y1, x2, y2) {
-            ctx.strokeStyle = '#34495e';
-            ctx.lineWidth = 2;
-            ctx.beginPath();
-            ctx.moveTo(x1, y1);
-            const midY = (y1 + y2) / 2;
-            ctx.lineTo(x1, midY);
-            ctx.lineTo(x2, midY);
-            ctx.lineTo(x2, y2);
-            ctx.stroke();
-            ctx.fillStyle = '#34495e';
-            ctx.beginPath();
-            ctx.arc(x1, y1, 3, 0, Math.PI * 2);
-            ctx.fill();
-            ctx.beginPath();
-            ctx.arc(x2, y2, 3, 0, Math.PI * 2);
-            ctx.fill();
-        }
-
-        function visualizeCircuit(circuit) {
-            clearCanvas();
-            componentPositions = calculateLayout(circuit);
+        function drawComponent(g, item, labels) {
+            const comp = item.comp;
+            switch (comp.type) {
+                case 'resistor':
+                    drawResistor(g, item.x, item.y, comp.id, comp.value, labels);
+                    break;
+                case 'voltage_source':
+                    drawVoltageSource(g, item.x, item.y, comp.id, comp.value, labels);
+                    break;
+                case 'led':
+                    drawLED(g, item.x, item.y, comp.id, comp.value, labels);
+                    break;
+                case 'transistor':
+                    drawTransistor(g, item.x, item.y, comp.id, comp.transistor_type, labels);
+                    break;
+                case 'ground':
+                    drawGround(g, item.x, item.y, comp.id, labels);
+                    break;
+            }
+        }
+
+        // Orthogonal wire route; all wires go into one path and one stroke
+        function traceWire(g, w) {
+            const midY = (w.y1 + w.y2) / 2;
+            g.moveTo(w.x1, w.y1);
+            g.lineTo(w.x1, midY);
+            g.lineTo(w.x2, midY);
+            g.lineTo(w.x2, w.y2);
+        }
+
+        function drawWireDots(g, wires) {
+            g.fillStyle = '#34495e';
+            g.beginPath();
+            wires.forEach(w => {
+                g.moveTo(w.x1 + 3, w.y1);
+                g.arc(w.x1, w.y1, 3, 0, Math.PI * 2);
+                g.moveTo(w.x2 + 3, w.y2);
+                g.arc(w.x2, w.y2, 3, 0, Math.PI * 2);
+            });
+            g.fill();
+        }
+
+        // Index components and wires once per circuit
+        function buildScene(circuit, layout) {
+            const grid = new SpatialGrid(GRID_CELL);
             const terminals = {};
-            
-            circuit.components.forEach(comp => {
-                const pos = componentPositions[comp.id];
-                if (!pos) return;
-                let terminalPos;
-                switch (comp.type) {
-                    case 'resistor':
-                        terminalPos = drawResistor(pos.x, pos.y, comp.id, comp.value);
-                        break;
-                    case 'voltage_source':
-                        terminalPos = drawVoltageSource(pos.x, pos.y, comp.id, comp.value);
-                        break;
-                    case 'led':
-                        terminalPos = drawLED(pos.x, pos.y, comp.id, comp.value);
-                        break;
-                    case 'transistor':
-                        terminalPos = drawTransistor(pos.x, pos.y, comp.id, comp.transistor_type);
-                        break;
-                    case 'ground':
-                        terminalPos = drawGround(pos.x, pos.y, comp.id);
-                        break;
+            const bounds = { minX: Infinity, minY: Infinity, maxX: -Infinity, maxY: -Infinity };
+
+            function addComponent(comp, pos) {
+                const item = {
+                    comp, x: pos.x, y: pos.y,
+                    minX: pos.x - COMPONENT_EXTENT, minY: pos.y - COMPONENT_EXTENT,
+                    maxX: pos.x + COMPONENT_EXTENT, maxY: pos.y + COMPONENT_EXTENT
+                };
+                grid.insert(item);
+                bounds.minX = Math.min(bounds.minX, item.minX);
+                bounds.minY = Math.min(bounds.minY, item.minY);
+                bounds.maxX = Math.max(bounds.maxX, item.maxX);
+                bounds.maxY = Math.max(bounds.maxY, item.maxY);
+            }
+
+            function addWire(a, b) {
+                grid.insert({
+                    wire: true, x1: a.x, y1: a.y, x2: b.x, y2: b.y,
+                    minX: Math.min(a.x, b.x) - 3, minY: Math.min(a.y, b.y) - 3,
+                    maxX: Math.max(a.x, b.x) + 3, maxY: Math.max(a.y, b.y) + 3
+                });
+            }
+
+            if (circuit.columnar) {
+                // Endpoints are (component index, terminal string) pairs: no key strings to build
+                const positions = new Array(circuit.n);
+                for (let i = 0; i < circuit.n; i++) {
+                    const pos = layout.positions[circuit.ids[i]];
+                    if (!pos) continue;
+                    positions[i] = pos;
+                    addComponent(circuit.component(i), pos);
                 }
-                if (terminalPos) {
-                    Object.keys(terminalPos).forEach(terminal => {
-                        terminals[`${comp.id}.${terminal}`] = terminalPos[terminal];
-                    });
+                const endpoint = (ci, term) => {
+                    const pos = positions[ci];
+                    if (!pos) return null;
+                    const offset = (TERMINALS[circuit.strings[circuit.types[ci]]] || {})[circuit.strings[term]];
+                    return offset ? { x: pos.x + offset[0], y: pos.y + offset[1] } : null;
+                };
+                for (let k = 0; k < circuit.m; k++) {
+                    const a = endpoint(circuit.fromComponent[k], circuit.fromTerminal[k]);
+                    const b = endpoint(circuit.toComponent[k], circuit.toTerminal[k]);
+                    if (a && b) addWire(a, b);
                 }
+                return { name: circuit.name, grid, bounds };
+            }
+
+            circuit.components.forEach(comp => {
+                const pos = layout.positions[comp.id];
+                if (!pos) return;
+                addComponent(comp, pos);
+                const offsets = TERMINALS[comp.type] || {};
+                Object.keys(offsets).forEach(terminal => {
+                    terminals[`${comp.id}.${terminal}`] = { x: pos.x + offsets[terminal][0], y: pos.y + offsets[terminal][1] };
+                });
             });
-            
+
             circuit.connections.forEach(conn => {
-                const fromPos = terminals[conn.from];
-                const toPos = terminals[conn.to];
-                if (fromPos && toPos) {
-                    drawWire(fromPos.x, fromPos.y, toPos.x, toPos.y);
-                }
+                const a = terminals[conn.from];
+                const b = terminals[conn.to];
+                if (a && b) addWire(a, b);
             });
-            
+
+            return { name: circuit.name, grid, bounds };
+        }
+
+        // Draw everything intersecting the world rectangle into g (already transformed)
+        function renderRegion(g, minX, minY, maxX, maxY, scale) {
+            const wires = [];
+            const components = [];
+            scene.grid.query(minX, minY, maxX, maxY, item => (item.wire ? wires : components).push(item));
+
+            g.strokeStyle = '#34495e';
+            g.lineWidth = scale < LOD_SYMBOLS ? 1 / scale : 2;
+            g.beginPath();
+            wires.forEach(w => traceWire(g, w));
+            g.stroke();
+
+            if (scale < LOD_SYMBOLS) {
+                // Coarsest level: one filled path per component type
+                const byType = {};
+                components.forEach(item => (byType[item.comp.type] = byType[item.comp.type] || []).push(item));
+                Object.keys(byType).forEach(type => {
+                    g.fillStyle = TYPE_COLORS[type] || '#7f8c8d';
+                    g.beginPath();
+                    byType[type].forEach(item => g.rect(item.x - 25, item.y - 25, 50, 50));
+                    g.fill();
+                });
+                return;
+            }
+            const labels = scale >= LOD_LABELS;
+            if (labels) drawWireDots(g, wires);
+            components.forEach(item => drawComponent(g, item, labels));
+        }
+
+        function renderCache() {
+            const marginX = Math.round(canvas.width * CACHE_MARGIN);
+            const marginY = Math.round(canvas.height * CACHE_MARGIN);
+            cache.canvas.width = canvas.width + 2 * marginX;
+            cache.canvas.height = canvas.height + 2 * marginY;
+            const g = cache.canvas.getContext('2d');
+            g.setTransform(1, 0, 0, 1, 0, 0);
+            g.clearRect(0, 0, cache.canvas.width, cache.canvas.height);
+            // Cache pixel (0, 0) sits at screen (-marginX, -marginY)
+            g.setTransform(view.scale, 0, 0, view.scale, view.x + marginX, view.y + marginY);
+            renderRegion(
+                g,
+                (-marginX - view.x) / view.scale,
+                (-marginY - view.y) / view.scale,
+                (canvas.width + marginX - view.x) / view.scale,
+                (canvas.height + marginY - view.y) / view.scale,
+                view.scale
+            );
+            cache.scale = view.scale;
+            cache.x = view.x;
+            cache.y = view.y;
+            cache.valid = true;
+        }
+
+        function requestDraw() {
+            if (frameRequested) return;
+            frameRequested = true;
+            requestAnimationFrame(drawFrame);
+        }
+
+        function drawFrame() {
+            frameRequested = false;
+            ctx.setTransform(1, 0, 0, 1, 0, 0);
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            if (!scene) return;
+
+            const marginX = Math.round(canvas.width * CACHE_MARGIN);
+            const marginY = Math.round(canvas.height * CACHE_MARGIN);
+            if (cache.valid && cache.scale !== view.scale && zooming) {
+                // Mid-zoom: stretch the cached bitmap, re-render once the wheel settles
+                const k = view.scale / cache.scale;
+                ctx.drawImage(
+                    cache.canvas,
+                    view.x - (marginX + cache.x) * k, view.y - (marginY + cache.y) * k,
+                    cache.canvas.width * k, cache.canvas.height * k
+                );
+            } else {
+                const dx = view.x - cache.x;
+                const dy = view.y - cache.y;
+                if (!cache.valid || cache.scale !== view.scale || Math.abs(dx) > marginX || Math.abs(dy) > marginY) {
+                    renderCache();
+                }
+                ctx.drawImage(cache.canvas, view.x - cache.x - marginX, view.y - cache.y - marginY);
+            }
+
             ctx.fillStyle = '#2c3e50';
             ctx.font = 'bold 20px Arial';
             ctx.textAlign = 'left';
-            ctx.fillText(circuit.name, 20, 30);
+            ctx.fillText(scene.name, 20, 30);
+            ctx.font = '12px Arial';
+            ctx.fillText(`${Math.round(view.scale * 100)}%`, 20, canvas.height - 15);
+        }
+
+        function fitView() {
+            if (!scene) return;
+            const b = scene.bounds;
+            if (b.minX >= 0 && b.minY >= 0 && b.maxX <= canvas.width && b.maxY <= canvas.height) {
+                // Fits as laid out: draw at 1:1 like the original page
+                view.scale = 1;
+                view.x = 0;
+                view.y = 0;
+            } else {
+                const width = Math.max(b.maxX - b.minX, 1);
+                const height = Math.max(b.maxY - b.minY, 1);
+                view.scale = Math.max(MIN_SCALE, Math.min(1, (canvas.width - 40) / width, (canvas.height - 60) / height));
+                view.x = (canvas.width - width * view.scale) / 2 - b.minX * view.scale;
+                view.y = (canvas.height - height * view.scale) / 2 - b.minY * view.scale;
+            }
+            cache.valid = false;
+            requestDraw();
+        }
+
+        function visualizeCircuit(circuit, layout) {
+            componentPositions = layout.positions;
+            scene = buildScene(circuit, layout);
+            fitView();
         }
 
         function clearCanvas() {
+            scene = null;
+            cache.valid = false;
+            ctx.setTransform(1, 0, 0, 1, 0, 0);
             ctx.clearRect(0, 0, canvas.width, canvas.height);
         }
 
+        // Pan with drag, zoom around the cursor with the wheel, double-click to fit
+        let drag = null;
+        canvas.addEventListener('mousedown', event => {
+            drag = { x: event.clientX, y: event.clientY };
+            canvas.style.cursor = 'grabbing';
+        });
+        window.addEventListener('mousemove', event => {
+            if (!drag) return;
+            view.x += event.clientX - drag.x;
+            view.y += event.clientY - drag.y;
+            drag = { x: event.clientX, y: event.clientY };
+            requestDraw();
+        });
+        window.addEventListener('mouseup', () => {
+            drag = null;
+            canvas.style.cursor = 'grab';
+        });
+        canvas.addEventListener('wheel', event => {
+            if (!scene) return;
+            event.preventDefault();
+            const rect = canvas.getBoundingClientRect();
+            const px = (event.clientX - rect.left) * canvas.width / rect.width;
+            const py = (event.clientY - rect.top) * canvas.height / rect.height;
+            const scale = Math.min(MAX_SCALE, Math.max(MIN_SCALE, view.scale * Math.exp(-event.deltaY * 0.0015)));
+            view.x = px - (px - view.x) * scale / view.scale;
+            view.y = py - (py - view.y) * scale / view.scale;
+            view.scale = scale;
+            zooming = true;
+            clearTimeout(zoomTimer);
+            zoomTimer = setTimeout(() => {
+                zooming = false;
+                requestDraw();
+            }, 150);
+            requestDraw();
+        }, { passive: false });
+        canvas.addEventListener('dblclick', fitView);
+
         loadCircuitList();
     </script>
 </body>
 </html>
 """
 
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    """Count every request and time it; streamed bodies are timed until the stream closes"""
+    start = g.get("request_start")
+    if start is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule else "<unmatched>"
+    method = request.method
+    count("http_requests_total", method=method, endpoint=endpoint, status=response.status_code)
+
+    def finish():
+        observe("http_request_duration_seconds", time.perf_counter() - start, method=method, endpoint=endpoint)
+
+    if response.is_streamed:
+        response.call_on_close(finish)
+    else:
+        finish()
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Counters, stage timings and latency histograms in the Prometheus text format"""
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
 @app.route('/')
 def index():
     """Serve the main HTML page"""
@@ -593,37 +1058,222 @@ def index():
 
 @app.route('/api/circuits', methods=['GET'])
 def get_circuits():
-    """Get list of all available circuits"""
-    return jsonify({
-        "circuits": list(SAMPLE_CIRCUITS.keys())
-    })
+    """
+    Get one page of circuit IDs.
+    Query: limit, cursor (from next_cursor), name (prefix), type (component type)
+    """
+    args = (
+        request.args.get('limit', 50, type=int),
+        request.args.get('cursor'),
+        request.args.get('name'),
+        request.args.get('type'),
+    )
+
+    def build():
+        page = store.list_circuits(limit=args[0], cursor=args[1], name=args[2], component_type=args[3])
+        return dump_json({
+            "circuits": [c["id"] for c in page["circuits"]],
+            "items": page["circuits"],
+            "next_cursor": page["next_cursor"]
+        })
+
+    try:
+        return prepared.get(("circuits",) + args, store.generation(), build).to_response()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @app.route('/api/circuit/<circuit_id>', methods=['GET'])
 def get_circuit(circuit_id):
-    """Get specific circuit by ID"""
-    if circuit_id in SAMPLE_CIRCUITS:
-        return jsonify(SAMPLE_CIRCUITS[circuit_id])
-    return jsonify({"error": "Circuit not found"}), 404
+    """
+    Get specific circuit by ID (served from pre-serialized bytes).
+    Clients preferring application/x-circuit-columnar get the binary
+    encoding (circuit_wire) when the circuit is in the visualizer schema.
+    """
+    def build():
+        body = store.get_body(circuit_id)
+        return body.encode("utf-8") if body is not None else None
+
+    def build_columnar():
+        body = store.get_body(circuit_id)
+        if body is None:
+            return None
+        try:
+            return circuit_wire.encode(json.loads(body)), circuit_wire.MIME_TYPE
+        except ValueError:
+            return body.encode("utf-8")
+
+    version = store.version(circuit_id)
+    columnar = request.accept_mimetypes.best_match(["application/json", circuit_wire.MIME_TYPE]) == circuit_wire.MIME_TYPE
+    if version is None:
+        response = None
+    elif columnar:
+        response = prepared.get(("circuit-columnar", circuit_id), version, build_columnar)
+    else:
+        response = prepared.get(("circuit", circuit_id), version, build)
+    if response is None:
+        return jsonify({"error": "Circuit not found"}), 404
+    response = response.to_response()
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+    return response
+
+@app.route('/api/circuit/<circuit_id>/layout', methods=['GET'])
+def get_circuit_layout(circuit_id):
+    """Get component positions for a circuit (computed once per circuit content)"""
+    circuit = store.get(circuit_id)
+    if circuit is None:
+        return jsonify({"error": "Circuit not found"}), 404
+    width = request.args.get('width', CANVAS_WIDTH, type=int)
+    return jsonify(compute_layout(circuit, canvas_width=width))
+
+@app.route('/api/validate', methods=['POST'])
+def validate_posted_circuit():
+    """Check a posted circuit (either schema); ?repair=1 also returns a repaired copy"""
+    circuit = request.get_json(silent=True)
+    if not isinstance(circuit, dict):
+        return jsonify({"error": "Expected a circuit JSON object"}), 400
+    return jsonify(validate_circuit(circuit, repair=request.args.get('repair', 0, type=int) == 1))
+
+@app.route('/api/layout', methods=['POST'])
+def layout_circuit():
+    """Get component positions for a circuit posted in the request body"""
+    circuit = request.get_json(silent=True)
+    if not isinstance(circuit, dict):
+        return jsonify({"error": "Expected a circuit JSON object"}), 400
+    width = request.args.get('width', CANVAS_WIDTH, type=int)
+    return jsonify(compute_layout(circuit, canvas_width=width))
+
+def sse(event, data):
+    """One server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def circuit_id_for(circuit, body):
+    """Readable, content-addressed ID for a generated circuit"""
+    name = circuit_display_name(circuit, "circuit").strip().lower()
+    slug = "_".join("".join(ch if ch.isalnum() else " " for ch in name).split()) or "circuit"
+    return f"{slug}_{hashlib.sha256(body.encode('utf-8')).hexdigest()[:8]}"
 
 @app.route('/api/parse', methods=['POST'])
 def parse_gemini_output():
     """
-    This endpoint will eventually receive Gemini's text output
-    and convert it to structured JSON
+    Generate a circuit from {"prompt": ...} and stream it back as
+    server-sent events: one `component` / `connection` event per element
+    as soon as Gemini has produced it, then `done` with the stored circuit
+    (or `error`). The finished text is parsed tolerantly (json_repair)
+    and its connectivity checked and repaired (circuit_validator); `done`
+    lists the repairs and any remaining issues. A design that is already
+    stored under another name is not stored again: `done` carries the
+    existing id and "duplicate": true.
     """
-    # TODO: Integrate with Gemini API
-    return jsonify({"message": "Gemini integration coming soon"})
+    payload = request.get_json(silent=True) or {}
+    prompt = str(payload.get("prompt", "")).strip()
+    if not prompt:
+        return jsonify({"error": "Missing prompt"}), 400
+    client = app.config.get("GENAI_CLIENT")
+
+    def events():
+        parser = IncrementalArrayParser(("components", "connections"))
+        try:
+            with span("llm_stream"):
+                for text in generator.stream_circuit_text(prompt, client=client):
+                    for key, item in parser.feed(text):
+                        yield sse("component" if key == "components" else "connection", item)
+        except generator.SafetyBlockedError as e:
+            yield sse("error", {"error": str(e)})
+            return
+        except Exception as e:
+            yield sse("error", {"error": f"Generation failed: {e}"})
+            return
+        try:
+            with span("parse"):
+                circuit, changes = parse_circuit(parser.text, schema="visualizer")
+        except ValueError as e:
+            yield sse("error", {"error": f"Gemini returned malformed JSON: {e}"})
+            return
+        with span("validate"):
+            report = validate_circuit(circuit, repair=True)
+        circuit = report["circuit"]
+        new_id = circuit_id_for(circuit, parser.text)
+        with span("store_write"):
+            circuit_id = store.put(new_id, circuit, dedupe=True)
+        yield sse("done", {
+            "id": circuit_id,
+            "duplicate": circuit_id != new_id,
+            "circuit": circuit,
+            "repairs": changes + report["repairs"],
+            "issues": report["issues"]
+        })
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route('/api/simulate', methods=['POST'])
+def simulate_circuit():
+    """
+    Queue a simulation of {"circuit": {...}} or {"circuit_id": ...}.
+    Optional "analysis" (op/ac/tran/..., default: the circuit's directive),
+    "backend" (auto/mna/ngspice) and "cache" (false to skip the result
+    cache). Answers 202 with the job; poll GET /api/jobs/<id>. 429 when
+    the queue is full.
+    """
+    payload = request.get_json(silent=True) or {}
+    circuit = payload.get("circuit")
+    if circuit is None and payload.get("circuit_id"):
+        circuit = store.get(str(payload["circuit_id"]))
+        if circuit is None:
+            return jsonify({"error": "Circuit not found"}), 404
+    if not isinstance(circuit, dict):
+        return jsonify({"error": "Expected a circuit JSON object or circuit_id"}), 400
+    analysis = str(payload.get("analysis", "auto")).lstrip(".").lower()
+    backend = str(payload.get("backend", "auto")).lower()
+    if backend not in BACKENDS:
+        return jsonify({"error": f"Unknown backend {backend!r}"}), 400
+    try:
+        job = jobs.submit(circuit, analysis=analysis, backend=backend, use_cache=payload.get("cache", True) is not False)
+    except JobQueueFull as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = "1"
+        return response, 429
+    response = jsonify(job)
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return response, 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a simulation job, with its result once done"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running simulation job"""
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
 
 if __name__ == '__main__':
+    configure_logging()
     print("=" * 50)
     print("🚀 Circuit Visualizer Backend Starting...")
     print("=" * 50)
     print("\n✅ Server running at: http://localhost:5000")
     print("\n📋 Available endpoints:")
     print("   GET  /                    - Main web interface")
-    print("   GET  /api/circuits        - List all circuits")
+    print("   GET  /api/circuits        - List circuits (paginated)")
     print("   GET  /api/circuit/<id>    - Get specific circuit")
-    print("   POST /api/parse           - Parse Gemini output (TODO)")
+    print("   GET  /api/circuit/<id>/layout - Get component positions")
+    print("   POST /api/layout          - Get positions for a posted circuit")
+    print("   POST /api/validate        - Check a posted circuit's connectivity")
+    print("   POST /api/parse           - Generate a circuit (streamed as SSE)")
+    print("   POST /api/simulate        - Queue a simulation job")
+    print("   GET  /api/jobs/<id>       - Simulation job status and result")
+    print("   DELETE /api/jobs/<id>     - Cancel a simulation job")
+    print("   GET  /metrics             - Prometheus metrics")
     print("\n💡 Open your browser and go to: http://localhost:5000")
     print("=" * 50)
     print()
@@ -0,0 +1,421 @@
+"""
+Simulation jobs on a bounded process pool.
+
+Analyses are CPU-bound, so they run in worker processes instead of the
+web server's request threads; every core can be busy while requests keep
+being answered:
+
+    jobs = JobManager(max_workers=4, max_pending=64)
+    job = jobs.submit(circuit)        # raises JobQueueFull when saturated
+    jobs.get(job["id"])               # {"id", "status", "result", "error", ...}
+    jobs.cancel(job["id"])
+
+Status goes queued -> running -> done | failed | cancelled. A queued job
+is cancelled outright; a job already running finishes in its worker (and
+still counts as pending until then) and its result is discarded.
+
+run_analysis() is the worker entry point. It takes either circuit schema,
+checks and repairs connectivity first (circuit_validator) and then runs the analysis
+named by the circuit's directive (.op/.ac/.tran) with mna_solver. Other
+directives (.dc, .noise, ...) and backend="ngspice" go to a locally
+installed ngspice in batch mode.
+
+Results are cached by topology hash (topology_hash.py) in a TieredCache
+shared by all workers, with node and component names stored in canonical
+form, so a renamed or reordered copy of a circuit that was already
+simulated gets its result back under its own names without solving.
+"""
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import mna_solver
+from circuit_ir import CircuitIR
+from circuit_validator import validate_circuit
+from instrumentation import observe
+from netlist_writer import netlist_text
+from tiered_cache import CACHE_DIR, TieredCache, make_key
+from topology_hash import canonicalize
+
+# Analyses the in-process solver handles
+MNA_ANALYSES = ("op", "ac", "tran")
+BACKENDS = ("auto", "mna", "ngspice")
+
+# Samples kept per trace in a result (sweeps and transients are decimated)
+MAX_POINTS = 2000
+
+# Seconds an ngspice run may take before it is killed
+NGSPICE_TIMEOUT = 120
+
+# Simulation results by topology; each worker process opens its own handle
+result_cache = TieredCache(os.path.join(CACHE_DIR, "simulations.sqlite"), max_memory_items=128)
+
+# Result entries keyed by node name / holding component names
+_NODE_KEYED = ("node_voltages", "magnitude_db", "phase_deg")
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by JobManager.submit when max_pending jobs are unfinished"""
+
+
+def directive_kind(simulation):
+    """'.tran 1u 1m' -> 'tran'; '' -> 'op'"""
+    parts = str(simulation or "").split()
+    return parts[0].lstrip(".").lower() if parts else "op"
+
+
+def _decimate(count, max_points):
+    if not max_points or count <= max_points:
+        return slice(None)
+    return np.unique(np.linspace(0, count - 1, max_points).round().astype(int))
+
+
+def _run_mna(data, analysis, max_points):
+    if analysis == "op":
+        result = mna_solver.dc_operating_point(data)
+        return {
+            "node_voltages": result["node_voltages"],
+            "branch_currents": result["branch_currents"],
+            "skipped": result["skipped"],
+        }
+    if analysis == "ac":
+        result = mna_solver.ac_analysis(data)
+        keep = _decimate(len(result["frequency"]), max_points)
+        return {
+            "frequency": result["frequency"][keep].tolist(),
+            "magnitude_db": {k: v[keep].tolist() for k, v in result["magnitude_db"].items()},
+            "phase_deg": {k: v[keep].tolist() for k, v in result["phase_deg"].items()},
+            "skipped": result["skipped"],
+        }
+    result = mna_solver.transient_analysis(data)
+    keep = _decimate(len(result["time"]), max_points)
+    return {
+        "time": result["time"][keep].tolist(),
+        "node_voltages": {k: v[keep].tolist() for k, v in result["node_voltages"].items()},
+        "steps": result["steps"],
+        "skipped": result["skipped"],
+    }
+
+
+def parse_ascii_raw(text):
+    """SPICE ASCII rawfile -> [{"name", "variables": {name: values}}], one entry per plot"""
+    plots = []
+    lines = iter(text.splitlines())
+    for line in lines:
+        if not line.startswith("Plotname:"):
+            continue
+        name = line.split(":", 1)[1].strip()
+        is_complex, n_vars, n_points, names = False, 0, 0, []
+        for line in lines:
+            key, _, value = line.partition(":")
+            if key == "Flags":
+                is_complex = "complex" in value
+            elif key == "No. Variables":
+                n_vars = int(value)
+            elif key == "No. Points":
+                n_points = int(value)
+            elif key == "Variables":
+                while len(names) < n_vars:
+                    fields = next(lines).split()
+                    if fields:
+                        names.append(fields[1])
+            elif key == "Values":
+                break
+        values = []
+        while len(values) < n_vars * n_points:
+            fields = next(lines).split()
+            if fields:
+                values.append(fields[-1])
+        if is_complex:
+            values = [complex(*(float(p) for p in v.split(","))) for v in values]
+        else:
+            values = [float(v) for v in values]
+        columns = np.array(values).reshape(n_points, n_vars).T if n_vars else []
+        plots.append({"name": name, "variables": dict(zip(names, columns))})
+    return plots
+
+
+def _trace_name(variable):
+    """ngspice vector name -> (kind, mna-style name): v(n1) -> ("v", "N1")"""
+    lower = variable.lower()
+    if lower.startswith(("v(", "i(")) and lower.endswith(")"):
+        return lower[0], variable[2:-1].upper() if lower[0] == "i" else variable[2:-1]
+    if lower.endswith("#branch"):
+        return "i", variable[:-len("#branch")].upper()
+    return None, variable
+
+
+def _run_ngspice(data, analysis, max_points):
+    binary = shutil.which("ngspice")
+    if binary is None:
+        raise mna_solver.CircuitError("ngspice is not installed")
+    # ngspice reads the netlist as ASCII; unit glyphs carry no scale anyway
+    text = netlist_text(data, warn=None).replace("Ω", "").replace("µ", "u")
+    with tempfile.TemporaryDirectory() as tmp:
+        cir, raw = os.path.join(tmp, "circuit.cir"), os.path.join(tmp, "circuit.raw")
+        with open(cir, "w", encoding="ascii", errors="replace") as f:
+            f.write(text)
+        proc = subprocess.run(
+            [binary, "-b", "-r", raw, cir], capture_output=True, text=True,
+            timeout=NGSPICE_TIMEOUT, env=dict(os.environ, SPICE_ASCIIRAWFILE="1"),
+        )
+        if proc.returncode != 0 or not os.path.exists(raw):
+            raise mna_solver.CircuitError(f"ngspice failed: {(proc.stderr or proc.stdout).strip()[-500:]}")
+        with open(raw, encoding="utf-8", errors="replace") as f:
+            plots = parse_ascii_raw(f.read())
+    if not plots:
+        raise mna_solver.CircuitError("ngspice produced no results")
+
+    variables = plots[-1]["variables"]
+    axis = next(iter(variables), None)
+    result = {"skipped": []}
+    if analysis != "op" and axis is not None:
+        # First vector is the sweep variable (time, frequency, swept source)
+        keep = _decimate(len(variables[axis]), max_points)
+        result[{"ac": "frequency", "tran": "time"}.get(analysis, "sweep")] = np.real(variables[axis])[keep].tolist()
+    else:
+        keep = slice(None)
+    voltages, currents, other = {}, {}, {}
+    for variable, column in variables.items():
+        if variable == axis and analysis != "op":
+            continue
+        kind, trace = _trace_name(variable)
+        column = column[keep]
+        if analysis == "op":
+            column = float(np.real(column[0]))
+        elif analysis == "ac":
+            column = np.asarray(column)
+        else:
+            column = np.real(column).tolist()
+        (voltages if kind == "v" else currents if kind == "i" else other)[trace] = column
+    if analysis == "ac":
+        result["magnitude_db"] = {k: (20 * np.log10(np.maximum(np.abs(v), 1e-300))).tolist() for k, v in voltages.items()}
+        result["phase_deg"] = {k: np.degrees(np.angle(v)).tolist() for k, v in voltages.items()}
+    else:
+        result["node_voltages"] = voltages
+        if analysis == "op" or currents:
+            result["branch_currents"] = currents
+        if other:
+            result["vectors"] = other
+    return result
+
+
+def _relabel(result, nets, comps):
+    """Rename the nodes and components in a result; None if a name has no mapping"""
+    if "vectors" in result:
+        return None
+    renamed = dict(result)
+    try:
+        for key in _NODE_KEYED:
+            if key in renamed:
+                renamed[key] = {nets[name]: value for name, value in renamed[key].items()}
+        if "branch_currents" in renamed:
+            renamed["branch_currents"] = {comps[name]: value for name, value in renamed["branch_currents"].items()}
+        renamed["skipped"] = [[comps[name], reason] for name, reason in renamed["skipped"]]
+    except KeyError:
+        return None
+    return renamed
+
+
+def _simulate_cached(data, analysis, backend, max_points):
+    """Run the analysis unless an isomorphic circuit's result is cached; returns (result, cached)"""
+    canon = canonicalize(data)
+    key = make_key("simulation", canon["hash"], analysis, backend,
+                   " ".join(str(data.get("simulation", "")).lower().split()), max_points)
+    to_canon = ({name: f"n{k}" for k, name in enumerate(canon["nets"])},
+                {cid: f"c{k}" for k, cid in enumerate(canon["components"])})
+    from_canon = ({f"n{k}": name for k, name in enumerate(canon["nets"])},
+                  {f"c{k}": cid for k, cid in enumerate(canon["components"])})
+    stored = result_cache.get(key)
+    if stored is not None:
+        result = _relabel(stored, *from_canon)
+        if result is not None:
+            return result, True
+    result = _run_mna(data, analysis, max_points) if backend == "mna" else _run_ngspice(data, analysis, max_points)
+    stored = _relabel(result, *to_canon)
+    if stored is not None:
+        result_cache.set(key, stored)
+    return result, False
+
+
+def run_analysis(circuit, analysis="auto", backend="auto", max_points=MAX_POINTS, use_cache=True):
+    """
+    Validate (with repairs) and simulate one circuit of either schema;
+    runs in a worker process. `analysis` defaults to the circuit's own
+    directive.
+
+    Returns {"circuit_name", "analysis", "backend", "repairs", "cached",
+    "elapsed", ...results}; raises CircuitError if connectivity errors
+    remain or the circuit cannot be solved.
+    """
+    start = time.perf_counter()
+    report = validate_circuit(circuit, repair=True)
+    if not report["ok"]:
+        errors = [i["message"] for i in report["issues"] if i["severity"] == "error"]
+        raise mna_solver.CircuitError("Invalid circuit: " + "; ".join(errors))
+    circuit = report["circuit"]
+    data = CircuitIR.from_json(circuit).to_generator() if "connections" in circuit else circuit
+
+    if analysis == "auto":
+        analysis = directive_kind(data.get("simulation"))
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}")
+    if backend == "auto":
+        backend = "mna" if analysis in MNA_ANALYSES else "ngspice"
+    if backend == "mna" and analysis not in MNA_ANALYSES:
+        raise mna_solver.CircuitError(f"The built-in solver has no .{analysis} analysis")
+    if use_cache:
+        result, cached = _simulate_cached(data, analysis, backend, max_points)
+    elif backend == "mna":
+        result, cached = _run_mna(data, analysis, max_points), False
+    else:
+        result, cached = _run_ngspice(data, analysis, max_points), False
+    result.update(
+        circuit_name=data.get("circuit_name", "Design"),
+        analysis=analysis,
+        backend=backend,
+        repairs=report["repairs"],
+        cached=cached,
+        elapsed=round(time.perf_counter() - start, 6),
+    )
+    return result
+
+
+class JobManager:
+    """
+    Bounded queue of run_analysis jobs. At most `max_pending` jobs may be
+    unfinished at once (submit raises JobQueueFull beyond that); the
+    newest `keep_finished` finished jobs stay queryable.
+    """
+
+    def __init__(self, max_workers=None, max_pending=64, keep_finished=1000):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._pool = None  # started on first submit
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()  # id -> job record
+        self._futures = {}          # id -> Future of unfinished jobs
+
+    def _executor(self):
+        if self._pool is None:
+            # Forking a threaded web server can copy held locks into the
+            # child; spawned workers start clean and are reused afterwards
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def submit(self, circuit, analysis="auto", backend="auto", max_points=MAX_POINTS, use_cache=True):
+        """Queue a simulation; returns the job record"""
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._futures)} simulations already pending")
+            job_id = uuid.uuid4().hex
+            job = self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "analysis": analysis,
+                "backend": backend,
+                "created_at": time.time(),
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            args = (run_analysis, circuit, analysis, backend, max_points, use_cache)
+            try:
+                future = self._executor().submit(*args)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool
+                self._pool = None
+                future = self._executor().submit(*args)
+            self._futures[job_id] = future
+            snapshot = dict(job)
+        future.add_done_callback(lambda f: self._finished(job_id, f))
+        return snapshot
+
+    def _finished(self, job_id, future):
+        with self._lock:
+            self._futures.pop(job_id, None)
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if job["status"] != "cancelled":
+                job["finished_at"] = time.time()
+                try:
+                    job["result"] = result = future.result()
+                    job["status"] = "done"
+                    # Workers are separate processes; their timings are recorded here
+                    observe("simulation_duration_seconds", result["elapsed"], analysis=result["analysis"])
+                except CancelledError:
+                    job["status"] = "cancelled"
+                except BrokenProcessPool as e:
+                    self._pool = None
+                    job["status"], job["error"] = "failed", f"Simulation worker crashed: {e}"
+                except Exception as e:
+                    job["status"], job["error"] = "failed", str(e)
+            self._evict()
+
+    def _evict(self):
+        finished = len(self._jobs) - len(self._futures)
+        for job_id in list(self._jobs):
+            if finished <= self.keep_finished:
+                break
+            if job_id not in self._futures:
+                del self._jobs[job_id]
+                finished -= 1
+
+    def get(self, job_id):
+        """Copy of the job record, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            future = self._futures.get(job_id)
+        if snapshot["status"] == "queued" and future is not None and future.running():
+            snapshot["status"] = "running"
+        return snapshot
+
+    def cancel(self, job_id):
+        """
+        Cancel a job; returns its record (None if unknown). Finished jobs are
+        left as they are. A running job keeps counting towards max_pending
+        until its worker actually returns.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            future = self._futures.get(job_id)
+            if future is not None and job["status"] != "cancelled":
+                job["status"] = "cancelled"
+                job["finished_at"] = time.time()
+            snapshot = dict(job)
+        # Cancelling a queued future runs _finished right here, which takes the lock
+        if future is not None:
+            future.cancel()
+        return snapshot
+
+    def pending(self):
+        """Number of unfinished jobs"""
+        with self._lock:
+            return len(self._futures)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            futures = list(self._futures.values())
+        for future in futures:
+            future.cancel()
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
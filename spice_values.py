@@ -0,0 +1,35 @@
+"""
+SPICE value parsing ('4.7k', '10uF', '330Ω', 1e-6 -> float).
+
+Kept free of numpy/scipy: topology_hash (and through it circuit_store and
+gemini_to_net_v1) needs it at import time, and mna_solver re-exports it.
+"""
+import re
+
+# SPICE scale suffixes; "meg" and "mil" must be tried before "m"
+_SUFFIXES = (
+    ("meg", 1e6), ("mil", 25.4e-6), ("t", 1e12), ("g", 1e9), ("k", 1e3),
+    ("m", 1e-3), ("u", 1e-6), ("µ", 1e-6), ("n", 1e-9), ("p", 1e-12), ("f", 1e-15),
+)
+# A leading number and whatever unit text follows it
+NUMBER = re.compile(r"^\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\s*(\S*)")
+
+
+class CircuitError(ValueError):
+    """Raised when a circuit cannot be analysed (bad values, singular matrix)"""
+
+
+def parse_value(value):
+    """Convert a SPICE value such as '4.7k', '10uF', '330Ω' or 1e-6 to a float"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER.match(str(value))
+    if not match:
+        raise CircuitError(f"Cannot parse value {value!r}")
+    number = float(match.group(1))
+    unit = match.group(2).lower()
+    for suffix, scale in _SUFFIXES:
+        if unit.startswith(suffix):
+            return number * scale
+    # Anything else is a unit name (V, A, F, H, Ω, ohm) and carries no scale
+    return number
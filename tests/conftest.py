@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Stores and caches are opened at import time; keep them out of the checkout
+_scratch = tempfile.mkdtemp(prefix="synaptic-tests-")
+os.environ.setdefault("CIRCUIT_DB", os.path.join(_scratch, "circuits.sqlite"))
+os.environ.setdefault("SYNAPTIC_CACHE_DIR", os.path.join(_scratch, "cache"))
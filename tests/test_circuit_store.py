@@ -0,0 +1,46 @@
+import json
+import sqlite3
+
+from circuit_store import CircuitStore
+
+GENERATOR_CIRCUIT = {
+    "circuit_name": "Divider",
+    "components": [
+        {"type": "V", "id": "1", "nodes": ["in", "0"], "value": "5"},
+        {"type": "R", "id": "1", "nodes": ["in", "out"], "value": "1k"},
+        {"type": "R", "id": "2", "nodes": ["out", "0"], "value": "1k"},
+    ],
+    "simulation": ".op",
+}
+
+
+def _assert_drawable(circuit):
+    ids = {comp["id"] for comp in circuit["components"]}
+    assert circuit["connections"]
+    for conn in circuit["connections"]:
+        assert conn["from"].partition(".")[0] in ids
+        assert conn["to"].partition(".")[0] in ids
+
+
+def test_generator_schema_is_stored_as_visualizer(tmp_path):
+    store = CircuitStore(str(tmp_path / "c.sqlite"))
+    store.put("divider", GENERATOR_CIRCUIT, dedupe=True)
+    circuit = store.get("divider")
+    _assert_drawable(circuit)
+    assert circuit["name"] == "Divider"
+    assert circuit["simulation"] == ".op"
+    assert store.list_circuits(component_type="resistor")["circuits"][0]["id"] == "divider"
+    # A generator copy of the same design is still recognised
+    assert store.put("copy", GENERATOR_CIRCUIT, dedupe=True) == "divider"
+
+
+def test_existing_generator_rows_are_converted(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    CircuitStore(path)
+    with sqlite3.connect(path) as db:
+        db.execute("INSERT INTO circuits (id, name, created_at, body) VALUES ('old', 'Divider', 1, ?)",
+                   (json.dumps(GENERATOR_CIRCUIT),))
+        db.execute("UPDATE meta SET value = 0 WHERE key = 'visualizer_only'")
+    store = CircuitStore(path)
+    _assert_drawable(store.get("old"))
+    assert store.list_circuits()["circuits"][0]["created_at"] == 1
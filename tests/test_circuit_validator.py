@@ -0,0 +1,49 @@
+from circuit_validator import validate_circuit
+
+
+def _generator(*parts):
+    components = []
+    for ctype, cid, a, b, value in parts:
+        components.append({"type": ctype, "id": cid, "nodes": [a, b], "value": value})
+    return {"circuit_name": "Test", "components": components, "simulation": ".op"}
+
+
+def _codes(report, severity=None):
+    return [i["code"] for i in report["issues"] if severity is None or i["severity"] == severity]
+
+
+def test_terminal_alone_on_ground_is_not_dangling():
+    circuit = _generator(("V", "1", "in", "0", "5"), ("R", "1", "in", "out", "1k"))
+    report = validate_circuit(circuit, repair=True)
+    assert report["ok"]
+    assert report["repairs"] == []
+    assert report["circuit"] is circuit
+    # The open resistor end is still reported, as a warning
+    assert _codes(report) == ["dangling_terminal"]
+    assert report["issues"][0]["terminal"] == "R1.2"
+    assert _codes(report, "error") == []
+
+
+def test_sample_with_missing_ground_link_is_repaired():
+    from server import SAMPLE_CIRCUITS
+
+    report = validate_circuit(SAMPLE_CIRCUITS["voltage_divider"], repair=True)
+    assert report["ok"]
+    assert report["repairs"] == ["Connected V1.negative to ground (open source terminal)"]
+    assert {"from": "V1.negative", "to": "GND.terminal"} in report["circuit"]["connections"]
+
+
+def test_open_source_terminal_is_repaired_once():
+    circuit = _generator(("V", "1", "in", "x", "5"), ("R", "1", "in", "0", "1k"))
+    report = validate_circuit(circuit, repair=True)
+    assert report["ok"]
+    assert report["repairs"] == ["Connected V1.negative to ground (open source terminal)"]
+    assert report["circuit"]["components"][0]["nodes"] == ["in", "0"]
+
+
+def test_unrepairable_error_records_no_repairs():
+    circuit = _generator(("V", "1", "a", "a", "5"), ("R", "1", "a", "0", "1k"))
+    report = validate_circuit(circuit, repair=True, max_rounds=4)
+    assert not report["ok"]
+    assert "shorted_source" in _codes(report, "error")
+    assert report["repairs"] == []
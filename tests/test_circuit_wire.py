@@ -0,0 +1,72 @@
+import os
+import struct
+import sys
+
+import pytest
+
+from circuit_wire import MAGIC, decode, encode
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from synthetic_circuits import make_circuit  # noqa: E402
+
+AWKWARD = {
+    "name": "Awkward ids",
+    "description": "µ-power 👍 filter",
+    "components": [
+        {"id": "R007", "type": "resistor", "value": "1k"},
+        {"id": "R0", "type": "resistor", "value": "2k"},
+        {"id": "R", "type": "resistor", "value": "3k"},
+        {"id": "12", "type": "capacitor", "value": "10µF"},
+        {"id": "C4294967295", "type": "capacitor", "value": ""},
+        {"id": "", "type": "ground"},
+        {"type": "led", "value": 5, "position": {"x": 1.5, "y": -2}},
+        {"id": 3, "type": "diode"},
+        {"id": "R007", "type": "resistor", "value": "duplicate id"},
+    ],
+    "connections": [
+        {"from": "R007.1", "to": "R0.2"},
+        {"from": "R.1", "to": "12.2", "label": "bias"},
+        {"from": "C4294967295.", "to": ".1"},
+        {"from": "nowhere.1", "to": "R007"},
+        {"from": "R0.2"},
+        {"to": 7},
+        {},
+    ],
+}
+
+
+def test_round_trip_keeps_awkward_ids_and_fields():
+    body = encode(AWKWARD)
+    assert body[:4] == MAGIC
+    assert len(body) % 4 == 0
+    assert decode(body) == AWKWARD
+
+
+def test_leading_zeros_in_ids_survive():
+    circuit = {"components": [{"id": f"R{k:03d}", "type": "resistor", "value": "1k"} for k in range(12)],
+               "connections": [{"from": "R000.1", "to": "R010.2"}]}
+    decoded = decode(encode(circuit))
+    assert [c["id"] for c in decoded["components"]] == [f"R{k:03d}" for k in range(12)]
+    assert decoded["connections"] == [{"from": "R000.1", "to": "R010.2"}]
+
+
+@pytest.mark.parametrize("family,n", [("rc_ladder", 40), ("random_mesh", 3000)])
+def test_round_trip_of_generated_circuits(family, n):
+    circuit = make_circuit(family, n, seed=2, schema="visualizer")
+    body = encode(circuit)
+    assert decode(body) == circuit
+    widths = struct.unpack_from("<11B", body, 24)
+    assert max(widths) == (2 if n > 300 else 1)
+
+
+def test_empty_circuit():
+    assert decode(encode({"components": [], "connections": []})) == {"components": [], "connections": []}
+
+
+def test_rejects_other_schemas_and_bodies():
+    with pytest.raises(ValueError):
+        encode({"components": [{"type": "R", "id": "1", "nodes": ["a", "0"], "value": "1k"}]})
+    with pytest.raises(ValueError):
+        encode({"components": ["R1"], "connections": []})
+    with pytest.raises(ValueError):
+        decode(b'{"components": []}')
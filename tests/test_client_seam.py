@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+import batch_generate
+import gemini_to_net_v1 as generator
+from fake_genai import FakeClient, FakeResponse
+from instrumentation import registry
+
+
+@pytest.fixture(autouse=True)
+def isolated_generator():
+    generator.response_cache.clear()
+    yield
+    generator.set_client(None)
+    generator.response_cache.clear()
+
+
+def test_set_client_overrides_and_resets(monkeypatch):
+    pooled = object()
+    monkeypatch.setattr(generator.client_pool, "get", lambda api_key=None: pooled)
+    fake = FakeClient()
+    generator.set_client(fake)
+    assert generator.get_client() is fake
+    assert generator.client is fake
+
+    generator.set_client(None)
+    assert generator.get_client() is pooled
+
+
+def test_responses_are_cached_by_normalized_prompt():
+    fake = FakeClient()
+    generator.set_client(fake)
+    first = generator.get_circuit_json("an RC  low-pass filter")
+    second = generator.get_circuit_json("  an RC low-pass filter ")
+    assert first == second
+    assert first["circuit_name"] == "RC Low Pass Filter"
+    assert fake.calls == 1
+
+    generator.get_circuit_json("an RC low-pass filter", use_cache=False)
+    assert fake.calls == 2
+
+
+def test_generate_netlist_writes_the_design(tmp_path):
+    generator.set_client(FakeClient())
+    data, path = generator.generate_netlist("an RC low-pass filter", target_folder=str(tmp_path))
+    assert data["components"]
+    with open(path) as f:
+        netlist = f.read()
+    assert netlist.startswith(".title RC_Low_Pass_Filter\n")
+    assert "R1 in out 1k" in netlist
+
+
+@pytest.mark.parametrize("client, outcome", [
+    (FakeClient(error_codes=[503]), "api_error"),
+    (FakeClient(responder=lambda prompt: "not json at all"), "parse_error"),
+    (FakeClient(responder=lambda prompt: FakeResponse("")), "empty"),
+    (FakeClient(responder=lambda prompt: FakeResponse("", finish_reason="SAFETY")), "safety"),
+])
+def test_generate_netlist_error_paths(tmp_path, client, outcome):
+    generator.set_client(client)
+    before = registry.value("llm_requests_total", outcome=outcome)
+
+    assert generator.generate_netlist("a broken design", target_folder=str(tmp_path)) == (None, None)
+    assert os.listdir(tmp_path) == []
+    assert registry.value("llm_requests_total", outcome=outcome) == before + 1
+
+    # Failures are not cached: the next call asks again and can succeed
+    generator.set_client(FakeClient())
+    data, path = generator.generate_netlist("a broken design", target_folder=str(tmp_path))
+    assert data is not None and os.path.exists(path)
+
+
+def test_batch_retries_retryable_errors_and_keeps_input_order():
+    fake = FakeClient(error_codes=[429, None, None])
+    results = batch_generate.generate_all(["one", "two", "three"], client=fake, concurrency=1,
+                                          backoff_base=0, use_cache=False)
+    assert [r["prompt"] for r in results] == ["one", "two", "three"]
+    assert [r["attempts"] for r in results] == [2, 1, 1]
+    assert all(r["data"] and r["error"] is None for r in results)
+
+
+def test_batch_does_not_retry_client_errors():
+    fake = FakeClient(error_codes=[400])
+    [result] = batch_generate.generate_all(["bad request"], client=fake, backoff_base=0, use_cache=False)
+    assert result["attempts"] == 1
+    assert result["data"] is None and "400" in result["error"]
@@ -0,0 +1,97 @@
+import copy
+import os
+import sys
+
+import pytest
+
+from incremental import IncrementalNetlist, IncrementalOperatingPoint, diff_circuits
+from mna_solver import dc_operating_point
+from netlist_writer import netlist_text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from synthetic_circuits import make_circuit  # noqa: E402
+
+
+def _assert_same_op(actual, expected):
+    assert actual["node_voltages"].keys() == expected["node_voltages"].keys()
+    for name, v in expected["node_voltages"].items():
+        assert actual["node_voltages"][name] == pytest.approx(v, rel=1e-9, abs=1e-12)
+    for name, i in expected["branch_currents"].items():
+        assert actual["branch_currents"][name] == pytest.approx(i, rel=1e-7, abs=1e-15)
+
+
+def _resistors(circuit):
+    return [i for i, c in enumerate(circuit["components"]) if c["type"] == "R"]
+
+
+def test_woodbury_updates_match_a_full_solve():
+    circuit = make_circuit("random_mesh", 300, seed=4)
+    op = IncrementalOperatingPoint(circuit, max_rank=64)
+    for step, i in enumerate(_resistors(circuit)[:20]):
+        circuit["components"][i]["value"] = f"{1 + step % 7}.5k"
+        assert op.update(circuit) == "updated"
+        _assert_same_op(op.result(), dc_operating_point(circuit))
+    assert len(op._delta) == 20
+
+
+def test_source_edits_and_refactorization_match_a_full_solve():
+    circuit = make_circuit("rc_ladder", 60, seed=1)
+    op = IncrementalOperatingPoint(circuit, max_rank=3)
+    source = next(c for c in circuit["components"] if c["type"] == "V")
+    assert op.set_values({f"V{source['id']}": "3.3"}) == "updated"
+    source["value"] = "3.3"
+    for i in _resistors(circuit)[:5]:
+        circuit["components"][i]["value"] = "330"
+    assert op.update(circuit) == "updated"
+    assert len(op._delta) <= 3  # more edits than max_rank: factorized again
+    _assert_same_op(op.result(), dc_operating_point(circuit))
+
+
+def test_structural_edits_rebuild():
+    circuit = make_circuit("rc_ladder", 20, seed=0)
+    op = IncrementalOperatingPoint(circuit)
+    assert op.update(copy.deepcopy(circuit)) == "unchanged"
+    circuit["components"][1]["nodes"] = list(reversed(circuit["components"][1]["nodes"]))
+    assert op.update(circuit) == "rebuilt"
+    _assert_same_op(op.result(), dc_operating_point(circuit))
+    assert diff_circuits(circuit, dict(circuit, components=circuit["components"][1:]))["structural"]
+
+
+def test_patched_netlist_matches_a_fresh_write(tmp_path):
+    circuit = make_circuit("random_mesh", 200, seed=3)
+    path = tmp_path / "mesh.cir"
+    netlist = IncrementalNetlist(str(path))
+    assert netlist.update(circuit, validate=False)["mode"] == "full"
+    assert path.read_text() == netlist_text(circuit)
+
+    i, j = _resistors(circuit)[:2]
+    name = "R" + circuit["components"][i]["id"]
+    old = circuit["components"][i]["value"]
+    circuit["components"][i]["value"] = "9" * len(old)  # same width: patched in place
+    result = netlist.update(circuit, validate=False)
+    assert (result["mode"], result["changed"]) == ("patched", [name])
+    assert path.read_text() == netlist_text(circuit)
+
+    circuit["components"][j]["value"] = "1.5meg"
+    assert netlist.update(circuit, validate=False)["mode"] == "rewritten"
+    assert path.read_text() == netlist_text(circuit)
+
+    circuit["simulation"] = ".tran 1u 1m"
+    circuit["circuit_name"] = "Renamed mesh"
+    assert netlist.update(circuit, validate=False)["mode"] in ("patched", "rewritten")
+    assert path.read_text() == netlist_text(circuit)
+
+    assert netlist.set_values({name: "47k"})["changed"] == [name]
+    circuit["components"][i]["value"] = "47k"
+    assert path.read_text() == netlist_text(circuit)
+
+
+def test_netlist_edited_elsewhere_is_rewritten_in_full(tmp_path):
+    circuit = make_circuit("rc_ladder", 20, seed=0)
+    path = tmp_path / "ladder.cir"
+    netlist = IncrementalNetlist(str(path))
+    netlist.update(circuit, validate=False)
+    path.write_text("* edited by hand\n.end\n")
+    circuit["components"][1]["value"] = "2.2k"
+    assert netlist.update(circuit, validate=False)["mode"] == "full"
+    assert path.read_text() == netlist_text(circuit)
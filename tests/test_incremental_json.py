@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+import gemini_to_net_v1 as generator
+import server
+from fake_genai import FakeClient, visualizer_responder
+from incremental_json import IncrementalArrayParser
+
+TRICKY = {
+    "name": "Escapes {[\\\"]}",
+    "components": [
+        {"id": "R1", "type": "resistor", "value": "1k \"5%\" \\ {not a brace}"},
+        {"id": "V1", "type": "voltage_source", "value": "5V µ 😀 \\u0041"},
+    ],
+    "notes": {"components": ["not", "watched"]},
+    "connections": [{"from": "V1.positive", "to": "R1.1"}, {"from": "R1.2", "to": "V1.negative"}],
+}
+
+
+def _feed_all(text, size):
+    parser = IncrementalArrayParser()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return parser, items
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10000])
+def test_split_and_escaped_chunks(size):
+    text = "Here you go:\n```json\n" + json.dumps(TRICKY, ensure_ascii=False, indent=1) + "\n```"
+    parser, items = _feed_all(text, size)
+    assert items == [("components", c) for c in TRICKY["components"]] + \
+                    [("connections", c) for c in TRICKY["connections"]]
+    assert parser.text == text
+    assert parser.finish() == TRICKY
+
+
+def test_ascii_escaped_text_split_inside_escapes():
+    text = json.dumps(TRICKY)  # \\uXXXX escapes, split at every offset with size 1
+    parser, items = _feed_all(text, 1)
+    assert [item for _, item in items] == TRICKY["components"] + TRICKY["connections"]
+
+
+def test_malformed_element_is_skipped_and_finish_raises():
+    text = '{"components": [{"id": "R1", "type": "resistor"}, {"id": R2}, {"id": "C1"}], "connections": ['
+    parser, items = _feed_all(text, 5)
+    assert items == [("components", {"id": "R1", "type": "resistor"}), ("components", {"id": "C1"})]
+    with pytest.raises(ValueError):
+        parser.finish()
+
+
+def test_buffer_only_holds_the_open_element():
+    parser = IncrementalArrayParser()
+    parser.feed('{"components": [')
+    for i in range(2000):
+        parser.feed(json.dumps({"id": f"R{i}", "type": "resistor", "value": "1k"}) + ",")
+        assert len(parser._buffer) < 64
+    parser.feed('{"id": "C1", "type": "capa')
+    assert parser._buffer == '{"id": "C1", "type": "capa'
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def streaming_client():
+    generator.response_cache.clear()
+    yield server.app.test_client()
+    server.app.config.pop("GENAI_CLIENT", None)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_parse_endpoint_streams_elements(streaming_client, chunk_size):
+    server.app.config["GENAI_CLIENT"] = FakeClient(responder=visualizer_responder, chunk_size=chunk_size)
+    response = streaming_client.post("/api/parse", json={"prompt": "an LED with a resistor"})
+    assert response.mimetype == "text/event-stream"
+    events = _events(response.get_data(as_text=True))
+
+    expected = visualizer_responder("")
+    assert [e for e in events if e[0] != "done"] == \
+        [("component", c) for c in expected["components"]] + [("connection", c) for c in expected["connections"]]
+    kind, done = events[-1]
+    assert kind == "done"
+    assert server.store.get(done["id"])["components"] == done["circuit"]["components"]
+
+
+def test_parse_endpoint_reports_malformed_stream(streaming_client):
+    server.app.config["GENAI_CLIENT"] = FakeClient(responder=lambda prompt: '{"components": [{"id": R1', chunk_size=4)
+    events = _events(streaming_client.post("/api/parse", json={"prompt": "broken"}).get_data(as_text=True))
+    assert events[-1][0] == "error"
+    assert "malformed" in events[-1][1]["error"]
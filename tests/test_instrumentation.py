@@ -0,0 +1,41 @@
+import pytest
+
+from instrumentation import Registry, cache_gauges, registry
+from tiered_cache import TieredCache
+
+
+def _types(text):
+    return dict(line.split()[2:4] for line in text.splitlines() if line.startswith("# TYPE"))
+
+
+def test_cache_stats_export_counters_and_item_gauges():
+    cache = TieredCache(path=None, max_memory_items=1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("b")
+    cache.get("a")
+    cache_gauges("test", cache)
+    text = registry.render()
+    types = _types(text)
+    for field in ("hits_memory", "hits_disk", "misses", "evictions"):
+        assert types[f"synaptic_cache_{field}_total"] == "counter"
+        assert f"synaptic_cache_{field} " not in text
+    assert types["synaptic_cache_memory_items"] == "gauge"
+    assert types["synaptic_cache_disk_items"] == "gauge"
+    assert 'synaptic_cache_hits_memory_total{cache="test"} 1' in text
+    assert 'synaptic_cache_misses_total{cache="test"} 1' in text
+    assert 'synaptic_cache_evictions_total{cache="test"} 1' in text
+    assert 'synaptic_cache_memory_items{cache="test"} 1' in text
+
+
+def test_callback_metrics():
+    metrics = Registry()
+    metrics.gauge("queue_depth", lambda: 3)
+    metrics.gauge("jobs_total", lambda: {(("state", "done"),): 7}, kind="counter")
+    metrics.gauge("broken", lambda: 1 / 0)
+    text = metrics.render()
+    assert _types(text) == {"synaptic_queue_depth": "gauge", "synaptic_jobs_total": "counter"}
+    assert "synaptic_queue_depth 3" in text
+    assert 'synaptic_jobs_total{state="done"} 7' in text
+    with pytest.raises(ValueError):
+        metrics.gauge("x", lambda: 0, kind="summary")
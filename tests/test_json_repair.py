@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from json_repair import coerce_circuit, loads_tolerant, parse_circuit, repair_json_text
+
+
+def test_valid_json_passes_through_unchanged():
+    text = '{"components": [], "simulation": ".op"}'
+    assert loads_tolerant(text) == (json.loads(text), [])
+
+
+def test_truncated_output_is_cut_back_and_closed():
+    text = ('{"components": [{"type": "R", "id": "1", "nodes": ["a", "0"], "value": "1k"}, '
+            '{"type": "C", "id": "1", "nodes": ["a"')
+    fixed, changes = repair_json_text(text)
+    assert json.loads(fixed) == {"components": [
+        {"type": "R", "id": "1", "nodes": ["a", "0"], "value": "1k"},
+        {"type": "C", "id": "1", "nodes": ["a"]},
+    ]}
+    assert changes == ["Closed 4 truncated brackets"]
+
+
+@pytest.mark.parametrize("tail", ['"unfin', "12", "tru"])
+def test_truncation_inside_a_value_drops_the_partial_value(tail):
+    data, changes = loads_tolerant('{"a": [1, 2], "b": ' + tail)
+    assert data == {"a": [1, 2]}
+    assert changes[-1].startswith("Closed")
+
+
+def test_fences_and_surrounding_prose_are_dropped():
+    text = 'Here is the circuit:\n```json\n{"a": [1, 2], "b": {"c": 3}}\n```\nLet me know!'
+    data, changes = loads_tolerant(text)
+    assert data == {"a": [1, 2], "b": {"c": 3}}
+    assert changes == ["Dropped text before the JSON", "Dropped text after the JSON"]
+
+
+def test_fenced_valid_json_needs_no_repair():
+    assert loads_tolerant('```json\n{"a": 1}\n```') == ({"a": 1}, [])
+
+
+def test_trailing_and_duplicate_commas_are_removed():
+    data, changes = loads_tolerant('{"a": [1, 2,], "b": [1,,2], "c": {"d": 1,},}')
+    assert data == {"a": [1, 2], "b": [1, 2], "c": {"d": 1}}
+    assert changes == ["Removed 4 stray commas"]
+
+
+def test_python_style_output_is_converted():
+    data, changes = loads_tolerant("{'a': 'it\\'s', b: None, // note\n 'c': True}")
+    assert data == {"a": "it's", "b": None, "c": True}
+    assert "Removed a comment" in changes
+    assert "Converted 3 single-quoted strings" in changes
+    assert "Quoted 1 bare words" in changes
+
+
+def test_text_without_json_is_rejected():
+    with pytest.raises(ValueError, match="No JSON"):
+        loads_tolerant("Sorry, I can't help with that.")
+
+
+def test_parse_circuit_coerces_to_the_generator_schema():
+    text = ('{"components": [{"type": "resistor", "nodes": "in, out", "value": 1000}, '
+            '{"type": "R", "nodes": ["out"], "value": "1k"}], "simulation": "op"')
+    circuit, changes = parse_circuit(text)
+    assert circuit == {
+        "components": [{"type": "R", "id": "1", "nodes": ["in", "out"], "value": "1000"}],
+        "simulation": ".op",
+        "circuit_name": "Design",
+    }
+    assert "Dropped component 1: fewer than two nodes" in changes
+
+
+def test_auto_ids_avoid_explicit_ones():
+    data = {"name": "x", "components": [{"type": "resistor"}, {"type": "resistor", "id": "R1"}]}
+    circuit, _ = coerce_circuit(data, schema="visualizer")
+    assert [c["id"] for c in circuit["components"]] == ["R2", "R1"]
@@ -0,0 +1,111 @@
+import math
+
+import numpy as np
+import pytest
+
+from mna_solver import CircuitError, ac_analysis, dc_operating_point, parse_value, transient_analysis
+
+R, C = 1e3, 100e-9  # tau = 100 us, fc = 1591.5 Hz
+TAU = R * C
+
+
+def rc(source="10", simulation=".tran 10u 1m"):
+    return {
+        "circuit_name": "RC",
+        "components": [
+            {"type": "V", "id": "1", "nodes": ["in", "0"], "value": source},
+            {"type": "R", "id": "1", "nodes": ["in", "out"], "value": "1k"},
+            {"type": "C", "id": "1", "nodes": ["out", "0"], "value": "100n"},
+        ],
+        "simulation": simulation,
+    }
+
+
+def test_parse_value():
+    assert parse_value("4.7k") == pytest.approx(4700)
+    assert parse_value("10uF") == pytest.approx(1e-5)
+    assert parse_value("1meg") == pytest.approx(1e6)
+    assert parse_value("330Ω") == 330
+    with pytest.raises(CircuitError):
+        parse_value("ten")
+
+
+def test_dc_divider_and_source_current():
+    data = {"components": [
+        {"type": "V", "id": "1", "nodes": ["in", "0"], "value": "12"},
+        {"type": "R", "id": "1", "nodes": ["in", "mid"], "value": "10k"},
+        {"type": "R", "id": "2", "nodes": ["mid", "gnd"], "value": "20k"},
+        {"type": "C", "id": "1", "nodes": ["mid", "0"], "value": "1u"},
+        {"type": "L", "id": "1", "nodes": ["in", "x"], "value": "1m"},
+        {"type": "R", "id": "3", "nodes": ["x", "0"], "value": "6k"},
+    ]}
+    op = dc_operating_point(data)
+    assert op["node_voltages"]["mid"] == pytest.approx(8.0, rel=1e-6)
+    assert op["node_voltages"]["x"] == pytest.approx(12.0, rel=1e-6)
+    # 0.4 mA through the divider + 2 mA through L1/R3, flowing out of the + terminal
+    assert op["branch_currents"]["V1"] == pytest.approx(-2.4e-3, rel=1e-6)
+
+
+def test_ac_corner_of_rc_lowpass():
+    fc = 1 / (2 * math.pi * TAU)
+    result = ac_analysis(rc("AC 1"), frequencies=[fc / 100, fc, fc * 100])
+    db, phase = result["magnitude_db"]["out"], result["phase_deg"]["out"]
+    assert db[0] == pytest.approx(0.0, abs=1e-3)
+    assert db[1] == pytest.approx(-10 * math.log10(2), abs=1e-6)
+    assert phase[1] == pytest.approx(-45.0, abs=1e-6)
+    assert db[2] == pytest.approx(-40.0, abs=0.01)
+
+
+@pytest.mark.parametrize("method, tolerance", [("be", 0.2), ("trap", 0.025)])
+def test_rc_step_response(method, tolerance):
+    # Source steps 0 -> 10 V at t=0; the operating point starts from 0 V
+    result = transient_analysis(rc("PULSE(0 10 0 0 0 1 2)"), method=method)
+    t, out = result["time"], result["node_voltages"]["out"]
+    assert result["steps"] == 100
+    assert np.max(np.abs(out - 10 * (1 - np.exp(-t / TAU)))) < tolerance
+    assert np.all(result["node_voltages"]["in"][1:] == pytest.approx(10.0))
+    assert result["factorizations"] == 1
+
+
+@pytest.mark.parametrize("method", ["be", "trap"])
+def test_zero_start_is_made_consistent(method):
+    result = transient_analysis(rc("10"), method=method, initial="zero")
+    t, v = result["time"], result["node_voltages"]
+    assert np.all(v["in"][1:] == pytest.approx(10.0))
+    assert v["out"][-1] == pytest.approx(10 * (1 - math.exp(-t[-1] / TAU)), abs=1e-3)
+
+
+@pytest.mark.parametrize("method", ["be", "trap"])
+def test_rl_zero_start(method):
+    data = {"components": [
+        {"type": "V", "id": "1", "nodes": ["in", "0"], "value": "1"},
+        {"type": "R", "id": "1", "nodes": ["in", "a"], "value": "1k"},
+        {"type": "L", "id": "1", "nodes": ["a", "0"], "value": "1"},
+    ], "simulation": ".tran 10u 1m"}
+    result = transient_analysis(data, method=method, initial="zero")
+    t, a = result["time"][1:], result["node_voltages"]["a"][1:]
+    assert np.max(np.abs(a - np.exp(-t / 1e-3))) < (0.01 if method == "be" else 1e-4)
+
+
+def test_trap_does_not_ring_after_a_source_jump():
+    # 10 V pulse from 0.2 ms to 0.5 ms with instant edges
+    result = transient_analysis(rc("PULSE(0 10 0.2m 0 0 0.3m 1m)"), method="trap")
+    t, v = result["time"], result["node_voltages"]
+    expected_in = np.where((t > 0.2e-3 + 1e-9) & (t < 0.5e-3 - 1e-9), 10.0, 0.0)
+    assert np.max(np.abs(v["in"] - expected_in)) < 1e-9
+    assert np.all(np.diff(v["out"][(t > 0.2e-3) & (t < 0.5e-3)]) > 0)
+
+
+def test_factorizations_follow_step_sizes():
+    for method in ("be", "trap"):
+        assert transient_analysis(rc("PULSE(0 10 0.2m 0 0 0.3m 1m)"), method=method)["factorizations"] == 1
+
+
+def test_adaptive_step_count_and_accuracy():
+    result = transient_analysis(rc("10"), method="trap", adaptive=True, initial="zero")
+    t, out = result["time"], result["node_voltages"]["out"]
+    assert t[-1] == pytest.approx(1e-3)
+    # Fine steps only while the response is fast; never the whole run at t_step/2**10
+    assert result["steps"] < 300
+    assert result["factorizations"] <= 12
+    assert np.max(np.abs(out - 10 * (1 - np.exp(-t / TAU)))) < 0.02
@@ -0,0 +1,46 @@
+import pytest
+
+import server
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+def _big_circuit(label):
+    components = [{"id": f"R{i}", "type": "resistor", "value": label} for i in range(1, 60)]
+    connections = [{"from": f"R{i}.2", "to": f"R{i + 1}.1"} for i in range(1, 59)]
+    return {"name": label, "components": components, "connections": connections}
+
+
+def test_writes_to_other_circuits_keep_prepared_bodies(client):
+    key = ("circuit", "prepared-a")
+    server.store.put("prepared-a", _big_circuit("1k"))
+    client.get("/api/circuit/prepared-a")
+    entry = server.prepared._items[key]
+
+    server.store.put("prepared-b", _big_circuit("2k"))
+    client.get("/api/circuit/prepared-a")
+    assert server.prepared._items[key] is entry
+
+    server.store.put("prepared-a", _big_circuit("3k"))
+    body = client.get("/api/circuit/prepared-a").get_json()
+    assert body["components"][0]["value"] == "3k"
+    assert server.prepared._items[key] is not entry
+
+
+def test_not_modified_carries_the_matched_variant_etag(client):
+    server.store.put("prepared-gzip", _big_circuit("1k"))
+    first = client.get("/api/circuit/prepared-gzip", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["Content-Encoding"] == "gzip"
+    etag = first.headers["ETag"]
+    assert etag.strip('"').endswith("-gzip")
+
+    again = client.get("/api/circuit/prepared-gzip", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+
+def test_unknown_circuit_is_404(client):
+    assert client.get("/api/circuit/no-such-circuit").status_code == 404
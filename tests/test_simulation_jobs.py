@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import simulation_jobs
+from simulation_jobs import JobManager, JobQueueFull
+
+
+@pytest.fixture
+def blocking_jobs(monkeypatch):
+    """JobManager on one worker thread whose jobs wait for `release`"""
+    release = threading.Event()
+    monkeypatch.setattr(simulation_jobs, "run_analysis", lambda *args: release.wait(10) and {"analysis": "op", "elapsed": 0.0})
+    jobs = JobManager(max_workers=1, max_pending=2)
+    jobs._pool = ThreadPoolExecutor(max_workers=1)
+    yield jobs, release
+    release.set()
+    jobs.shutdown()
+
+
+def _call_with_timeout(fn, *args):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn(*args)), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive(), f"{fn.__name__} deadlocked"
+    return result[0]
+
+
+def test_cancel_queued_job_does_not_deadlock(blocking_jobs):
+    jobs, release = blocking_jobs
+    jobs.submit({})
+    queued = jobs.submit({})
+
+    record = _call_with_timeout(jobs.cancel, queued["id"])
+
+    assert record["status"] == "cancelled"
+    assert jobs.get(queued["id"])["status"] == "cancelled"
+    assert jobs.pending() == 1
+
+
+def test_cancelled_running_job_counts_until_it_returns(blocking_jobs):
+    jobs, release = blocking_jobs
+    running = jobs.submit({})
+    jobs.submit({})
+    _call_with_timeout(jobs.cancel, running["id"])
+
+    assert jobs.pending() == 2
+    with pytest.raises(JobQueueFull):
+        jobs.submit({})
+
+    release.set()
+    jobs._pool.shutdown(wait=True)
+    assert jobs.pending() == 0
+    assert jobs.get(running["id"])["status"] == "cancelled"
+
+
+def test_shutdown_cancels_queued_jobs(blocking_jobs):
+    jobs, release = blocking_jobs
+    jobs.submit({})
+    queued = jobs.submit({})
+    release.set()
+    _call_with_timeout(jobs.shutdown)
+    assert jobs.get(queued["id"])["status"] in ("cancelled", "done")
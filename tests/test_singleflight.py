@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def _run_concurrently(flights, key, fn, callers):
+    """Start `callers` threads on one key; returns (outcomes, threads) once all are waiting"""
+    outcomes = [None] * callers
+
+    def call(i):
+        try:
+            outcomes[i] = ("ok",) + flights.do(key, fn)
+        except Exception as e:  # noqa: BLE001
+            outcomes[i] = ("error", e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for t in threads:
+        t.start()
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        with flights._lock:
+            call_state = flights._calls.get(key)
+            if call_state is not None and call_state.waiters == callers - 1:
+                break
+        time.sleep(0.001)
+    return outcomes, threads
+
+
+def test_concurrent_callers_share_one_execution():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"circuit": "rc"}
+
+    outcomes, threads = _run_concurrently(flights, "prompt", fetch, 8)
+    assert flights.in_flight() == 1
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(calls) == 1
+    assert outcomes == [("ok", {"circuit": "rc"}, True)] * 8
+    assert flights.in_flight() == 0
+
+
+def test_errors_reach_every_waiter():
+    flights = SingleFlight()
+    release = threading.Event()
+    error = RuntimeError("quota exceeded")
+
+    def fetch():
+        release.wait(5)
+        raise error
+
+    outcomes, threads = _run_concurrently(flights, "prompt", fetch, 4)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert outcomes == [("error", error)] * 4
+    assert flights.in_flight() == 0
+
+
+def test_nothing_is_remembered_after_a_call():
+    flights = SingleFlight()
+    results = iter([1, 2])
+    assert flights.do("k", lambda: next(results)) == (1, False)
+    assert flights.do("k", lambda: next(results)) == (2, False)
+    with pytest.raises(ValueError):
+        flights.do("k", int, "not a number")
+    assert flights.do("k", int, "3") == (3, False)
+
+
+def test_different_keys_run_independently():
+    flights = SingleFlight()
+    release = threading.Event()
+    outcomes, threads = _run_concurrently(flights, "slow", lambda: release.wait(5), 1)
+    assert flights.do("fast", lambda: "done") == ("done", False)
+    assert flights.in_flight() == 1
+    release.set()
+    threads[0].join(5)
+    assert outcomes == [("ok", True, False)]
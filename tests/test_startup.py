@@ -0,0 +1,10 @@
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def test_generator_import_does_not_load_numpy():
+    code = "import sys, gemini_to_net_v1; print(sorted(m for m in ('numpy', 'scipy', 'google.genai') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
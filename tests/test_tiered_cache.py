@@ -0,0 +1,75 @@
+import time
+
+from tiered_cache import TieredCache, make_key
+
+
+def test_make_key_ignores_dict_order():
+    assert make_key("a", {"x": 1, "y": 2}) == make_key("a", {"y": 2, "x": 1})
+    assert make_key("a", 1) != make_key("a", "1")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TieredCache(path=None, max_memory_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a is now the most recent
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_items"] == 2
+    assert (stats["hits_memory"], stats["misses"]) == (3, 1)
+
+
+def test_disk_tier_evicts_least_recently_accessed(tmp_path):
+    cache = TieredCache(str(tmp_path / "c.sqlite"), max_memory_items=1, max_disk_items=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1  # disk hit refreshes a
+    cache.set("c", 3)
+    assert cache.stats()["disk_items"] == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "sub" / "c.sqlite")
+    first = TieredCache(path)
+    first.set("design", {"components": [{"id": "R1", "value": "1k"}]})
+    second = TieredCache(path)
+    assert second.get("design") == {"components": [{"id": "R1", "value": "1k"}]}
+    assert second.stats()["hits_disk"] == 1
+    assert second.stats()["disk_items"] == 1
+    second.get("design")
+    assert second.stats()["hits_memory"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = TieredCache(str(tmp_path / "c.sqlite"), ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.03)
+    assert cache.get("a", "gone") == "gone"
+    assert cache.stats()["disk_items"] == 0
+
+
+def test_hits_are_copies():
+    cache = TieredCache(path=None)
+    value = {"positions": {"R1": {"x": 1}}}
+    cache.set("k", value)
+    value["positions"]["R1"]["x"] = 99
+    hit = cache.get("k")
+    assert hit == {"positions": {"R1": {"x": 1}}}
+    hit["positions"].clear()
+    assert cache.get("k") == {"positions": {"R1": {"x": 1}}}
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    cache = TieredCache(path)
+    cache.set("a", 1)
+    cache.clear()
+    assert cache.get("a") is None
+    assert TieredCache(path).get("a") is None
@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from mna_solver import CircuitError
+from tolerance_analysis import monte_carlo
+
+
+def divider(extra=()):
+    return {
+        "circuit_name": "Divider",
+        "components": [
+            {"type": "V", "id": "1", "nodes": ["in", "0"], "value": "10"},
+            {"type": "R", "id": "1", "nodes": ["in", "out"], "value": "1k"},
+            {"type": "R", "id": "2", "nodes": ["out", "0"], "value": "1k"},
+            *extra,
+        ],
+        "simulation": ".op",
+    }
+
+
+def test_uniform_tolerance_matches_the_exact_distribution():
+    # 1 mA into a ±5% resistor: V(load) is uniform on [0.95, 1.05]
+    circuit = divider([
+        {"type": "I", "id": "1", "nodes": ["0", "load"], "value": "1m"},
+        {"type": "R", "id": "3", "nodes": ["load", "0"], "value": "1k"},
+    ])
+    report = monte_carlo(circuit, samples=20000, seed=1, probes=["out"], limits={"load": (0.97, 1.03)})
+    stats = report["statistics"]["load"]
+    assert report["yield"] == pytest.approx(0.6, abs=0.01)
+    assert stats["percentiles"][5] == pytest.approx(0.955, abs=0.002)
+    assert stats["percentiles"][50] == pytest.approx(1.0, abs=0.002)
+    assert stats["percentiles"][95] == pytest.approx(1.045, abs=0.002)
+    assert 0.95 <= stats["min"] and stats["max"] <= 1.05
+
+
+def test_gaussian_divider_matches_first_order_spread():
+    # V(out) = 10 R2 / (R1 + R2); with equal resistors sigma_out = 5 * sigma / sqrt(2)
+    sigma = 0.05 / 3
+    sigma_out = 5 * sigma / math.sqrt(2)
+    report = monte_carlo(divider(), samples=40000, distribution="gaussian", seed=7,
+                         limits={"out": (5 - sigma_out, 5 + sigma_out)})
+    stats = report["statistics"]["out"]
+    assert stats["mean"] == pytest.approx(5.0, abs=0.002)
+    assert stats["std"] == pytest.approx(sigma_out, rel=0.02)
+    assert stats["percentiles"][95] == pytest.approx(5 + 1.6449 * sigma_out, abs=0.003)
+    assert report["yield"] == pytest.approx(0.6827, abs=0.01)
+
+
+def test_seeded_runs_repeat():
+    a = monte_carlo(divider(), samples=500, seed=3, limits={"out": (4.9, 5.1)})
+    b = monte_carlo(divider(), samples=500, seed=3, limits={"out": (4.9, 5.1)})
+    assert a["yield"] == b["yield"]
+    assert a["statistics"] == b["statistics"]
+
+
+def test_limit_nodes_are_probed_or_rejected():
+    report = monte_carlo(divider(), samples=100, seed=0, probes=["in"], limits={"out": (0, 10)})
+    assert set(report["statistics"]) == {"in", "out"}
+    assert report["yield"] == 1.0
+    with pytest.raises(CircuitError, match="Unknown limit node 'vout'"):
+        monte_carlo(divider(), samples=10, limits={"vout": (4.9, 5.1)})
@@ -0,0 +1,87 @@
+import copy
+
+import gemini_to_net_v1
+from gemini_to_net_v1 import build_and_save_netlist
+from topology_hash import topology_hash
+
+RC = {
+    "circuit_name": "RC Low Pass",
+    "components": [
+        {"type": "V", "id": "1", "nodes": ["in", "0"], "value": "PULSE(0 5 0 1n 1n 1m 2m)"},
+        {"type": "R", "id": "1", "nodes": ["in", "out"], "value": "1k"},
+        {"type": "C", "id": "1", "nodes": ["out", "0"], "value": "100n"},
+        {"type": "D", "id": "1", "nodes": ["out", "0"], "value": "1N4148"},
+    ],
+    "simulation": ".tran 10u 5m",
+}
+
+
+def _variant(**changes):
+    circuit = copy.deepcopy(RC)
+    circuit.update(changes)
+    return circuit
+
+
+def test_renaming_and_reordering_keep_the_hash():
+    renamed = copy.deepcopy(RC)
+    for comp in renamed["components"]:
+        comp["id"] = "7" + comp["id"]
+        comp["nodes"] = [{"in": "vin", "out": "vout"}.get(n, n) for n in comp["nodes"]]
+    reordered = _variant(components=list(reversed(RC["components"])))
+    flipped = copy.deepcopy(RC)
+    flipped["components"][1]["nodes"].reverse()  # a resistor's ends are interchangeable
+    assert topology_hash(renamed) == topology_hash(RC)
+    assert topology_hash(reordered) == topology_hash(RC)
+    assert topology_hash(flipped) == topology_hash(RC)
+
+
+def test_values_and_polarity_change_the_hash():
+    revalued = copy.deepcopy(RC)
+    revalued["components"][1]["value"] = "2.2k"
+    reversed_diode = copy.deepcopy(RC)
+    reversed_diode["components"][3]["nodes"].reverse()
+    assert topology_hash(revalued) != topology_hash(RC)
+    assert topology_hash(reversed_diode) != topology_hash(RC)
+    same_value = copy.deepcopy(RC)
+    same_value["components"][1]["value"] = "1000"
+    assert topology_hash(same_value) == topology_hash(RC)
+
+
+def _save(data, folder, **kwargs):
+    return build_and_save_netlist(data, str(folder), validate=False, dedupe=True, **kwargs)
+
+
+def test_dedupe_returns_the_existing_netlist(tmp_path):
+    first = _save(RC, tmp_path)
+    renamed = _variant(circuit_name="Another name", components=list(reversed(RC["components"])))
+    assert _save(renamed, tmp_path) == first
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["RC_Low_Pass.cir"]
+
+
+def test_dedupe_keeps_designs_with_other_directives_apart(tmp_path):
+    tran = _save(RC, tmp_path)
+    ac = _save(_variant(circuit_name="RC AC", simulation=".ac dec 10 1 1meg"), tmp_path)
+    assert ac != tran
+    assert ".ac dec 10 1 1meg" in open(ac).read()
+    assert ".tran 10u 5m" in open(tran).read()
+
+
+def test_dedupe_ignores_stale_index_entries(tmp_path):
+    path = _save(RC, tmp_path)
+    # Overwrite the indexed file with a different design (same file name)
+    other = _variant(components=RC["components"][:2])
+    assert _save(other, tmp_path) == path
+    again = _save(_variant(circuit_name="RC again"), tmp_path)
+    assert again != path
+    assert "C1" in open(again).read()
+
+    # Files changed behind the writer's back are re-checked too
+    with open(again, "w") as f:
+        f.write("* hand edited\n.end\n")
+    assert _save(_variant(circuit_name="RC third"), tmp_path) != again
+
+
+def test_dedupe_index_is_rebuilt_from_trailers(tmp_path):
+    path = _save(RC, tmp_path)
+    gemini_to_net_v1._netlist_index.clear()
+    assert _save(_variant(circuit_name="Renamed"), tmp_path) == path
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Default location for on-disk caches (override with SYNAPTIC_CACHE_DIR)
+CACHE_DIR = os.environ.get("SYNAPTIC_CACHE_DIR", ".synaptic_cache")
+
+_MISSING = object()
+
+
+def make_key(*parts):
+    """Stable SHA-256 key for any JSON-serializable parts"""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """
+    Two-tier key/value cache: an in-process LRU in front of a SQLite table
+    that survives restarts. Values must be JSON-serializable; both tiers
+    hold them serialized, so every hit is a fresh copy that callers may
+    mutate freely.
+
+    Entries older than `ttl` seconds are treated as misses and dropped.
+    Each tier is trimmed to its size limit, least recently used first.
+    """
+
+    def __init__(self, path=None, max_memory_items=256, max_disk_items=10000, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (stored_at, JSON text)
+        self._lock = threading.Lock()
+        self._db = None
+        self._disk_count = 0
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- SQLite tier (opened lazily so importing callers stay cheap) ---
+
+    def _connect(self):
+        if self._db is None and self.path:
+            folder = os.path.dirname(self.path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+            self._db.commit()
+            self._disk_count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return self._db
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _remember(self, key, stored_at, text):
+        self._memory[key] = (stored_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        """Return the cached value for `key`, or `default` on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key, _MISSING)
+            if entry is not _MISSING:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self.hits_memory += 1
+                    return json.loads(entry[1])
+                del self._memory[key]
+
+            db = self._connect()
+            if db is not None:
+                row = db.execute(
+                    "SELECT value, stored_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+                        db.commit()
+                        self._remember(key, row[1], row[0])
+                        self.hits_disk += 1
+                        return json.loads(row[0])
+                    db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    db.commit()
+                    self._disk_count -= 1
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """Store `value` in both tiers"""
+        now = time.time()
+        text = json.dumps(value)
+        with self._lock:
+            self._remember(key, now, text)
+            db = self._connect()
+            if db is None:
+                return
+            existed = db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, text, now, now),
+            )
+            if existed is None:
+                self._disk_count += 1
+            overflow = self._disk_count - self.max_disk_items
+            if overflow > 0:
+                db.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self._disk_count -= overflow
+                self.evictions += overflow
+            db.commit()
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            db = self._connect()
+            if db is not None:
+                db.execute("DELETE FROM entries")
+                db.commit()
+                self._disk_count = 0
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+            "memory_items": len(self._memory),
+            "disk_items": self._disk_count,
+        }
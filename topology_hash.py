@@ -0,0 +1,219 @@
+"""
+Canonical topology hash for circuits.
+
+Two circuits hash the same when they are the same network: component ids,
+net names, list order and schema (visualizer or generator) don't matter,
+while component types, values and terminal roles do (a reversed diode or
+source is a different circuit; the two ends of a resistor are not).
+
+    topology_hash(circuit)          # hex digest
+    canon = canonicalize(circuit)   # {"hash", "components", "nets"}
+    canon["nets"][k]                # this circuit's name for canonical net k
+
+The circuit becomes a graph of component, terminal and net vertices.
+Colour refinement on an ordered partition (splitting cells by neighbour
+counts, Hopcroft's "all but the largest part" queue) makes it equitable;
+remaining ties are broken by individualizing one vertex and refining
+again until every vertex has its own cell. The vertex order this ends in
+is the canonical labelling, and the hash covers the circuit rewritten in
+that order, so equal hashes mean isomorphic circuits. Ties inside a cell
+are broken by input order, which is exact for symmetric parts (parallel
+identical resistors, rings); exotic regular structures can occasionally
+hash differently when reordered, never the other way round.
+"""
+import hashlib
+import json
+import re
+from collections import deque
+
+from circuit_ir import GROUND, CircuitIR
+from spice_values import parse_value
+
+# Component types whose two terminals are interchangeable
+SYMMETRIC_TYPES = {"R", "C", "L"}
+
+_PLAIN_VALUE = re.compile(r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*[a-zA-ZΩµ]*$")
+
+
+def normalize_value(value):
+    """'4.7k', '4700 Ω' and 4700 all -> '4700'; anything else is case/space-folded"""
+    text = str(value).strip()
+    if _PLAIN_VALUE.match(text):
+        return f"{parse_value(text):.6g}"
+    return " ".join(text.lower().split())
+
+
+def _graph(ir):
+    """Initial vertex labels and adjacency for the component/terminal/net graph"""
+    labels, adj = [], []
+    comps, terms = [], []
+    net_vertex = {}
+    for ci, comp in enumerate(ir.components):
+        if comp.type == "GND":
+            continue
+        cv = len(labels)
+        comps.append((cv, ci))
+        labels.append(("c", comp.type, normalize_value(comp.value)))
+        adj.append([])
+        for t in ir.terminals(ci):
+            tv = len(labels)
+            role = "" if comp.type in SYMMETRIC_TYPES else ir.role(t)
+            labels.append(("t", comp.type, role))
+            adj.append([cv])
+            adj[cv].append(tv)
+            terms.append((tv, cv, role, t))
+            net = ir.term_net[t]
+            nv = net_vertex.get(net)
+            if nv is None:
+                nv = net_vertex[net] = len(labels)
+                labels.append(("n", ir.net_names[net] == GROUND, ""))
+                adj.append([])
+            adj[tv].append(nv)
+            adj[nv].append(tv)
+    return labels, adj, comps, terms, net_vertex
+
+
+class _Partition:
+    """Ordered partition of range(n); cells are identified by their start position"""
+
+    def __init__(self, labels):
+        n = len(labels)
+        self.order = sorted(range(n), key=labels.__getitem__)
+        self.pos = [0] * n
+        self.cell = [0] * n
+        self.end = {}
+        start = 0
+        for i, v in enumerate(self.order):
+            self.pos[v] = i
+            if i and labels[v] != labels[self.order[i - 1]]:
+                self.end[start] = i
+                start = i
+            self.cell[v] = start
+        if n:
+            self.end[start] = n
+
+    def _move(self, v, i):
+        u = self.order[i]
+        j = self.pos[v]
+        self.order[i], self.order[j] = v, u
+        self.pos[v], self.pos[u] = i, j
+
+    def refine(self, adj, queue, queued):
+        """Split cells until equitable with respect to every queued splitter"""
+        order, pos, cell, end = self.order, self.pos, self.cell, self.end
+        while queue:
+            s = queue.popleft()
+            queued.discard(s)
+            counts = {}
+            for v in order[s:end[s]]:
+                for u in adj[v]:
+                    counts[u] = counts.get(u, 0) + 1
+            touched = {}
+            for u in counts:
+                x = cell[u]
+                if x in touched:
+                    touched[x].append(u)
+                else:
+                    touched[x] = [u]
+            for x in sorted(touched):
+                members = touched[x]
+                stop = end[x]
+                if len(members) == stop - x and len({counts[u] for u in members}) == 1:
+                    continue
+                # Untouched vertices stay at the front; touched ones follow in count order
+                members.sort(key=counts.__getitem__)
+                i = stop - len(members)
+                for k, u in enumerate(members, i):
+                    w, j = order[k], pos[u]
+                    order[k], order[j] = u, w
+                    pos[u], pos[w] = k, j
+                starts = [x] if i > x else []
+                prev = None
+                for k in range(i, stop):
+                    c = counts[order[k]]
+                    if c != prev:
+                        starts.append(k)
+                        prev = c
+                largest, largest_size = x, -1
+                for a, b in zip(starts, starts[1:] + [stop]):
+                    end[a] = b
+                    if a != x:
+                        for k in range(a, b):
+                            cell[order[k]] = a
+                    if b - a > largest_size:
+                        largest, largest_size = a, b - a
+                if x in queued:
+                    largest = x
+                for a in starts:
+                    if a != largest and a not in queued:
+                        queued.add(a)
+                        queue.append(a)
+
+    def individualize(self, start):
+        """Split the first vertex of cell `start` off into its own cell (at the cell's end); returns it"""
+        end = self.end[start]
+        self._move(self.order[start], end - 1)
+        self.end[start] = end - 1
+        self.end[end - 1] = end
+        self.cell[self.order[end - 1]] = end - 1
+        return end - 1
+
+
+def canonical_order(labels, adj):
+    """Vertex order of the discrete canonical partition"""
+    part = _Partition(labels)
+    queue = deque(sorted(part.end))
+    queued = set(queue)
+    part.refine(adj, queue, queued)
+    start = 0
+    n = len(labels)
+    while start < n:
+        if part.end[start] - start == 1:
+            start += 1
+            continue
+        single = part.individualize(start)
+        queue.append(single)
+        queued.add(single)
+        part.refine(adj, queue, queued)
+    return part.order
+
+
+def canonicalize(circuit):
+    """
+    Canonical labelling of a circuit (either schema, or a CircuitIR).
+
+    Returns {"hash", "components", "nets"}: component ids and net names of
+    this circuit in canonical order (ground symbols are left out; the
+    ground net is named "0").
+    """
+    ir = circuit if isinstance(circuit, CircuitIR) else CircuitIR.from_json(circuit)
+    labels, adj, comps, terms, net_vertex = _graph(ir)
+    order = canonical_order(labels, adj)
+    rank = [0] * len(order)
+    for i, v in enumerate(order):
+        rank[v] = i
+
+    net_order = sorted(net_vertex.items(), key=lambda item: rank[item[1]])
+    net_rank = {nv: k for k, (_, nv) in enumerate(net_order)}
+    pins = {}
+    for tv, cv, role, t in terms:
+        pins.setdefault(cv, []).append((rank[tv], role, net_rank[net_vertex[ir.term_net[t]]]))
+    comp_order = sorted(comps, key=lambda item: rank[item[0]])
+    form = {
+        "nets": [ir.net_names[net] == GROUND for net, _ in net_order],
+        "components": [
+            list(labels[cv][1:]) + [[[role, net] for _, role, net in sorted(pins.get(cv, []))]]
+            for cv, _ in comp_order
+        ],
+    }
+    blob = json.dumps(form, separators=(",", ":"), ensure_ascii=False)
+    return {
+        "hash": hashlib.sha256(blob.encode("utf-8")).hexdigest(),
+        "components": [ir.components[ci].id for _, ci in comp_order],
+        "nets": [ir.net_names[net] for net, _ in net_order],
+    }
+
+
+def topology_hash(circuit):
+    """Hex digest identifying the circuit up to renaming and reordering"""
+    return canonicalize(circuit)["hash"]